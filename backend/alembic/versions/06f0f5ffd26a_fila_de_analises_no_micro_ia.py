@@ -0,0 +1,44 @@
+"""Fila de análises no Micro IA
+
+Revision ID: 06f0f5ffd26a
+Revises: 5df0e0586f25
+Create Date: 2026-10-18 11:20:05.316877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '06f0f5ffd26a'
+down_revision = '5df0e0586f25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analise_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('inspecao_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('tentativas', sa.Integer(), nullable=False),
+    sa.Column('max_tentativas', sa.Integer(), nullable=False),
+    sa.Column('erro', sa.Text(), nullable=True),
+    sa.Column('disponivel_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('bloqueado_ate', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('criado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('atualizado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['inspecao_id'], ['inspecoes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_analise_jobs_id'), 'analise_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_analise_jobs_inspecao_id'), 'analise_jobs', ['inspecao_id'], unique=False)
+    op.create_index('ix_analise_jobs_status_disponivel_em', 'analise_jobs', ['status', 'disponivel_em'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_analise_jobs_status_disponivel_em', table_name='analise_jobs')
+    op.drop_index(op.f('ix_analise_jobs_inspecao_id'), table_name='analise_jobs')
+    op.drop_index(op.f('ix_analise_jobs_id'), table_name='analise_jobs')
+    op.drop_table('analise_jobs')
@@ -0,0 +1,39 @@
+"""Tabela inicial de usuários
+
+Revision ID: 0b7d3c1e9a52
+Revises: 
+Create Date: 2026-10-18 18:02:11.420377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7d3c1e9a52'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bancos antigos tinham a tabela criada pelo create_all do boot; só cria quando falta.
+    # `telefone` existe aqui porque f2160700fcc1 remove a coluna e 3eabc2809364 a recria.
+    if sa.inspect(op.get_bind()).has_table('users'):
+        return
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nome', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('telefone', sa.String(length=20), nullable=True),
+    sa.Column('senha', sa.String(length=255), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_table('users')
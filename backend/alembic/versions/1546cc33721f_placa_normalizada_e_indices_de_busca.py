@@ -0,0 +1,75 @@
+"""Placa normalizada em veículos e inspeções, com índices de busca
+
+Revision ID: 1546cc33721f
+Revises: 06f0f5ffd26a
+Create Date: 2026-10-18 14:41:52.907163
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1546cc33721f'
+down_revision = '06f0f5ffd26a'
+branch_labels = None
+depends_on = None
+
+# Espelho de app.utils.placa.normalizar_placa: formato antigo (ABC1234) vira Mercosul (ABC1C34)
+FUNCAO_NORMALIZAR = """
+CREATE OR REPLACE FUNCTION normalizar_placa(valor text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE
+        WHEN p ~ '^[A-Z]{3}[0-9]{4}$'
+            THEN substr(p, 1, 4) || translate(substr(p, 5, 1), '0123456789', 'ABCDEFGHIJ') || substr(p, 6)
+        ELSE p
+    END
+    FROM (SELECT regexp_replace(upper(coalesce(valor, '')), '[^A-Z0-9]', '', 'g') AS p) AS limpa
+$$
+"""
+
+
+# (nome, tabela, colunas, opções) — todos criados com CONCURRENTLY
+INDICES = [
+    ('ix_veiculos_placa_norm', 'veiculos', ['placa_norm'], {}),
+    ('ix_inspecoes_placa_norm_data', 'inspecoes', ['placa_norm', 'data'], {}),
+    # Busca por trecho da placa (LIKE '%...%')
+    ('ix_veiculos_placa_norm_trgm', 'veiculos', ['placa_norm'],
+     {'postgresql_using': 'gin', 'postgresql_ops': {'placa_norm': 'gin_trgm_ops'}}),
+    ('ix_inspecoes_placa_norm_trgm', 'inspecoes', ['placa_norm'],
+     {'postgresql_using': 'gin', 'postgresql_ops': {'placa_norm': 'gin_trgm_ops'}}),
+]
+
+
+def upgrade():
+    # Tudo aqui pode ser reexecutado: a parte transacional só é registrada no alembic_version
+    # depois dos índices, então uma falha no meio deixa as colunas criadas e a revisão anterior
+    with op.get_context().autocommit_block():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.execute(FUNCAO_NORMALIZAR)
+    # Mesmo tipo de `placa` em cada tabela: a normalização nunca aumenta o tamanho
+    op.execute("ALTER TABLE veiculos ADD COLUMN IF NOT EXISTS placa_norm VARCHAR")
+    op.execute("ALTER TABLE inspecoes ADD COLUMN IF NOT EXISTS placa_norm VARCHAR(10)")
+    op.execute("UPDATE veiculos SET placa_norm = normalizar_placa(placa)")
+    op.execute("UPDATE inspecoes SET placa_norm = normalizar_placa(placa)")
+
+    with op.get_context().autocommit_block():
+        for nome, tabela, colunas, opcoes in INDICES:
+            # Um CREATE INDEX CONCURRENTLY interrompido deixa o índice INVALID, que o IF NOT EXISTS pularia
+            invalido = op.get_bind().execute(sa.text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :nome AND NOT i.indisvalid"
+            ), {"nome": nome}).first()
+            if invalido:
+                op.drop_index(nome, table_name=tabela, postgresql_concurrently=True)
+            op.create_index(nome, tabela, colunas, unique=False, postgresql_concurrently=True, if_not_exists=True, **opcoes)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for nome, tabela, _, _ in reversed(INDICES):
+            op.drop_index(nome, table_name=tabela, postgresql_concurrently=True, if_exists=True)
+    op.drop_column('inspecoes', 'placa_norm')
+    op.drop_column('veiculos', 'placa_norm')
+    op.execute("DROP FUNCTION IF EXISTS normalizar_placa(text)")
@@ -0,0 +1,28 @@
+"""Índice de ocupação da agenda por local, data e horário
+
+Revision ID: 2f01f331bdf3
+Revises: 1546cc33721f
+Create Date: 2026-10-18 15:20:03.118204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2f01f331bdf3'
+down_revision = '1546cc33721f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Atende a consulta de disponibilidade (faixa de datas) e a contagem de um slot na reserva
+    with op.get_context().autocommit_block():
+        op.create_index('ix_agendamentos_local_data_horario', 'agendamentos', ['local', 'data', 'horario'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_agendamentos_local_data_horario', table_name='agendamentos',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,38 @@
+"""Índices para os filtros frequentes das rotas
+
+Revision ID: 5df0e0586f25
+Revises: 6d08920a09e0
+Create Date: 2026-10-18 10:02:17.884512
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5df0e0586f25'
+down_revision = '6d08920a09e0'
+branch_labels = None
+depends_on = None
+
+# (nome, tabela, colunas) — agendamentos.usuario_id já é coberto por ix_agendamentos_usuario_status_data
+INDICES = [
+    ('ix_veiculos_usuario_id_id', 'veiculos', ['usuario_id', 'id']),
+    ('ix_relatorios_usuario_id_inspecao_id', 'relatorios', ['usuario_id', 'inspecao_id']),
+    ('ix_relatorios_usuario_id_data_id', 'relatorios', ['usuario_id', 'data', 'id']),
+    ('ix_patios_usuario_id', 'patios', ['usuario_id']),
+    ('ix_cameras_patio_id', 'cameras', ['patio_id']),
+    ('ix_inspecoes_status_id', 'inspecoes', ['status', 'id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY não bloqueia escritas, mas não roda dentro de transação
+    with op.get_context().autocommit_block():
+        for nome, tabela, colunas in INDICES:
+            op.create_index(nome, tabela, colunas, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for nome, tabela, _ in reversed(INDICES):
+            op.drop_index(nome, table_name=tabela, postgresql_concurrently=True, if_exists=True)
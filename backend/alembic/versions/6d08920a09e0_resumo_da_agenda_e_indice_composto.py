@@ -0,0 +1,62 @@
+"""Resumo materializado da agenda e índice composto em agendamentos
+
+Revision ID: 6d08920a09e0
+Revises: c4a81e2f7d90
+Create Date: 2026-10-18 09:12:41.503218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d08920a09e0'
+down_revision = 'c4a81e2f7d90'
+branch_labels = None
+depends_on = None
+
+
+INDICE = 'ix_agendamentos_usuario_status_data'
+
+
+def upgrade():
+    # Reexecutável: o autocommit_block confirma a tabela antes do índice, então uma falha
+    # no CREATE INDEX deixa agenda_resumos criada sem registrar a revisão
+    if not sa.inspect(op.get_bind()).has_table('agenda_resumos'):
+        op.create_table('agenda_resumos',
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('pendentes', sa.Integer(), nullable=False),
+        sa.Column('concluidos', sa.Integer(), nullable=False),
+        sa.Column('ultimo_agendamento', sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('usuario_id')
+        )
+    # Popula o resumo a partir dos agendamentos existentes
+    op.execute("""
+        INSERT INTO agenda_resumos (usuario_id, pendentes, concluidos, ultimo_agendamento)
+        SELECT usuario_id,
+               COUNT(*) FILTER (WHERE status = 'Pendente'),
+               COUNT(*) FILTER (WHERE status = 'Concluído'),
+               MAX(data)
+        FROM agendamentos
+        GROUP BY usuario_id
+        ON CONFLICT (usuario_id) DO UPDATE SET pendentes = EXCLUDED.pendentes,
+            concluidos = EXCLUDED.concluidos, ultimo_agendamento = EXCLUDED.ultimo_agendamento
+    """)
+    # CONCURRENTLY não roda dentro de transação
+    with op.get_context().autocommit_block():
+        # Um CREATE INDEX CONCURRENTLY interrompido deixa o índice INVALID, que o IF NOT EXISTS pularia
+        invalido = op.get_bind().execute(sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :nome AND NOT i.indisvalid"
+        ), {"nome": INDICE}).first()
+        if invalido:
+            op.drop_index(INDICE, table_name='agendamentos', postgresql_concurrently=True)
+        op.create_index(INDICE, 'agendamentos', ['usuario_id', 'status', 'data'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(INDICE, table_name='agendamentos', postgresql_concurrently=True, if_exists=True)
+    op.drop_table('agenda_resumos')
@@ -0,0 +1,29 @@
+"""Coluna de versão em veículos, relatórios e inspeções (ETag / travamento otimista)
+
+Revision ID: 7375f323d205
+Revises: e57f4b5f9377
+Create Date: 2026-10-18 16:48:10.532917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7375f323d205'
+down_revision = 'e57f4b5f9377'
+branch_labels = None
+depends_on = None
+
+TABELAS = ['veiculos', 'relatorios', 'inspecoes']
+
+
+def upgrade():
+    # Com default constante o PostgreSQL 11+ não reescreve a tabela
+    for tabela in TABELAS:
+        op.add_column(tabela, sa.Column('versao', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    for tabela in reversed(TABELAS):
+        op.drop_column(tabela, 'versao')
@@ -0,0 +1,39 @@
+"""Índice trigram da placa limpa (sem normalizar) em veículos
+
+Revision ID: a93e5d0c7b41
+Revises: 7375f323d205
+Create Date: 2026-10-18 18:31:26.603917
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a93e5d0c7b41'
+down_revision = '7375f323d205'
+branch_labels = None
+depends_on = None
+
+# Espelho de app.utils.placa.limpar_placa: trechos de placas antigas ("1234" em ABC1234)
+# não aparecem em placa_norm (ABC1C34), então a busca também consulta a placa só limpa
+FUNCAO_LIMPAR = """
+CREATE OR REPLACE FUNCTION limpar_placa(valor text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT regexp_replace(upper(coalesce(valor, '')), '[^A-Z0-9]', '', 'g')
+$$
+"""
+
+
+def upgrade():
+    op.execute(FUNCAO_LIMPAR)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_veiculos_placa_limpa_trgm "
+            "ON veiculos USING gin (limpar_placa(placa) gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_veiculos_placa_limpa_trgm")
+    op.execute("DROP FUNCTION IF EXISTS limpar_placa(text)")
@@ -0,0 +1,28 @@
+"""Índice de inspeções por pátio e status (varredura do canal de eventos)
+
+Revision ID: b5c2e7f91d06
+Revises: d17f6b2a4e83
+Create Date: 2026-10-18 19:02:48.337150
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5c2e7f91d06'
+down_revision = 'd17f6b2a4e83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # O poller de /api/events só varre as inspeções em aberto dos pátios com assinantes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_inspecoes_patio_id_status', 'inspecoes', ['patio_id', 'status'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_inspecoes_patio_id_status', table_name='inspecoes',
+                      postgresql_concurrently=True, if_exists=True)
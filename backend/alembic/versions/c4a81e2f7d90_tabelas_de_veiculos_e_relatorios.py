@@ -0,0 +1,58 @@
+"""Tabelas de veículos e relatórios
+
+Revision ID: c4a81e2f7d90
+Revises: fe9f00735187
+Create Date: 2026-10-18 18:05:37.918264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a81e2f7d90'
+down_revision = 'fe9f00735187'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Até aqui as duas tabelas só existiam pelo create_all do boot; bancos antigos já as têm
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('veiculos'):
+        op.create_table('veiculos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=True),
+        sa.Column('placa', sa.String(), nullable=False),
+        sa.Column('modelo', sa.String(), nullable=False),
+        sa.Column('ano', sa.Integer(), nullable=False),
+        sa.Column('cor', sa.String(), nullable=True),
+        sa.Column('km', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_veiculos_id'), 'veiculos', ['id'], unique=False)
+        op.create_index(op.f('ix_veiculos_placa'), 'veiculos', ['placa'], unique=True)
+    if not inspector.has_table('relatorios'):
+        op.create_table('relatorios',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('veiculo_id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('inspecao_id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.Date(), nullable=False),
+        sa.Column('resultado', sa.String(), nullable=False),
+        sa.Column('arquivo_pdf', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['inspecao_id'], ['inspecoes.id'], ),
+        sa.ForeignKeyConstraint(['usuario_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['veiculo_id'], ['veiculos.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_relatorios_id'), 'relatorios', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_relatorios_id'), table_name='relatorios')
+    op.drop_table('relatorios')
+    op.drop_index(op.f('ix_veiculos_placa'), table_name='veiculos')
+    op.drop_index(op.f('ix_veiculos_id'), table_name='veiculos')
+    op.drop_table('veiculos')
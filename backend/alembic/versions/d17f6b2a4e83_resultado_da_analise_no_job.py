@@ -0,0 +1,25 @@
+"""Resultado da análise do Micro IA no próprio job
+
+Revision ID: d17f6b2a4e83
+Revises: a93e5d0c7b41
+Create Date: 2026-10-18 18:44:09.152730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd17f6b2a4e83'
+down_revision = 'a93e5d0c7b41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # inspecoes.resultado fica só com as notas do inspetor
+    op.add_column('analise_jobs', sa.Column('resultado', sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('analise_jobs', 'resultado')
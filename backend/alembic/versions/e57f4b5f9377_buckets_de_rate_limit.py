@@ -0,0 +1,53 @@
+"""Tabela UNLOGGED de buckets do rate limit compartilhado
+
+Revision ID: e57f4b5f9377
+Revises: 2f01f331bdf3
+Create Date: 2026-10-18 16:05:44.270391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e57f4b5f9377'
+down_revision = '2f01f331bdf3'
+branch_labels = None
+depends_on = None
+
+# Recarrega o bucket pelo tempo decorrido e consome `custo` tokens num único upsert atômico
+FUNCAO_CONSUMIR = """
+CREATE OR REPLACE FUNCTION rate_limit_consumir(
+    p_chave text, p_rajada float8, p_taxa float8, p_custo float8,
+    OUT o_permitido boolean, OUT o_tokens float8
+)
+LANGUAGE sql AS $$
+    INSERT INTO rate_limit_buckets AS b (chave, tokens, atualizado_em, permitido)
+    VALUES (p_chave, p_rajada - p_custo, extract(epoch FROM clock_timestamp()), true)
+    ON CONFLICT (chave) DO UPDATE SET
+        permitido = LEAST(p_rajada, b.tokens + (EXCLUDED.atualizado_em - b.atualizado_em) * p_taxa) >= p_custo,
+        tokens = LEAST(p_rajada, b.tokens + (EXCLUDED.atualizado_em - b.atualizado_em) * p_taxa)
+            - CASE WHEN LEAST(p_rajada, b.tokens + (EXCLUDED.atualizado_em - b.atualizado_em) * p_taxa) >= p_custo
+                   THEN p_custo ELSE 0 END,
+        atualizado_em = EXCLUDED.atualizado_em
+    RETURNING b.permitido, b.tokens
+$$
+"""
+
+
+def upgrade():
+    op.create_table(
+        'rate_limit_buckets',
+        sa.Column('chave', sa.String(length=200), nullable=False),
+        sa.Column('tokens', sa.Float(), nullable=False),
+        sa.Column('atualizado_em', sa.Float(), nullable=False),
+        sa.Column('permitido', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('chave'),
+        prefixes=['UNLOGGED'],
+    )
+    op.execute(FUNCAO_CONSUMIR)
+
+
+def downgrade():
+    op.execute("DROP FUNCTION IF EXISTS rate_limit_consumir(text, float8, float8, float8)")
+    op.drop_table('rate_limit_buckets')
@@ -0,0 +1,37 @@
+"""Índice de inspeções por usuário (exportação em streaming)
+
+Revision ID: e8a4f2c6b1d3
+Revises: b5c2e7f91d06
+Create Date: 2026-10-18 21:14:06.582913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a4f2c6b1d3'
+down_revision = 'b5c2e7f91d06'
+branch_labels = None
+depends_on = None
+
+INDICE = 'ix_inspecoes_usuario_email_id'
+
+
+def upgrade():
+    # GET /inspecoes/export filtra por usuario_email e ordena por id; sem isso era Seq Scan
+    with op.get_context().autocommit_block():
+        # Um CREATE INDEX CONCURRENTLY interrompido deixa o índice INVALID, que o IF NOT EXISTS pularia
+        invalido = op.get_bind().execute(sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :nome AND NOT i.indisvalid"
+        ), {"nome": INDICE}).first()
+        if invalido:
+            op.drop_index(INDICE, table_name='inspecoes', postgresql_concurrently=True)
+        op.create_index(INDICE, 'inspecoes', ['usuario_email', 'id'],
+                        unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(INDICE, table_name='inspecoes', postgresql_concurrently=True, if_exists=True)
@@ -1,7 +1,7 @@
 """Recriando estrutura do banco
 
 Revision ID: f2160700fcc1
-Revises: 
+Revises: 0b7d3c1e9a52
 Create Date: 2025-03-11 20:47:47.213108
 
 """
@@ -11,7 +11,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'f2160700fcc1'
-down_revision = None
+down_revision = '0b7d3c1e9a52'
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,48 @@
+"""Comandos administrativos. DDL só acontece por aqui, nunca no boot da API.
+
+    python -m app.cli migrate       # alembic upgrade head
+    python -m app.cli check         # compara a revisão do banco com o head
+
+Banco novo (inclusive em desenvolvimento) também sobe com `migrate`: a primeira migração
+cria `users` e c4a81e2f7d90 cria `veiculos` e `relatorios` (antes só o create_all do boot
+as criava; ambas pulam tabelas que já existem). As migrações também criam extensões
+(pg_trgm) e funções SQL (normalizar_placa, rate_limit_consumir) que o metadata dos
+modelos não descreve, então não há atalho via create_all.
+"""
+import argparse
+import asyncio
+import sys
+from alembic import command
+from app.database import async_engine
+from app.utils.schema import alembic_config, verificar_schema, SchemaDesatualizado
+
+
+def migrate(_args):
+    command.upgrade(alembic_config(), "head")
+
+
+def check(_args):
+    async def _verificar():
+        async with async_engine.connect() as conn:
+            await verificar_schema(conn)
+        await async_engine.dispose()
+
+    try:
+        asyncio.run(_verificar())
+    except SchemaDesatualizado as exc:
+        print(exc, file=sys.stderr)
+        sys.exit(1)
+    print("Schema em dia.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("migrate", help="aplica as migrações pendentes").set_defaults(func=migrate)
+    sub.add_parser("check", help="confere se o banco está no head das migrações").set_defaults(func=check)
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
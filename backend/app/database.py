@@ -4,15 +4,54 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 import os
+import time
+from app.core.config import (
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+)
 
 # Carregar variáveis de ambiente do .env
 load_dotenv()
 
 # Configuração do banco de dados PostgreSQL via .env
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Réplicas de leitura opcionais, separadas por vírgula (mesmo formato do DATABASE_URL)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+
+def criar_engine_async(url: str, pool_size: int = DB_POOL_SIZE):
+    return create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        pool_size=pool_size,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={"statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+    )
+
 
 # 🔹 Criando a conexão assíncrona para FastAPI
-async_engine = create_async_engine(DATABASE_URL, echo=False, future=True)
+_inicio = time.perf_counter()
+async_engine = criar_engine_async(DATABASE_URL)
+ENGINE_CREATE_SECONDS = time.perf_counter() - _inicio  # registrado no boot
+
+# 🔹 Estatísticas do pool para dimensionamento (usado pelo /health/db)
+def pool_status(engine=None) -> dict:
+    pool = (engine or async_engine).pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": DB_MAX_OVERFLOW,
+    }
 
 # 🔹 Criando a conexão síncrona para Alembic
 SYNC_DATABASE_URL = DATABASE_URL.replace("asyncpg", "psycopg2")
@@ -1,10 +1,44 @@
+import time
+_inicio_imports = time.perf_counter()
+
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import auth, users, agenda, inspecoes, cameras, veiculos, relatorios
-from app.database import async_engine as engine, Base  # ✅ Agora `engine` aponta para `async_engine`
+from fastapi.responses import PlainTextResponse
+from app.routes import auth, users, agenda, inspecoes, cameras, veiculos, relatorios, health, events, patios
+from app.database import async_engine as engine, ENGINE_CREATE_SECONDS, pool_status  # ✅ Agora `engine` aponta para `async_engine`
+from app.utils.security import shutdown_hash_executor
+from app.utils.microservices import start_clients, close_clients
+from app.utils.pdf_reports import shutdown_pdf_executor
+from app.utils.ai_queue import analise_worker
+from app.utils.events import event_hub
+from app.utils.invalidation import invalidation_bus
+from app.core.config import INVALIDATION_BUS_ENABLED, SCHEMA_CHECK, RATE_LIMIT_ENABLED
+from app.utils.schema import verificar_schema, SchemaDesatualizado, SchemaAusente
+from app.utils import metrics
+from app.utils.principal_cache import principal_cache
+from app.utils.rate_limit import RateLimitMiddleware, RegraLimite, Limite, criar_store
+from app.utils.replicas import replica_engines, replica_monitor, ReadYourWritesMiddleware
+
+IMPORTS_SECONDS = time.perf_counter() - _inicio_imports
+logger = logging.getLogger("uvicorn.error")  # aparece no log do uvicorn sem configuração extra
 
 app = FastAPI()
 
+# 🔹 Limites por rota: (método, caminho) -> buckets por IP e/ou por e-mail do corpo
+# Registrado antes do CORS para que o 429 também receba os cabeçalhos de CORS
+REGRAS_RATE_LIMIT = {
+    ("POST", "/api/auth/login"): RegraLimite(ip=Limite(30, 60), email=Limite(5, 60)),
+    ("POST", "/api/auth/register"): RegraLimite(ip=Limite(10, 3600), email=Limite(3, 3600)),
+}
+rate_limit_store = criar_store(engine)
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, regras=REGRAS_RATE_LIMIT, store=rate_limit_store)
+
+# 🔹 Com réplicas de leitura, o cliente que acabou de escrever lê do primário por alguns segundos
+if replica_engines:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 # Configuração do middleware CORS (corrigido especificamente para sua origem)
 app.add_middleware(
     CORSMiddleware,
@@ -17,14 +51,56 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # 🔹 Cursor da próxima página nas listagens e versão dos detalhes
 )
 
-# Criação das tabelas no banco ao iniciar
+# 🔹 Latência por rota, consultas SQL por requisição e chamadas externas (expostas em /metrics)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrumentar_engine(engine)
+for replica in replica_engines:
+    metrics.instrumentar_engine(replica)
+metrics.registrar_coletor(lambda: metrics.gauge_linhas("db_pool", "Estado do pool de conexões", pool_status(), "estado"))
+metrics.registrar_coletor(lambda: metrics.gauge_linhas("streams_cache", "Cache da listagem /streams", cameras.stream_cache.estatisticas(), "contador"))
+metrics.registrar_coletor(lambda: metrics.gauge_linhas("principal_cache", "Cache de usuário autenticado", principal_cache.estatisticas(), "contador"))
+metrics.registrar_coletor(lambda: metrics.gauge_linhas("rate_limit", "Buckets do rate limit", rate_limit_store.estatisticas(), "contador"))
+metrics.registrar_coletor(lambda: metrics.gauge_linhas("db_replica_lag_seconds", "Atraso de replicação (-1 = inacessível)", replica_monitor.estatisticas(), "replica"))
+metrics.registrar_coletor(lambda: metrics.gauge_linhas("sse_clients", "Clientes conectados em /api/events", {"conectados": event_hub.conectados}))
+
+# 🔹 Boot rápido: sem DDL (use `python -m app.cli migrate`), só confere a revisão do Alembic
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        # pass
-        await conn.run_sync(Base.metadata.create_all, checkfirst=True)  # 🔹 Adicionando checkfirst=True
+    logger.info("Boot: imports %.3fs, criação do engine %.3fs", IMPORTS_SECONDS, ENGINE_CREATE_SECONDS)
+
+    inicio = time.perf_counter()
+    async with engine.connect() as conn:
+        conectado = time.perf_counter()
+        if SCHEMA_CHECK != "off":
+            try:
+                await verificar_schema(conn)
+            except SchemaDesatualizado as exc:
+                # Banco vazio não tem o que servir: mesmo no modo "warn" o boot falha
+                if SCHEMA_CHECK == "strict" or isinstance(exc, SchemaAusente):
+                    raise
+                logger.warning("Boot: %s", exc)
+    verificado = time.perf_counter()
+    logger.info("Boot: primeira conexão %.3fs, verificação do schema %.3fs", conectado - inicio, verificado - conectado)
+
+    await start_clients()  # 🔹 Pool HTTP compartilhado com os microsserviços
+    analise_worker.start()  # 🔹 Consumidor da fila de análises no Micro IA
+    if INVALIDATION_BUS_ENABLED:
+        invalidation_bus.start()  # 🔹 Invalidação de caches entre workers via LISTEN/NOTIFY
+    replica_monitor.start()  # 🔹 Mede o atraso das réplicas de leitura (se configuradas)
+    logger.info("Boot: serviços em segundo plano %.3fs", time.perf_counter() - verificado)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await analise_worker.stop()
+    await event_hub.stop()
+    await invalidation_bus.stop()
+    await replica_monitor.stop()
+    shutdown_hash_executor()
+    await close_clients()
+    shutdown_pdf_executor()
 
 # Inclusão das rotas existentes
 app.include_router(auth.router, prefix="/api", tags=["Auth"])
@@ -34,8 +110,15 @@ app.include_router(inspecoes.router, prefix="/api", tags=["Inspeções"])
 app.include_router(cameras.router, prefix="/api", tags=["Câmeras"])
 app.include_router(veiculos.router, prefix="/api", tags=["Veículos"])	
 app.include_router(relatorios.router, prefix="/api", tags=["Relatórios"])	
+app.include_router(patios.router, prefix="/api", tags=["Pátios"])
+app.include_router(events.router, prefix="/api", tags=["Eventos"])
+app.include_router(health.router)
 
 @app.get("/ping")
 async def ping():
     return {"message": "API VistoTrack está online!"}
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
@@ -1,25 +1,44 @@
-from sqlalchemy import Column, Integer, String, Date, Time, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, Time, ForeignKey, Text, Index, Float, Boolean, func
 from .database import Base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
+from app.utils.placa import normalizar_placa
 
 # 🔹 Base de Usuário: Campos comuns para reaproveitamento
 class Veiculo(Base):
     __tablename__ = "veiculos"
+    __table_args__ = (
+        Index("ix_veiculos_usuario_id_id", "usuario_id", "id"),  # 🔹 Listagem paginada por usuário
+        Index("ix_veiculos_placa_norm_trgm", "placa_norm", postgresql_using="gin", postgresql_ops={"placa_norm": "gin_trgm_ops"}),
+        # ix_veiculos_placa_limpa_trgm (gin em limpar_placa(placa)) só existe na migração a93e5d0c7b41
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     usuario_id = Column(Integer, ForeignKey("users.id"))
     placa = Column(String, unique=True, index=True, nullable=False)
+    placa_norm = Column(String, index=True, nullable=True)  # 🔹 Preenchida a partir de `placa` (mesmo tipo)
     modelo = Column(String, nullable=False)
     ano = Column(Integer, nullable=False)
     cor = Column(String, nullable=True)
     km = Column(Integer, nullable=True)
+    versao = Column(Integer, nullable=False, server_default="1")  # 🔹 Incrementada a cada UPDATE pelo ORM (ETag)
 
     usuario = relationship("User", back_populates="veiculos")
     relatorios = relationship("Relatorio", back_populates="veiculo", cascade="all, delete-orphan")
 
+    __mapper_args__ = {"version_id_col": versao}
+
+    @validates("placa")
+    def _normalizar_placa(self, key, placa):
+        self.placa_norm = normalizar_placa(placa)
+        return placa
+
 
 class Relatorio(Base):
     __tablename__ = "relatorios"
+    __table_args__ = (
+        Index("ix_relatorios_usuario_id_inspecao_id", "usuario_id", "inspecao_id"),
+        Index("ix_relatorios_usuario_id_data_id", "usuario_id", "data", "id"),  # 🔹 Listagem paginada por data
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     veiculo_id = Column(Integer, ForeignKey("veiculos.id"), nullable=False)
@@ -28,11 +47,14 @@ class Relatorio(Base):
     data = Column(Date, nullable=False)
     resultado = Column(String, nullable=False)
     arquivo_pdf = Column(String, nullable=True)
+    versao = Column(Integer, nullable=False, server_default="1")  # 🔹 Incrementada a cada UPDATE pelo ORM (ETag)
 
     veiculo = relationship("Veiculo", back_populates="relatorios")
     usuario = relationship("User")
     inspecao = relationship("Inspecao")
 
+    __mapper_args__ = {"version_id_col": versao}
+
 
 
 class User(Base):
@@ -53,7 +75,11 @@ class User(Base):
 
 class Agendamento(Base):
     __tablename__ = "agendamentos"
-    __table_args__ = {"extend_existing": True}  # 🔹 Garante que a tabela não será redefinida
+    __table_args__ = (
+        Index("ix_agendamentos_usuario_status_data", "usuario_id", "status", "data"),  # 🔹 Atende o /agenda/resumo
+        Index("ix_agendamentos_local_data_horario", "local", "data", "horario"),  # 🔹 Ocupação dos slots
+        {"extend_existing": True},  # 🔹 Garante que a tabela não será redefinida
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     usuario_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -65,19 +91,66 @@ class Agendamento(Base):
     usuario = relationship("User", back_populates="agendamentos")
 
 
+# 🔹 Resumo materializado da agenda por usuário (atualizado a cada escrita em agendamentos)
+class AgendaResumo(Base):
+    __tablename__ = "agenda_resumos"
+
+    usuario_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    pendentes = Column(Integer, nullable=False, default=0)
+    concluidos = Column(Integer, nullable=False, default=0)
+    ultimo_agendamento = Column(Date, nullable=True)
+
+
 class Inspecao(Base):
     __tablename__ = "inspecoes"
-    __table_args__ = {"extend_existing": True}  # 🔹 Garante que a tabela não será redefinida
+    __table_args__ = (
+        Index("ix_inspecoes_status_id", "status", "id"),
+        Index("ix_inspecoes_patio_id_status", "patio_id", "status"),  # 🔹 Varredura do canal de eventos
+        Index("ix_inspecoes_usuario_email_id", "usuario_email", "id"),  # 🔹 Exportação por usuário
+        Index("ix_inspecoes_placa_norm_data", "placa_norm", "data"),  # 🔹 Histórico por placa
+        Index("ix_inspecoes_placa_norm_trgm", "placa_norm", postgresql_using="gin", postgresql_ops={"placa_norm": "gin_trgm_ops"}),
+        {"extend_existing": True},  # 🔹 Garante que a tabela não será redefinida
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     usuario_email = Column(String, ForeignKey("users.email"), nullable=False)
     data = Column(Date, nullable=False)
     placa = Column(String(10), nullable=False)
+    placa_norm = Column(String(10), nullable=True)  # 🔹 Preenchida a partir de `placa`, String(10) como ela
     status = Column(String(20), default="Pendente")
     resultado = Column(Text, nullable=True)  # Adicionando campo para resultado da inspeção
     patio_id = Column(Integer, ForeignKey("patios.id"), nullable=False)  # Relacionando com pátio
+    versao = Column(Integer, nullable=False, server_default="1")  # 🔹 Incrementada a cada UPDATE pelo ORM (ETag)
+
+    patio = relationship("Patio", back_populates="inspecoes")
 
-    patio = relationship("Patio")
+    __mapper_args__ = {"version_id_col": versao}
+
+    @validates("placa")
+    def _normalizar_placa(self, key, placa):
+        self.placa_norm = normalizar_placa(placa)
+        return placa
+
+
+# 🔹 Fila durável de análises no Micro IA (consumida com FOR UPDATE SKIP LOCKED)
+class AnaliseJob(Base):
+    __tablename__ = "analise_jobs"
+    __table_args__ = (
+        Index("ix_analise_jobs_status_disponivel_em", "status", "disponivel_em"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    inspecao_id = Column(Integer, ForeignKey("inspecoes.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pendente")  # pendente | processando | concluido | dead
+    payload = Column(Text, nullable=True)  # JSON enviado ao Micro IA (frames ou stream)
+    tentativas = Column(Integer, nullable=False, default=0)
+    max_tentativas = Column(Integer, nullable=False, default=5)
+    erro = Column(Text, nullable=True)
+    resultado = Column(Text, nullable=True)  # resposta do Micro IA (as notas do inspetor ficam em Inspecao.resultado)
+    disponivel_em = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    bloqueado_ate = Column(DateTime(timezone=True), nullable=True)  # prazo do worker que reivindicou o job
+    criado_em = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    atualizado_em = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
 
 class Patio(Base):
@@ -86,10 +159,11 @@ class Patio(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(100), nullable=False)
-    usuario_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     usuario = relationship("User", back_populates="patios")
     cameras = relationship("Camera", back_populates="patio", cascade="all, delete-orphan")
+    inspecoes = relationship("Inspecao", back_populates="patio")
 
 
 class Camera(Base):
@@ -99,6 +173,18 @@ class Camera(Base):
     id = Column(Integer, primary_key=True, index=True)
     tipo = Column(String(50), nullable=False)
     rtmp_url = Column(String(255), nullable=False)
-    patio_id = Column(Integer, ForeignKey("patios.id"), nullable=False)
+    patio_id = Column(Integer, ForeignKey("patios.id"), nullable=False, index=True)
 
     patio = relationship("Patio", back_populates="cameras")
+
+
+# 🔹 Token buckets do rate limit compartilhados entre nós (RATE_LIMIT_BACKEND=postgres)
+# UNLOGGED: sem WAL, então o estado some num crash — aceitável para contadores de curta duração
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    chave = Column(String(200), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    atualizado_em = Column(Float, nullable=False)  # epoch em segundos, pelo relógio do banco
+    permitido = Column(Boolean, nullable=False, default=True)  # resultado do último consumo
@@ -1,42 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.database import get_db
-from app.models import Agendamento, User
+from app.utils.replicas import get_db_leitura
+from app.models import Agendamento, AgendaResumo
 from app.schemas import AgendamentoCreate, AgendamentoResponse
 from app.utils.security import get_current_user
-from typing import List  # 🔹 Importando List corretamente
+from app.utils.principal_cache import Principal
+from app.utils.pagination import Paginacao
+from app.utils.disponibilidade import disponibilidade, reservar_slot
+from datetime import date, time
+from typing import List, Optional  # 🔹 Importando List corretamente
 
 router = APIRouter(prefix="/agenda", tags=["Agenda"])
 
+# Namespace dos advisory locks do resumo (primeiro argumento do pg_advisory_xact_lock)
+LOCK_RESUMO_AGENDA = 1001
+
+# 🔹 Um único agregado (coberto por ix_agendamentos_usuario_status_data); também usado pelo benchmarks.explain
+def stmt_resumo(usuario_id: int):
+    return select(
+        func.count().filter(Agendamento.status == "Pendente"),
+        func.count().filter(Agendamento.status == "Concluído"),
+        func.max(Agendamento.data),
+    ).where(Agendamento.usuario_id == usuario_id)
+
+# 🔹 Recalcula o resumo materializado dentro da transação da escrita
+async def _atualizar_resumo(db: AsyncSession, usuario_id: int):
+    await db.flush()
+    # Serializa escritas do mesmo usuário para o agregado não ficar defasado
+    await db.execute(select(func.pg_advisory_xact_lock(LOCK_RESUMO_AGENDA, usuario_id)))
+    pendentes, concluidos, ultimo = (await db.execute(stmt_resumo(usuario_id))).one()
+    valores = {"pendentes": pendentes, "concluidos": concluidos, "ultimo_agendamento": ultimo}
+    stmt = pg_insert(AgendaResumo).values(usuario_id=usuario_id, **valores)
+    await db.execute(stmt.on_conflict_do_update(index_elements=[AgendaResumo.usuario_id], set_=valores))
+
+def stmt_listagem(
+    usuario_id: int,
+    pagina: Paginacao,
+    status: Optional[str] = None,
+    local: Optional[str] = None,
+    data_de: Optional[date] = None,
+    data_ate: Optional[date] = None,
+):
+    stmt = select(Agendamento).where(Agendamento.usuario_id == usuario_id)
+    if status:
+        stmt = stmt.where(Agendamento.status == status)
+    if local:
+        stmt = stmt.where(Agendamento.local == local)
+    if data_de:
+        stmt = stmt.where(Agendamento.data >= data_de)
+    if data_ate:
+        stmt = stmt.where(Agendamento.data <= data_ate)
+    return pagina.aplicar(stmt, Agendamento.data, Agendamento.id)
+
 @router.get("/", response_model=List[AgendamentoResponse])
 async def listar_agendamentos(
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    status: Optional[str] = None,
+    local: Optional[str] = None,
+    data_de: Optional[date] = None,
+    data_ate: Optional[date] = None,
+    pagina: Paginacao = Depends(),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_leitura)
 ):
-    user_stmt = select(User.id).where(User.email == current_user["email"])
-    user_result = await db.execute(user_stmt)
-    user_id = user_result.scalar()
-
-    if not user_id:
-        raise HTTPException(status_code=404, detail="Usuário não encontrado")
-
-    stmt = select(Agendamento).where(Agendamento.usuario_id == user_id)
-    result = await db.execute(stmt)
+    result = await db.execute(stmt_listagem(current_user.id, pagina, status, local, data_de, data_ate))
     agendamentos = result.scalars().all()
 
-    return agendamentos
+    return pagina.pagina(agendamentos, response)
+
 
+# 🔹 Slots livres de um local numa faixa de datas (uma consulta agregada)
+@router.get("/disponibilidade")
+async def consultar_disponibilidade(
+    local: str,
+    de: date,
+    ate: Optional[date] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_leitura)
+):
+    return await disponibilidade(db, local, de, ate or de)
 
 
 @router.post("/", response_model=AgendamentoResponse)
 async def criar_agendamento(
     agendamento: AgendamentoCreate,
-    current_user: dict = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    novo_agendamento = Agendamento(**agendamento.dict(), email_condutor=current_user["email"])
+    await reservar_slot(db, agendamento.local, agendamento.data, agendamento.horario)
+    novo_agendamento = Agendamento(**agendamento.dict(), usuario_id=current_user.id)
     db.add(novo_agendamento)
+    await _atualizar_resumo(db, current_user.id)
     await db.commit()
     await db.refresh(novo_agendamento)
     return novo_agendamento
@@ -46,12 +104,12 @@ async def criar_agendamento(
 async def reagendar_agendamento(
     agendamento_id: int,
     data_nova: dict,
-    current_user: dict = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     stmt = select(Agendamento).where(
         Agendamento.id == agendamento_id,
-        Agendamento.email_condutor == current_user["email"]
+        Agendamento.usuario_id == current_user.id
     )
     result = await db.execute(stmt)
     agendamento = result.scalars().first()
@@ -59,7 +117,16 @@ async def reagendar_agendamento(
     if not agendamento:
         raise HTTPException(status_code=404, detail="Agendamento não encontrado")
 
-    agendamento.data = data_nova["data"]
+    try:
+        nova_data = date.fromisoformat(str(data_nova["data"]))
+        novo_horario = time.fromisoformat(str(data_nova["horario"])) if data_nova.get("horario") else agendamento.horario
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Informe 'data' (AAAA-MM-DD) e, opcionalmente, 'horario' (HH:MM)")
+
+    await reservar_slot(db, agendamento.local, nova_data, novo_horario, ignorar_id=agendamento.id)
+    agendamento.data = nova_data
+    agendamento.horario = novo_horario
+    await _atualizar_resumo(db, current_user.id)
     await db.commit()
     await db.refresh(agendamento)
     return {"message": "Agendamento atualizado com sucesso"}
@@ -68,12 +135,12 @@ async def reagendar_agendamento(
 @router.delete("/{agendamento_id}")
 async def cancelar_agendamento(
     agendamento_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     stmt = select(Agendamento).where(
         Agendamento.id == agendamento_id,
-        Agendamento.email_condutor == current_user["email"]
+        Agendamento.usuario_id == current_user.id
     )
     result = await db.execute(stmt)
     agendamento = result.scalars().first()
@@ -82,28 +149,24 @@ async def cancelar_agendamento(
         raise HTTPException(status_code=404, detail="Agendamento não encontrado")
 
     await db.delete(agendamento)
+    await _atualizar_resumo(db, current_user.id)
     await db.commit()
     return {"message": "Agendamento cancelado com sucesso"}
 
 
 @router.get("/resumo")
 async def resumo_agendamentos(
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_leitura)
 ):
-    user_stmt = select(User.id).where(User.email == current_user["email"])
-    user_result = await db.execute(user_stmt)
-    user_id = user_result.scalar()
-
-    if not user_id:
-        raise HTTPException(status_code=404, detail="Usuário não encontrado")
-
-    stmt = select(Agendamento).where(Agendamento.usuario_id == user_id)
-    result = await db.execute(stmt)
-    agendamentos = result.scalars().all()
+    resumo = await db.get(AgendaResumo, current_user.id)
+    if resumo is not None:
+        pendentes, concluidos, ultimo = resumo.pendentes, resumo.concluidos, resumo.ultimo_agendamento
+    else:
+        pendentes, concluidos, ultimo = (await db.execute(stmt_resumo(current_user.id))).one()
 
     return {
-        "pendentes": sum(1 for a in agendamentos if a.status == "Pendente"),
-        "concluidos": sum(1 for a in agendamentos if a.status == "Concluído"),
-        "ultimo_agendamento": max((a.data for a in agendamentos), default="Nenhum agendamento encontrado")
+        "pendentes": pendentes,
+        "concluidos": concluidos,
+        "ultimo_agendamento": ultimo or "Nenhum agendamento encontrado"
     }
\ No newline at end of file
@@ -4,7 +4,7 @@ from sqlalchemy.future import select
 from app.database import get_db
 from app.models import User
 from app.schemas import UserLogin, TokenResponse, UserCreate
-from app.utils.security import verify_password, create_access_token, hash_password
+from app.utils.security import verify_password_async, create_access_token, hash_password_async
 from datetime import timedelta
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -20,7 +20,7 @@ async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     if existing_user.scalar():
         raise HTTPException(status_code=400, detail="Usuário já cadastrado")
 
-    hashed_password = hash_password(user.senha)
+    hashed_password = await hash_password_async(user.senha)
     new_user = User(nome=user.nome, email=user.email, telefone=user.telefone, senha=hashed_password)
 
     db.add(new_user)
@@ -49,7 +49,7 @@ async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
             detail="Usuário não encontrado"
         )
 
-    if not verify_password(user_data.senha, existing_user.senha):
+    if not await verify_password_async(user_data.senha, existing_user.senha):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Senha incorreta"
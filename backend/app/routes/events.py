@@ -0,0 +1,139 @@
+import asyncio
+import json
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import EVENTS_HEARTBEAT, EVENTS_TICKET_SECONDS
+from app.database import get_db, AsyncSessionLocal
+from app.models import Inspecao
+from app.routes.cameras import stream_cache, stmt_patios_do_usuario
+from app.utils.events import event_hub
+from app.utils.principal_cache import Principal
+from app.utils.security import get_current_user, get_current_user_sse, criar_ticket_sse
+
+router = APIRouter(tags=["Eventos"])
+
+# 🔹 Fontes do poller único: comparam o estado atual com a última varredura
+_streams_anteriores = None
+_inspecoes_ativas = None
+_patios_varridos = set()
+
+
+def _chave_stream(stream: dict):
+    return stream.get("camera_id") or stream.get("id") or json.dumps(stream, sort_keys=True)
+
+
+async def _eventos_cameras() -> list:
+    global _streams_anteriores
+    dados = await stream_cache.obter()
+    atuais = {_chave_stream(s): s for s in dados.get("streams", [])}
+    anteriores, _streams_anteriores = _streams_anteriores, atuais
+    if anteriores is None:
+        return []
+    eventos = []
+    for chave, stream in atuais.items():
+        if chave not in anteriores:
+            eventos.append({"tipo": "camera_online", "patio_id": stream.get("patio_id"), "stream": stream})
+        elif stream != anteriores[chave]:
+            eventos.append({"tipo": "camera_status", "patio_id": stream.get("patio_id"), "stream": stream})
+    for chave, stream in anteriores.items():
+        if chave not in atuais:
+            eventos.append({"tipo": "camera_offline", "patio_id": stream.get("patio_id"), "stream": stream})
+    return eventos
+
+
+def stmt_varredura_inspecoes(patio_ids, anteriores=None):
+    """Inspeções em aberto dos pátios assinados e as que estavam em aberto na varredura anterior."""
+    filtro = and_(Inspecao.status != "Concluída", Inspecao.patio_id.in_(list(patio_ids)))
+    if anteriores:
+        filtro = or_(filtro, Inspecao.id.in_(list(anteriores)))
+    return select(Inspecao.id, Inspecao.status, Inspecao.patio_id).where(filtro)
+
+
+async def _eventos_inspecoes() -> list:
+    global _inspecoes_ativas, _patios_varridos
+    anteriores = _inspecoes_ativas or {}
+    # Só os pátios de quem está conectado; os demais tenants não entram na varredura
+    patios = event_hub.patios_assinados()
+    if patios or anteriores:
+        async with AsyncSessionLocal() as session:
+            linhas = (await session.execute(stmt_varredura_inspecoes(patios, anteriores))).all()
+    else:
+        linhas = []
+
+    primeira = _inspecoes_ativas is None
+    patios_anteriores, _patios_varridos = _patios_varridos, patios
+    _inspecoes_ativas = {
+        linha.id: linha.status for linha in linhas if linha.status != "Concluída" and linha.patio_id in patios
+    }
+    if primeira:
+        return []
+    # Pátio que acabou de ganhar assinante: a primeira varredura dele é só a base
+    return [
+        {"tipo": "inspecao_status", "patio_id": linha.patio_id, "inspecao_id": linha.id, "status": linha.status}
+        for linha in linhas
+        if anteriores.get(linha.id) != linha.status and linha.patio_id in patios_anteriores
+    ]
+
+
+def registrar_inspecao(inspecao_id: int, status: str, patio_id: int):
+    """Publica na hora uma mudança feita neste processo (o poller cobre os demais workers)."""
+    if _inspecoes_ativas is not None:
+        if status == "Concluída":
+            _inspecoes_ativas.pop(inspecao_id, None)
+        else:
+            _inspecoes_ativas[inspecao_id] = status
+    event_hub.publicar({"tipo": "inspecao_status", "patio_id": patio_id, "inspecao_id": inspecao_id, "status": status})
+
+
+def _reiniciar_cameras():
+    global _streams_anteriores
+    _streams_anteriores = None
+
+
+def _reiniciar_inspecoes():
+    global _inspecoes_ativas, _patios_varridos
+    _inspecoes_ativas = None
+    _patios_varridos = set()
+
+
+event_hub.registrar_fonte(_eventos_cameras, _reiniciar_cameras)
+event_hub.registrar_fonte(_eventos_inspecoes, _reiniciar_inspecoes)
+
+
+@router.post("/events/ticket")
+async def ticket_eventos(usuario: Principal = Depends(get_current_user)):
+    """Ticket de curta duração para `new EventSource("/api/events?ticket=...")`.
+
+    Vale só para abrir a conexão: para reconectar depois de EVENTS_TICKET_SECONDS peça outro.
+    """
+    return {"ticket": criar_ticket_sse(usuario), "expira_em": EVENTS_TICKET_SECONDS}
+
+
+@router.get("/events")
+async def eventos(request: Request, usuario: Principal = Depends(get_current_user_sse), db: AsyncSession = Depends(get_db)):
+    """Server-sent events de câmeras e inspeções dos pátios do usuário (Bearer ou ?ticket=)."""
+    patio_ids = (await db.execute(stmt_patios_do_usuario(usuario.id))).scalars().all()
+    # Devolve a conexão ao pool: a resposta fica aberta enquanto o cliente estiver conectado
+    await db.close()
+
+    async def gerar():
+        # Assina só quando o corpo começa a ser enviado: se o cliente cair antes, o
+        # gerador nunca roda e não sobra assinante (nem poller) sem o `finally`
+        assinante = event_hub.assinar(patio_ids)
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    evento = await asyncio.wait_for(assinante.fila.get(), timeout=EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {evento['tipo']}\ndata: {json.dumps(evento, default=str)}\n\n"
+        finally:
+            event_hub.cancelar(assinante)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(gerar(), media_type="text/event-stream", headers=headers)
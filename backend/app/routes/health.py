@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, pool_status
+from app.utils.replicas import replica_monitor
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+@router.get("/db")
+async def health_db(db: AsyncSession = Depends(get_db)):
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception:
+        raise HTTPException(status_code=503, detail={"status": "erro", "pool": pool_status()})
+    resposta = {"status": "ok", "pool": pool_status()}
+    if replica_monitor.engines:
+        # Atraso em segundos (None = inacessível) e quantas estão recebendo leituras
+        resposta["replicas"] = {
+            "atrasos": replica_monitor.atrasos,
+            "em_uso": len(replica_monitor.saudaveis),
+            "pools": [pool_status(engine) for engine in replica_monitor.engines],
+        }
+    return resposta
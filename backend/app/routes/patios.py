@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.utils.replicas import get_db_leitura
+from app.models import Patio
+from app.schemas import PatioResponse, PatioDetalhe
+from app.utils.security import get_current_user
+from app.utils.principal_cache import Principal
+from app.utils.load_profiles import PATIO_COM_CAMERAS_E_INSPECOES
+from typing import List
+
+router = APIRouter(prefix="/patios", tags=["Pátios"])
+
+@router.get("/", response_model=List[PatioResponse])
+async def listar_patios(db: AsyncSession = Depends(get_db_leitura), usuario: Principal = Depends(get_current_user)):
+    result = await db.execute(select(Patio).where(Patio.usuario_id == usuario.id).order_by(Patio.id))
+    return result.scalars().all()
+
+# 🔹 Pátio com câmeras e inspeções em aberto, em 3 consultas fixas
+@router.get("/{patio_id}", response_model=PatioDetalhe)
+async def obter_patio(patio_id: int, db: AsyncSession = Depends(get_db_leitura), usuario: Principal = Depends(get_current_user)):
+    result = await db.execute(
+        select(Patio).options(*PATIO_COM_CAMERAS_E_INSPECOES).where(Patio.id == patio_id, Patio.usuario_id == usuario.id)
+    )
+    patio = result.scalar_one_or_none()
+    if not patio:
+        raise HTTPException(status_code=404, detail="Pátio não encontrado")
+    return patio
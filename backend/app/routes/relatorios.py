@@ -1,41 +1,130 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.database import get_db
+from app.utils.replicas import get_db_leitura
 from app.models import Relatorio
-from app.schemas import RelatorioCreate, RelatorioResponse
+from app.schemas import RelatorioCreate, RelatorioResponse, RelatorioDetalhe
 from app.utils.security import get_current_user
-from app.models import User as Usuario
+from app.utils.principal_cache import Principal
+from app.utils.pagination import Paginacao
+from app.utils.export import exportar
+from app.utils import pdf_reports
+from app.utils.load_profiles import RELATORIO_COMPLETO
+from app.utils.fast_json import colunas_do_schema, resposta_linhas
+from app.core.config import FAST_JSON_LISTS
+from app.utils.conditional import CondicionalDoUsuario, CURTO
+import os
 from datetime import date
 from typing import Optional, List
 
 router = APIRouter(prefix="/relatorios", tags=["Relatórios"])
 
-@router.get("/", response_model=List[RelatorioResponse])
-async def listar_relatorios(inspecao_id: Optional[int] = None, db: AsyncSession = Depends(get_db), usuario: Usuario = Depends(get_current_user)):
+COLUNAS_RELATORIO = colunas_do_schema(Relatorio, RelatorioResponse)
+
+# 🔹 Consulta da listagem, também usada pelo benchmarks.explain
+def stmt_listagem(
+    usuario_id: int,
+    pagina: Paginacao,
+    inspecao_id: Optional[int] = None,
+    veiculo_id: Optional[int] = None,
+    data_de: Optional[date] = None,
+    data_ate: Optional[date] = None,
+):
+    stmt = select(*COLUNAS_RELATORIO) if FAST_JSON_LISTS else select(Relatorio)
+    stmt = stmt.where(Relatorio.usuario_id == usuario_id)
     if inspecao_id:
-        result = await db.execute(
-            select(Relatorio).where(
-                Relatorio.usuario_id == usuario.id,
-                Relatorio.inspecao_id == inspecao_id
-            )
-        )
-    else:
-        result = await db.execute(
-            select(Relatorio).where(Relatorio.usuario_id == usuario.id)
-        )
-    return result.scalars().all()
-
-@router.get("/{relatorio_id}", response_model=RelatorioResponse)
-async def obter_relatorio(relatorio_id: int, db: AsyncSession = Depends(get_db), usuario: Usuario = Depends(get_current_user)):
+        stmt = stmt.where(Relatorio.inspecao_id == inspecao_id)
+    if veiculo_id:
+        stmt = stmt.where(Relatorio.veiculo_id == veiculo_id)
+    if data_de:
+        stmt = stmt.where(Relatorio.data >= data_de)
+    if data_ate:
+        stmt = stmt.where(Relatorio.data <= data_ate)
+    # Mais recentes primeiro
+    return pagina.aplicar(stmt, Relatorio.data, Relatorio.id, desc=True)
+
+@router.get("/", response_model=List[RelatorioResponse])
+async def listar_relatorios(
+    response: Response,
+    inspecao_id: Optional[int] = None,
+    veiculo_id: Optional[int] = None,
+    data_de: Optional[date] = None,
+    data_ate: Optional[date] = None,
+    pagina: Paginacao = Depends(),
+    db: AsyncSession = Depends(get_db_leitura),
+    usuario: Principal = Depends(get_current_user)
+):
+    result = await db.execute(stmt_listagem(usuario.id, pagina, inspecao_id, veiculo_id, data_de, data_ate))
+    if FAST_JSON_LISTS:
+        return resposta_linhas(pagina.pagina(result.all(), response), COLUNAS_RELATORIO, response)
+    return pagina.pagina(result.scalars().all(), response)
+
+COLUNAS_EXPORTACAO = [Relatorio.id, Relatorio.veiculo_id, Relatorio.inspecao_id, Relatorio.data, Relatorio.resultado, Relatorio.arquivo_pdf]
+
+def stmt_exportacao(usuario_id: int, data_de: Optional[date] = None, data_ate: Optional[date] = None):
+    stmt = select(*COLUNAS_EXPORTACAO).where(Relatorio.usuario_id == usuario_id)
+    if data_de:
+        stmt = stmt.where(Relatorio.data >= data_de)
+    if data_ate:
+        stmt = stmt.where(Relatorio.data <= data_ate)
+    return stmt.order_by(Relatorio.id)
+
+# 🔹 Exportação em streaming (declarada antes de /{relatorio_id})
+@router.get("/export")
+async def exportar_relatorios(
+    request: Request,
+    formato: str = Query("csv", regex="^(csv|ndjson)$"),
+    data_de: Optional[date] = None,
+    data_ate: Optional[date] = None,
+    usuario: Principal = Depends(get_current_user)
+):
+    stmt = stmt_exportacao(usuario.id, data_de, data_ate)
+    return exportar(request, stmt, [c.key for c in COLUNAS_EXPORTACAO], formato, "relatorios")
+
+# Relatórios quase não mudam depois de criados: o cliente pode reutilizar por alguns segundos sem revalidar
+@router.get("/{relatorio_id}", response_model=RelatorioResponse,
+            dependencies=[Depends(CondicionalDoUsuario(Relatorio, "relatorio_id", CURTO))])
+async def obter_relatorio(relatorio_id: int, db: AsyncSession = Depends(get_db_leitura), usuario: Principal = Depends(get_current_user)):
     result = await db.execute(select(Relatorio).where(Relatorio.id == relatorio_id, Relatorio.usuario_id == usuario.id))
     relatorio = result.scalar_one_or_none()
     if not relatorio:
         raise HTTPException(status_code=404, detail="Relatório não encontrado")
     return relatorio
 
+# 🔹 Relatório com veículo e inspeção, em uma única consulta (JOIN)
+@router.get("/{relatorio_id}/detalhes", response_model=RelatorioDetalhe)
+async def obter_relatorio_detalhado(relatorio_id: int, db: AsyncSession = Depends(get_db_leitura), usuario: Principal = Depends(get_current_user)):
+    result = await db.execute(
+        select(Relatorio).options(*RELATORIO_COMPLETO).where(Relatorio.id == relatorio_id, Relatorio.usuario_id == usuario.id)
+    )
+    relatorio = result.scalar_one_or_none()
+    if not relatorio:
+        raise HTTPException(status_code=404, detail="Relatório não encontrado")
+    return relatorio
+
+# 🔹 PDF do relatório, gerado fora da requisição e servido do armazenamento por hash do conteúdo
+@router.get("/{relatorio_id}/pdf")
+async def obter_relatorio_pdf(relatorio_id: int, request: Request, db: AsyncSession = Depends(get_db_leitura), usuario: Principal = Depends(get_current_user)):
+    dados = await pdf_reports.carregar_dados(db, relatorio_id, usuario.id)
+    if dados is None:
+        raise HTTPException(status_code=404, detail="Relatório não encontrado")
+
+    hash_ = pdf_reports.hash_dados(dados)
+    etag = f'"{hash_}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    caminho = pdf_reports.caminho_pdf(relatorio_id, hash_)
+    if not os.path.exists(caminho):
+        # Dados mudaram (ou PDF ainda não existe): renderiza em segundo plano
+        pdf_reports.agendar_renderizacao(dados, hash_)
+        return Response(status_code=status.HTTP_202_ACCEPTED, headers={"Retry-After": "2"})
+
+    return pdf_reports.servir_pdf(request, caminho, etag, f"relatorio-{relatorio_id}.pdf")
+
 @router.post("/", response_model=RelatorioResponse, status_code=status.HTTP_201_CREATED)
-async def criar_relatorio(dados: RelatorioCreate, db: AsyncSession = Depends(get_db), usuario: Usuario = Depends(get_current_user)):
+async def criar_relatorio(dados: RelatorioCreate, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db), usuario: Principal = Depends(get_current_user)):
     novo = Relatorio(
         veiculo_id=dados.veiculo_id,
         usuario_id=usuario.id,
@@ -47,4 +136,5 @@ async def criar_relatorio(dados: RelatorioCreate, db: AsyncSession = Depends(get
     db.add(novo)
     await db.commit()
     await db.refresh(novo)
+    background_tasks.add_task(pdf_reports.gerar_em_segundo_plano, novo.id, usuario.id)
     return novo
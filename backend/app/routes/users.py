@@ -4,10 +4,11 @@ from app.database import get_db
 from app.models import User
 from app.schemas import UserCreate, UserResponse
 from app.utils.security import hash_password, get_current_user
+from app.utils.principal_cache import Principal
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get("/me")
-async def read_users_me(current_user: str = Depends(get_current_user)):
+async def read_users_me(current_user: Principal = Depends(get_current_user)):
     return current_user # {"user": current_user}
 
@@ -1,38 +1,245 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from sqlalchemy import func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
 from app.database import get_db
-from app.models import Veiculo
-from app.schemas import VeiculoCreate, VeiculoResponse #, VeiculoUpdate
+from app.utils.replicas import get_db_leitura
+from app.models import Veiculo, Inspecao, Relatorio
+from app.schemas import VeiculoCreate, VeiculoResponse, VeiculoDetalhe #, VeiculoUpdate
 from app.utils.security import get_current_user
-from app.models import User as Usuario
-from typing import List
+from app.utils.principal_cache import Principal
+from app.utils.pagination import Paginacao
+from app.utils.ingest import detectar_formato, iterar_registros
+from app.core.config import BULK_CHUNK_SIZE, BULK_MAX_ERRORS, FAST_JSON_LISTS
+from app.utils.load_profiles import VEICULO_COM_RELATORIOS
+from app.utils.placa import normalizar_placa, limpar_placa
+from app.utils.fast_json import colunas_do_schema, resposta_linhas
+from app.utils.conditional import CondicionalDoUsuario, SEMPRE_REVALIDAR
+from typing import List, Optional
 
 router = APIRouter(prefix="/veiculos", tags=["Veículos"])
+logger = logging.getLogger(__name__)
+
+
+class ImportacaoInterrompida(Exception):
+    """Um bloco da importação em lote falhou ao gravar; os anteriores já foram confirmados."""
+
+    def __init__(self, linha: int):
+        super().__init__(linha)
+        self.linha = linha
+
+COLUNAS_VEICULO = colunas_do_schema(Veiculo, VeiculoResponse)
+
+# 🔹 Consultas das rotas montadas aqui também são usadas pelo benchmarks.explain
+def stmt_listagem(usuario_id: int, pagina: Paginacao, ano: Optional[int] = None, modelo: Optional[str] = None):
+    stmt = select(*COLUNAS_VEICULO) if FAST_JSON_LISTS else select(Veiculo)
+    stmt = stmt.where(Veiculo.usuario_id == usuario_id)
+    if ano is not None:
+        stmt = stmt.where(Veiculo.ano == ano)
+    if modelo:
+        stmt = stmt.where(Veiculo.modelo == modelo)
+    return pagina.aplicar(stmt, Veiculo.id)
+
+def stmt_busca(usuario_id: int, trecho: str):
+    # Placa completa em qualquer formato casa pela forma normalizada; trechos de placas
+    # antigas ("1234" em ABC-1234, guardada como ABC1C34) só casam com a placa limpa
+    return (
+        select(Veiculo)
+        .where(
+            Veiculo.usuario_id == usuario_id,
+            or_(
+                Veiculo.placa_norm.contains(normalizar_placa(trecho), autoescape=True),
+                func.limpar_placa(Veiculo.placa).contains(trecho, autoescape=True),
+            ),
+        )
+        .order_by(Veiculo.placa_norm)
+        .limit(20)
+    )
 
 @router.get("/", response_model=List[VeiculoResponse])
-async def listar_veiculos(db: AsyncSession = Depends(get_db), usuario: Usuario = Depends(get_current_user)):
-    result = await db.execute(select(Veiculo).where(Veiculo.usuario_id == usuario.id))
-    return result.scalars().all()
+async def listar_veiculos(
+    response: Response,
+    ano: Optional[int] = None,
+    modelo: Optional[str] = None,
+    pagina: Paginacao = Depends(),
+    db: AsyncSession = Depends(get_db_leitura),
+    usuario: Principal = Depends(get_current_user)
+):
+    result = await db.execute(stmt_listagem(usuario.id, pagina, ano, modelo))
+    if FAST_JSON_LISTS:
+        return resposta_linhas(pagina.pagina(result.all(), response), COLUNAS_VEICULO, response)
+    return pagina.pagina(result.scalars().all(), response)
 
 @router.post("/", response_model=VeiculoResponse)
-async def criar_veiculo(dados: VeiculoCreate, db: AsyncSession = Depends(get_db), usuario: Usuario = Depends(get_current_user)):
+async def criar_veiculo(dados: VeiculoCreate, db: AsyncSession = Depends(get_db), usuario: Principal = Depends(get_current_user)):
     novo_veiculo = Veiculo(**dados.dict(), usuario_id=usuario.id)
     db.add(novo_veiculo)
     await db.commit()
     await db.refresh(novo_veiculo)
     return novo_veiculo
 
-@router.get("/{veiculo_id}", response_model=VeiculoResponse)
-async def obter_veiculo(veiculo_id: int, db: AsyncSession = Depends(get_db), usuario: Usuario = Depends(get_current_user)):
+# Namespace do advisory lock da importação (primeiro argumento do pg_advisory_xact_lock)
+LOCK_IMPORTACAO_VEICULOS = 1003
+
+def stmt_historico(usuario_id: int, usuario_email: str, placa: str):
+    return (
+        select(
+            Inspecao.id, Inspecao.data, Inspecao.placa, Inspecao.status, Inspecao.resultado, Inspecao.patio_id,
+            Relatorio.id.label("relatorio_id"), Relatorio.data.label("relatorio_data"),
+            Relatorio.resultado.label("relatorio_resultado"), Relatorio.arquivo_pdf,
+        )
+        .outerjoin(Relatorio, (Relatorio.inspecao_id == Inspecao.id) & (Relatorio.usuario_id == usuario_id))
+        .where(Inspecao.placa_norm == normalizar_placa(placa), Inspecao.usuario_email == usuario_email)
+        .order_by(Inspecao.data.desc(), Inspecao.id.desc(), Relatorio.id)
+    )
+
+# 🔹 Placas normalizadas de um bloco que já existem no banco (qualquer usuário, como o UNIQUE de placa)
+def stmt_placas_existentes(placas_norm: list):
+    return select(Veiculo.placa_norm).where(Veiculo.placa_norm.in_(placas_norm))
+
+# 🔹 Importação em lote (CSV ou NDJSON em streaming), inserindo em blocos
+@router.post("/bulk")
+async def importar_veiculos(request: Request, db: AsyncSession = Depends(get_db), usuario: Principal = Depends(get_current_user)):
+    """Importa veículos em blocos de BULK_CHUNK_SIZE linhas, cada um na sua transação.
+
+    A importação não é atômica: se um bloco falhar, os anteriores continuam gravados e a
+    resposta (500) informa quantos entraram. Duplicidade é verificada pela placa
+    normalizada: ABC-1234, abc1234 e ABC1C34 são a mesma placa.
+    """
+    formato = detectar_formato(request.headers.get("content-type"))
+    if formato is None:
+        raise HTTPException(status_code=415, detail="Envie text/csv ou application/x-ndjson")
+
+    inseridos = 0
+    total_erros = 0
+    erros = []
+
+    def registrar_erro(linha: int, erro: str):
+        nonlocal total_erros
+        total_erros += 1
+        if len(erros) < BULK_MAX_ERRORS:
+            erros.append({"linha": linha, "erro": erro})
+
+    def resultado() -> dict:
+        return {"inseridos": inseridos, "total_erros": total_erros, "erros": erros}
+
+    async def gravar(bloco: list):
+        nonlocal inseridos
+        # Serializa os blocos concorrentes: entre a checagem e o INSERT ninguém grava a mesma placa
+        await db.execute(select(func.pg_advisory_xact_lock(LOCK_IMPORTACAO_VEICULOS)))
+        existentes = set((await db.execute(stmt_placas_existentes([v["placa_norm"] for _, v in bloco]))).scalars().all())
+        novos = [(linha, valores) for linha, valores in bloco if valores["placa_norm"] not in existentes]
+        gravadas = set()
+        if novos:
+            # O ON CONFLICT fica como rede de segurança para o UNIQUE da placa bruta
+            stmt = pg_insert(Veiculo).values([valores for _, valores in novos])
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Veiculo.placa]).returning(Veiculo.placa_norm)
+            gravadas = set((await db.execute(stmt)).scalars().all())
+        await db.commit()
+        inseridos += len(gravadas)
+        for linha, valores in bloco:
+            if valores["placa_norm"] not in gravadas:
+                registrar_erro(linha, "Placa já cadastrada")
+
+    async def gravar_ou_interromper(bloco: list):
+        try:
+            await gravar(bloco)
+        except SQLAlchemyError:
+            await db.rollback()
+            logger.exception("Falha ao gravar bloco da importação de veículos")
+            raise ImportacaoInterrompida(bloco[0][0])
+
+    bloco = []
+    placas_bloco = set()
+    try:
+        async for linha, registro in iterar_registros(request.stream(), formato):
+            if isinstance(registro, str):
+                registrar_erro(linha, registro)
+                continue
+            try:
+                dados = VeiculoCreate(**registro)
+            except ValidationError as exc:
+                registrar_erro(linha, "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()))
+                continue
+            placa_norm = normalizar_placa(dados.placa)
+            # Placa repetida no mesmo bloco: o INSERT não distinguiria qual linha entrou
+            if placa_norm in placas_bloco:
+                registrar_erro(linha, "Placa duplicada no arquivo")
+                continue
+            placas_bloco.add(placa_norm)
+            bloco.append((linha, {**dados.dict(), "placa_norm": placa_norm, "usuario_id": usuario.id}))
+            if len(bloco) >= BULK_CHUNK_SIZE:
+                await gravar_ou_interromper(bloco)
+                bloco, placas_bloco = [], set()
+
+        if bloco:
+            await gravar_ou_interromper(bloco)
+    except ImportacaoInterrompida as exc:
+        return JSONResponse(status_code=500, content={
+            **resultado(),
+            "detail": f"Falha ao gravar o bloco iniciado na linha {exc.linha}; os blocos anteriores "
+                      f"({inseridos} veículos) continuam gravados e as linhas seguintes não foram lidas",
+        })
+
+    return resultado()
+
+# 🔹 Busca por trecho da placa (índices trigram em placa_norm e em limpar_placa(placa))
+@router.get("/busca", response_model=List[VeiculoResponse])
+async def buscar_veiculos(q: str, db: AsyncSession = Depends(get_db_leitura), usuario: Principal = Depends(get_current_user)):
+    trecho = limpar_placa(q)
+    if not trecho:
+        raise HTTPException(status_code=400, detail="Informe parte da placa")
+    result = await db.execute(stmt_busca(usuario.id, trecho))
+    return result.scalars().all()
+
+@router.get("/{veiculo_id}", response_model=VeiculoResponse,
+            dependencies=[Depends(CondicionalDoUsuario(Veiculo, "veiculo_id", SEMPRE_REVALIDAR))])
+async def obter_veiculo(veiculo_id: int, db: AsyncSession = Depends(get_db_leitura), usuario: Principal = Depends(get_current_user)):
     result = await db.execute(select(Veiculo).where(Veiculo.id == veiculo_id, Veiculo.usuario_id == usuario.id))
     veiculo = result.scalar_one_or_none()
     if not veiculo:
         raise HTTPException(status_code=404, detail="Veículo não encontrado")
     return veiculo
 
+# 🔹 Veículo com seus relatórios, em 2 consultas fixas
+@router.get("/{veiculo_id}/detalhes", response_model=VeiculoDetalhe)
+async def obter_veiculo_detalhado(veiculo_id: int, db: AsyncSession = Depends(get_db_leitura), usuario: Principal = Depends(get_current_user)):
+    result = await db.execute(
+        select(Veiculo).options(*VEICULO_COM_RELATORIOS).where(Veiculo.id == veiculo_id, Veiculo.usuario_id == usuario.id)
+    )
+    veiculo = result.scalar_one_or_none()
+    if not veiculo:
+        raise HTTPException(status_code=404, detail="Veículo não encontrado")
+    return veiculo
+
+# 🔹 Inspeções e relatórios de uma placa (qualquer formato), em uma consulta indexada
+@router.get("/{placa}/historico")
+async def historico_placa(placa: str, db: AsyncSession = Depends(get_db_leitura), usuario: Principal = Depends(get_current_user)):
+    result = await db.execute(stmt_historico(usuario.id, usuario.email, placa))
+
+    inspecoes = {}
+    for linha in result:
+        inspecao = inspecoes.get(linha.id)
+        if inspecao is None:
+            inspecao = inspecoes[linha.id] = {
+                "id": linha.id, "data": linha.data, "placa": linha.placa, "status": linha.status,
+                "resultado": linha.resultado, "patio_id": linha.patio_id, "relatorios": [],
+            }
+        if linha.relatorio_id is not None:
+            inspecao["relatorios"].append({
+                "id": linha.relatorio_id, "data": linha.relatorio_data,
+                "resultado": linha.relatorio_resultado, "arquivo_pdf": linha.arquivo_pdf,
+            })
+    return {"placa": placa_norm, "inspecoes": list(inspecoes.values())}
+
 # @router.put("/{veiculo_id}", response_model=VeiculoResponse)
-# async def atualizar_veiculo(veiculo_id: int, dados: VeiculoUpdate, db: AsyncSession = Depends(get_db), usuario: Usuario = Depends(get_current_user)):
+# async def atualizar_veiculo(veiculo_id: int, dados: VeiculoUpdate, db: AsyncSession = Depends(get_db), usuario: Principal = Depends(get_current_user)):
 #     result = await db.execute(select(Veiculo).where(Veiculo.id == veiculo_id, Veiculo.usuario_id == usuario.id))
 #     veiculo = result.scalar_one_or_none()
 #     if not veiculo:
@@ -46,12 +253,17 @@ async def obter_veiculo(veiculo_id: int, db: AsyncSession = Depends(get_db), usu
 #     return veiculo
 
 @router.delete("/{veiculo_id}")
-async def deletar_veiculo(veiculo_id: int, db: AsyncSession = Depends(get_db), usuario: Usuario = Depends(get_current_user)):
+async def deletar_veiculo(veiculo_id: int, db: AsyncSession = Depends(get_db), usuario: Principal = Depends(get_current_user)):
     result = await db.execute(select(Veiculo).where(Veiculo.id == veiculo_id, Veiculo.usuario_id == usuario.id))
     veiculo = result.scalar_one_or_none()
     if not veiculo:
         raise HTTPException(status_code=404, detail="Veículo não encontrado ou não autorizado")
 
     await db.delete(veiculo)
-    await db.commit()
+    try:
+        await db.commit()
+    except StaleDataError:
+        # 🔹 Veículo alterado ou removido por outra requisição depois da leitura (versao)
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Veículo alterado por outra requisição; tente novamente.")
     return {"detail": "Veículo removido com sucesso"}
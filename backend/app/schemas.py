@@ -1,6 +1,9 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, conint
 from datetime import date, time
-from typing import Optional  # 🔹 Importação corrigida para Python 3.8
+from typing import List, Optional  # 🔹 Importação corrigida para Python 3.8
+
+# 🔹 Limite das colunas Integer (int4) do Postgres: fora disso o INSERT falha no banco
+INT4_MAX = 2_147_483_647
 
 # 🔹 Base de Usuário: Campos comuns para reaproveitamento
 class UserBase(BaseModel):
@@ -92,17 +95,17 @@ class CameraResponse(BaseModel):
 class VeiculoCreate(BaseModel):
     placa: str
     modelo: str
-    ano: int
+    ano: conint(ge=1900, le=2100)
     cor: str
-    km: int
+    km: conint(ge=0, le=INT4_MAX)
 
 class VeiculoResponse(BaseModel):
     id: int
     placa: str
     modelo: str
     ano: int
-    cor: str
-    km: int
+    cor: Optional[str] = None  # 🔹 Colunas anuláveis em veiculos: linhas antigas podem vir sem cor/km
+    km: Optional[int] = None
 
     class Config:
         orm_mode = True
@@ -120,4 +123,40 @@ class RelatorioResponse(RelatorioCreate):
     id: int
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+# 🔹 Schemas de detalhe: só os campos carregados pelos perfis de eager loading
+class RelatorioResumo(BaseModel):
+    id: int
+    inspecao_id: int
+    data: date
+    resultado: str
+    arquivo_pdf: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+class VeiculoDetalhe(VeiculoResponse):
+    relatorios: List[RelatorioResumo] = []
+
+class InspecaoResumo(BaseModel):
+    id: int
+    data: date
+    placa: str
+    status: str
+
+    class Config:
+        orm_mode = True
+
+class RelatorioDetalhe(RelatorioResponse):
+    veiculo: VeiculoResponse
+    inspecao: InspecaoResumo
+
+class PatioDetalhe(BaseModel):
+    id: int
+    nome: str
+    cameras: List[CameraResponse] = []
+    inspecoes: List[InspecaoResumo] = []
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import random
+from datetime import timedelta
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import (
+    AI_QUEUE_CONCURRENCY,
+    AI_QUEUE_BATCH,
+    AI_QUEUE_POLL_INTERVAL,
+    AI_QUEUE_MAX_ATTEMPTS,
+    AI_QUEUE_VISIBILITY,
+    AI_QUEUE_BACKOFF,
+    AI_ANALYSIS_TIMEOUT,
+)
+from app.database import AsyncSessionLocal
+from app.models import AnaliseJob
+from app.utils.microservices import ai_client, MicroServicoIndisponivel
+
+logger = logging.getLogger(__name__)
+
+
+async def enfileirar(db: AsyncSession, inspecao_id: int, payload: dict) -> AnaliseJob:
+    """Cria o job na mesma transação do chamador (o commit fica com ele)."""
+    job = AnaliseJob(
+        inspecao_id=inspecao_id,
+        status="pendente",
+        payload=json.dumps(payload),
+        tentativas=0,
+        max_tentativas=AI_QUEUE_MAX_ATTEMPTS,
+    )
+    db.add(job)
+    await db.flush()
+    return job
+
+
+async def reivindicar(limite: int) -> list:
+    """Marca até `limite` jobs como processando, pulando os já travados por outros workers.
+
+    Jobs em processando cujo prazo (bloqueado_ate) venceu voltam a ser elegíveis,
+    cobrindo workers que morreram no meio da análise.
+    """
+    agora = func.now()
+    elegiveis = (
+        select(AnaliseJob.id)
+        .where(or_(
+            and_(AnaliseJob.status == "pendente", AnaliseJob.disponivel_em <= agora),
+            and_(AnaliseJob.status == "processando", AnaliseJob.bloqueado_ate < agora),
+        ))
+        .order_by(AnaliseJob.id)
+        .limit(limite)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(AnaliseJob)
+        .where(AnaliseJob.id.in_(elegiveis.scalar_subquery()))
+        .values(
+            status="processando",
+            tentativas=AnaliseJob.tentativas + 1,
+            bloqueado_ate=agora + timedelta(seconds=AI_QUEUE_VISIBILITY),
+        )
+        .returning(AnaliseJob.id, AnaliseJob.inspecao_id, AnaliseJob.payload, AnaliseJob.tentativas, AnaliseJob.max_tentativas)
+        .execution_options(synchronize_session=False)
+    )
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            return (await session.execute(stmt)).all()
+
+
+async def _concluir(job_id: int, resultado: str):
+    """Grava a resposta do Micro IA no próprio job.
+
+    `Inspecao.resultado` guarda as notas do inspetor (PUT /inspecoes/{id}/finalizar),
+    então a análise nunca escreve na inspeção.
+    """
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await session.execute(
+                update(AnaliseJob)
+                .where(AnaliseJob.id == job_id)
+                .values(status="concluido", resultado=resultado, erro=None, bloqueado_ate=None)
+            )
+
+
+async def _falhar(job_id: int, tentativas: int, max_tentativas: int, erro: str):
+    if tentativas >= max_tentativas:
+        valores = {"status": "dead", "erro": erro, "bloqueado_ate": None}
+        logger.warning("Job de análise %s enviado para dead: %s", job_id, erro)
+    else:
+        espera = AI_QUEUE_BACKOFF * (2 ** (tentativas - 1)) * random.uniform(0.5, 1.5)
+        valores = {
+            "status": "pendente",
+            "erro": erro,
+            "bloqueado_ate": None,
+            "disponivel_em": func.now() + timedelta(seconds=espera),
+        }
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await session.execute(update(AnaliseJob).where(AnaliseJob.id == job_id).values(**valores))
+
+
+async def processar(job) -> None:
+    job_id, inspecao_id, payload, tentativas, max_tentativas = job
+    corpo = {"inspecao_id": inspecao_id, **json.loads(payload or "{}")}
+    try:
+        response = await ai_client.post("/analisar", json=corpo, retries=0, timeout=AI_ANALYSIS_TIMEOUT)
+    except MicroServicoIndisponivel as exc:
+        await _falhar(job_id, tentativas, max_tentativas, str(exc))
+        return
+    if response.status_code != 200:
+        # 4xx não melhora com nova tentativa
+        if 400 <= response.status_code < 500:
+            tentativas = max_tentativas
+        await _falhar(job_id, tentativas, max_tentativas, f"HTTP {response.status_code}: {response.text[:500]}")
+        return
+    await _concluir(job_id, response.text)
+
+
+class AnaliseWorker:
+    """Pool de tarefas asyncio que consome a fila com concorrência limitada."""
+
+    def __init__(self, concorrencia: int = AI_QUEUE_CONCURRENCY, lote: int = AI_QUEUE_BATCH):
+        self.concorrencia = concorrencia
+        self.lote = lote
+        self._tarefas = set()
+        self._loop_task = None
+        self._parar = None
+
+    def start(self):
+        if self.concorrencia > 0 and self._loop_task is None:
+            self._parar = asyncio.Event()  # criado aqui para ficar no loop da aplicação
+            self._loop_task = asyncio.ensure_future(self._executar())
+
+    async def stop(self):
+        if self._parar is not None:
+            self._parar.set()
+        if self._loop_task is not None:
+            await self._loop_task
+            self._loop_task = None
+        # Jobs em andamento que não terminarem voltam à fila pelo prazo de visibilidade
+        for tarefa in self._tarefas:
+            tarefa.cancel()
+
+    async def _executar(self):
+        while not self._parar.is_set():
+            livres = self.concorrencia - len(self._tarefas)
+            jobs = []
+            if livres > 0:
+                try:
+                    jobs = await reivindicar(min(livres, self.lote))
+                except Exception:
+                    logger.exception("Falha ao reivindicar jobs de análise")
+            for job in jobs:
+                tarefa = asyncio.ensure_future(self._processar(job))
+                self._tarefas.add(tarefa)
+                tarefa.add_done_callback(self._tarefas.discard)
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._parar.wait(), timeout=AI_QUEUE_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _processar(self, job):
+        try:
+            await processar(job)
+        except Exception:
+            logger.exception("Erro inesperado no job de análise %s", job[0])
+
+
+analise_worker = AnaliseWorker()
@@ -0,0 +1,77 @@
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.utils.replicas import get_db_leitura
+from app.utils.security import get_current_user
+from app.utils.principal_cache import Principal
+
+# 🔹 Políticas de Cache-Control usadas pelas rotas de detalhe
+SEMPRE_REVALIDAR = "private, no-cache"  # o cliente guarda, mas confere o ETag a cada uso
+CURTO = "private, max-age=30, must-revalidate"
+
+
+def _corresponde(if_none_match: str, etag: str) -> bool:
+    """Comparação fraca (RFC 9110 §13.1.2): ignora o prefixo W/."""
+    if if_none_match.strip() == "*":
+        return True
+    alvo = etag[2:] if etag.startswith("W/") else etag
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == alvo:
+            return True
+    return False
+
+
+class Condicional:
+    """Dependência de GET condicional a partir da coluna `versao` do modelo.
+
+    Lê só a versão (uma consulta por chave primária, sem hidratar o objeto). Se o
+    If-None-Match corresponder, responde 304 sem executar a rota; senão grava ETag e
+    Cache-Control na resposta. Recurso inexistente segue para a rota, que devolve o 404.
+    """
+
+    def __init__(self, modelo, parametro: str, cache_control: str = SEMPRE_REVALIDAR):
+        self.modelo = modelo
+        self.parametro = parametro
+        self.cache_control = cache_control
+
+    def _filtros(self, usuario: Principal = None) -> list:
+        return []
+
+    async def _verificar(self, request: Request, response: Response, db: AsyncSession, usuario: Principal = None):
+        try:
+            chave = int(request.path_params[self.parametro])
+        except (KeyError, ValueError):
+            return  # a validação da própria rota responde
+        stmt = select(self.modelo.versao).where(self.modelo.id == chave, *self._filtros(usuario))
+        versao = (await db.execute(stmt)).scalar_one_or_none()
+        if versao is None:
+            return
+
+        etag = f'W/"{self.modelo.__tablename__}-{chave}-{versao}"'
+        cabecalhos = {"ETag": etag, "Cache-Control": self.cache_control}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _corresponde(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+        response.headers.update(cabecalhos)
+
+    async def __call__(self, request: Request, response: Response, db: AsyncSession = Depends(get_db_leitura)):
+        await self._verificar(request, response, db)
+
+
+class CondicionalDoUsuario(Condicional):
+    """Como `Condicional`, restrito às linhas do usuário (`usuario_id`), para o 304 não revelar recursos alheios."""
+
+    def _filtros(self, usuario: Principal = None) -> list:
+        return [self.modelo.usuario_id == usuario.id]
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_db_leitura),
+        usuario: Principal = Depends(get_current_user),
+    ):
+        await self._verificar(request, response, db, usuario)
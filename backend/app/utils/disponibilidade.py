@@ -0,0 +1,136 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.models import Agendamento
+from app.core.config import (
+    AGENDA_HORA_INICIO,
+    AGENDA_HORA_FIM,
+    AGENDA_SLOT_MINUTOS,
+    AGENDA_CAPACIDADE_SLOT,
+    AGENDA_CAPACIDADE_LOCAIS,
+    AGENDA_DISPONIBILIDADE_MAX_DIAS,
+)
+
+# Namespace dos advisory locks de slot (primeiro argumento do pg_advisory_xact_lock)
+LOCK_SLOT_AGENDA = 1002
+
+
+def _minutos(valor: time) -> int:
+    return valor.hour * 60 + valor.minute
+
+
+def _carregar_capacidades(texto: str) -> Dict[str, int]:
+    capacidades = {}
+    for item in texto.split(";"):
+        if "=" in item:
+            local, valor = item.rsplit("=", 1)
+            capacidades[local.strip()] = int(valor)
+    return capacidades
+
+
+_INICIO = _minutos(time.fromisoformat(AGENDA_HORA_INICIO))
+_FIM = _minutos(time.fromisoformat(AGENDA_HORA_FIM))
+# Início de cada slot do dia, em ordem: o índice na lista é o bit no bitmap
+SLOTS: List[time] = [time(m // 60, m % 60) for m in range(_INICIO, _FIM, AGENDA_SLOT_MINUTOS)]
+_CAPACIDADES = _carregar_capacidades(AGENDA_CAPACIDADE_LOCAIS)
+
+
+def capacidade(local: str) -> int:
+    return _CAPACIDADES.get(local, AGENDA_CAPACIDADE_SLOT)
+
+
+def indice_slot(horario: time) -> Optional[int]:
+    """Slot que contém o horário (ex.: 08:10 cai no slot das 08:00), ou None fora da grade."""
+    minutos = _minutos(horario)
+    if not _INICIO <= minutos < _FIM:
+        return None
+    return (minutos - _INICIO) // AGENDA_SLOT_MINUTOS
+
+
+def _limites_slot(indice: int):
+    inicio = datetime.combine(date.min, SLOTS[indice])
+    return SLOTS[indice], (inicio + timedelta(minutes=AGENDA_SLOT_MINUTOS)).time()
+
+
+# 🔹 Consultas cobertas por ix_agendamentos_local_data_horario; também usadas pelo benchmarks.explain
+def stmt_ocupacao(local: str, de: date, ate: date):
+    return (
+        select(Agendamento.data, Agendamento.horario, func.count())
+        .where(Agendamento.local == local, Agendamento.data >= de, Agendamento.data <= ate)
+        .group_by(Agendamento.data, Agendamento.horario)
+    )
+
+
+def stmt_ocupacao_slot(local: str, dia: date, indice: int, ignorar_id: int = None):
+    inicio, fim = _limites_slot(indice)
+    stmt = select(func.count()).where(
+        Agendamento.local == local,
+        Agendamento.data == dia,
+        Agendamento.horario >= inicio,
+    )
+    # O último slot pode terminar à meia-noite (fim == 00:00)
+    if fim > inicio:
+        stmt = stmt.where(Agendamento.horario < fim)
+    if ignorar_id is not None:
+        stmt = stmt.where(Agendamento.id != ignorar_id)
+    return stmt
+
+
+async def disponibilidade(db: AsyncSession, local: str, de: date, ate: date) -> dict:
+    """Vagas por slot de cada dia da faixa, com uma única consulta agregada.
+
+    A ocupação de cada dia vira um vetor de contagens e um bitmap dos slots lotados;
+    os slots livres são os bits zerados.
+    """
+    if ate < de:
+        raise HTTPException(status_code=400, detail="'ate' deve ser igual ou posterior a 'de'")
+    if (ate - de).days >= AGENDA_DISPONIBILIDADE_MAX_DIAS:
+        raise HTTPException(status_code=400, detail=f"Consulte no máximo {AGENDA_DISPONIBILIDADE_MAX_DIAS} dias")
+
+    result = await db.execute(stmt_ocupacao(local, de, ate))
+    ocupacao: Dict[date, List[int]] = {}
+    for dia, horario, total in result:
+        indice = indice_slot(horario)
+        if indice is not None:
+            ocupacao.setdefault(dia, [0] * len(SLOTS))[indice] += total
+
+    cap = capacidade(local)
+    dias = []
+    dia = de
+    while dia <= ate:
+        contagens = ocupacao.get(dia)
+        lotados = 0
+        if contagens:
+            for indice, total in enumerate(contagens):
+                if total >= cap:
+                    lotados |= 1 << indice
+        dias.append({
+            "data": dia,
+            "livres": [
+                {"horario": SLOTS[i], "vagas": cap - (contagens[i] if contagens else 0)}
+                for i in range(len(SLOTS)) if not lotados >> i & 1
+            ],
+        })
+        dia += timedelta(days=1)
+
+    return {"local": local, "capacidade": cap, "slot_minutos": AGENDA_SLOT_MINUTOS, "dias": dias}
+
+
+async def reservar_slot(db: AsyncSession, local: str, dia: date, horario: time, ignorar_id: int = None):
+    """Garante vaga no slot dentro da transação corrente; 409 se estiver lotado.
+
+    O advisory lock por (local, data, slot) serializa reservas concorrentes do mesmo slot
+    até o commit, então a contagem não é superada entre a checagem e o INSERT/UPDATE.
+    """
+    indice = indice_slot(horario)
+    if indice is None:
+        raise HTTPException(status_code=400, detail=f"Horário fora da grade ({AGENDA_HORA_INICIO}–{AGENDA_HORA_FIM})")
+
+    chave = f"{local}|{dia.isoformat()}|{indice}"
+    await db.execute(select(func.pg_advisory_xact_lock(LOCK_SLOT_AGENDA, func.hashtext(chave))))
+
+    if (await db.execute(stmt_ocupacao_slot(local, dia, indice, ignorar_id))).scalar_one() >= capacidade(local):
+        raise HTTPException(status_code=409, detail="Horário sem vagas para este local")
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from app.core.config import EVENTS_POLL_INTERVAL, EVENTS_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class Assinante:
+    def __init__(self, patio_ids):
+        self.patio_ids = set(patio_ids)
+        self.fila = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+
+    def entregar(self, evento: dict):
+        if evento.get("patio_id") not in self.patio_ids:
+            return
+        # Cliente lento: descarta o evento mais antigo em vez de bloquear os demais
+        if self.fila.full():
+            self.fila.get_nowait()
+        self.fila.put_nowait(evento)
+
+
+class EventHub:
+    """Distribui eventos de status a todos os clientes conectados, filtrando por pátio.
+
+    Um único poller por processo consulta as `fontes` (corrotinas que retornam a
+    lista de eventos desde a última chamada). Ele só roda enquanto houver assinantes.
+    O último estado visto por cada fonte é descartado (`reiniciar`) sempre que o
+    poller (re)inicia ou a fonte falha, para não comparar com uma varredura antiga.
+    """
+
+    def __init__(self, intervalo: float = EVENTS_POLL_INTERVAL):
+        self.intervalo = intervalo
+        self.fontes = []
+        self._assinantes = set()
+        self._poller = None
+
+    def registrar_fonte(self, fonte, reiniciar=None):
+        self.fontes.append((fonte, reiniciar))
+
+    def _reiniciar(self, reiniciar):
+        if reiniciar is not None:
+            reiniciar()
+
+    def publicar(self, evento: dict):
+        for assinante in list(self._assinantes):
+            assinante.entregar(evento)
+
+    def assinar(self, patio_ids) -> Assinante:
+        assinante = Assinante(patio_ids)
+        self._assinantes.add(assinante)
+        if self._poller is None or self._poller.done():
+            for _, reiniciar in self.fontes:
+                self._reiniciar(reiniciar)
+            self._poller = asyncio.ensure_future(self._executar())
+        return assinante
+
+    def cancelar(self, assinante: Assinante):
+        self._assinantes.discard(assinante)
+
+    def patios_assinados(self) -> set:
+        """Pátios com pelo menos um cliente conectado (as fontes só varrem esses)."""
+        patios = set()
+        for assinante in self._assinantes:
+            patios |= assinante.patio_ids
+        return patios
+
+    @property
+    def conectados(self) -> int:
+        return len(self._assinantes)
+
+    async def _executar(self):
+        while self._assinantes:
+            for fonte, reiniciar in self.fontes:
+                try:
+                    for evento in await fonte():
+                        self.publicar(evento)
+                except Exception:
+                    logger.exception("Falha ao consultar fonte de eventos")
+                    # Mudanças durante a falha são perdidas; a próxima varredura vira a nova base
+                    self._reiniciar(reiniciar)
+            await asyncio.sleep(self.intervalo)
+        self._poller = None
+
+    async def stop(self):
+        self._assinantes.clear()
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+
+event_hub = EventHub()
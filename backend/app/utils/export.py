@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+import zlib
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from app.core.config import EXPORT_BATCH_SIZE
+from app.utils.replicas import sessao_leitura
+
+FORMATOS = {
+    "csv": "text/csv",  # o Starlette acrescenta "; charset=utf-8" aos tipos text/*
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _csv(linhas) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(linhas)
+    return buffer.getvalue()
+
+
+def _ndjson(colunas, linhas) -> str:
+    return "".join(json.dumps(dict(zip(colunas, linha)), default=str, ensure_ascii=False) + "\n" for linha in linhas)
+
+
+async def _gerar(sessao, stmt, colunas, formato: str, compactar: bool):
+    compressor = zlib.compressobj(wbits=31) if compactar else None  # wbits=31 -> formato gzip
+
+    def saida(texto: str) -> bytes:
+        dados = texto.encode()
+        if compressor is None:
+            return dados
+        # Z_SYNC_FLUSH entrega cada lote ao cliente sem esperar o fim do arquivo
+        return compressor.compress(dados) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    if formato == "csv":
+        yield saida(_csv([colunas]))
+
+    # Sessão própria: a dependência get_db pode ser encerrada antes do fim do streaming
+    async with sessao as session:
+        result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for lote in result.partitions():
+            yield saida(_csv(lote) if formato == "csv" else _ndjson(colunas, lote))
+
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def exportar(request: Request, stmt, colunas: list, formato: str, nome: str) -> StreamingResponse:
+    """Resposta em streaming (chunked) de um SELECT de colunas, em CSV ou NDJSON.
+
+    Usa cursor no servidor, então a memória não cresce com o número de linhas.
+    Lê de uma réplica quando houver (ver app.utils.replicas).
+    Compacta com gzip quando o cliente envia Accept-Encoding: gzip.
+    """
+    compactar = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {
+        "Content-Disposition": f'attachment; filename="{nome}.{formato}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compactar:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(_gerar(sessao_leitura(request), stmt, colunas, formato, compactar), media_type=FORMATOS[formato], headers=headers)
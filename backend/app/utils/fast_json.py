@@ -0,0 +1,28 @@
+from typing import Iterable, List
+import orjson
+from fastapi import Response
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+
+def colunas_do_schema(modelo, schema) -> List:
+    """Colunas do modelo na ordem dos campos do schema, para `select(*colunas)`.
+
+    A ordem importa: as chaves do JSON saem na mesma ordem que o Pydantic geraria.
+    """
+    return [getattr(modelo, campo) for campo in schema.__fields__]
+
+
+def resposta_linhas(linhas: Iterable, colunas: List, response: Response = None) -> Response:
+    """Serializa tuplas (Row) direto com orjson, sem instanciar um modelo Pydantic por linha.
+
+    O resultado é byte a byte igual ao do JSONResponse do FastAPI para campos str/int/date/None
+    (ver tests/test_fast_json.py). Não há validação: use só com schemas cujos tipos já são
+    garantidos pelas colunas do banco.
+    """
+    campos = [c.key for c in colunas]
+    corpo = orjson.dumps([dict(zip(campos, linha)) for linha in linhas])
+    resposta = Response(content=corpo, media_type="application/json")
+    # O cursor da paginação foi gravado no Response injetado, que é descartado ao retornar outro
+    if response is not None and NEXT_CURSOR_HEADER in response.headers:
+        resposta.headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    return resposta
@@ -0,0 +1,153 @@
+import codecs
+import csv
+import json
+from collections import deque
+
+FORMATO_CSV = "csv"
+FORMATO_NDJSON = "ndjson"
+
+# Registro CSV (linhas físicas acumuladas) acima disso é descartado: aspas sem fechamento
+MAX_REGISTRO_CSV = 64 * 1024
+# Linha física acima disso é descartada antes de terminar (CR puro, NDJSON gigante)
+MAX_LINHA = 64 * 1024
+LINHA_GRANDE_DEMAIS = None  # gerado por iterar_linhas no lugar da linha descartada
+
+
+def detectar_formato(content_type: str):
+    """Identifica o formato do corpo pelo Content-Type (None se não suportado)."""
+    content_type = (content_type or "").lower()
+    if "ndjson" in content_type or "jsonlines" in content_type or "x-json-stream" in content_type:
+        return FORMATO_NDJSON
+    if "csv" in content_type:
+        return FORMATO_CSV
+    return None
+
+
+async def iterar_linhas(stream, max_linha: int = MAX_LINHA):
+    """Quebra um corpo em streaming (bytes) em linhas de texto, sem carregá-lo inteiro.
+
+    Só a linha corrente fica em memória. Se ela passar de `max_linha` caracteres sem
+    um "\n" (CSV do Mac com CR puro, um NDJSON numa linha só), o resto dela é ignorado
+    até o próximo "\n" e no seu lugar sai LINHA_GRANDE_DEMAIS.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    partes, tamanho, descartando = [], 0, False
+
+    def acrescentar(segmento: str):
+        nonlocal partes, tamanho, descartando
+        if descartando or not segmento:
+            return
+        partes.append(segmento)
+        tamanho += len(segmento)
+        if tamanho > max_linha:
+            partes, tamanho, descartando = [], 0, True
+
+    def fechar():
+        nonlocal partes, tamanho, descartando
+        linha = LINHA_GRANDE_DEMAIS if descartando else "".join(partes).rstrip("\r")
+        partes, tamanho, descartando = [], 0, False
+        return linha
+
+    def consumir(texto: str) -> list:
+        *completos, aberto = texto.split("\n")
+        linhas = []
+        for segmento in completos:
+            acrescentar(segmento)
+            linhas.append(fechar())
+        acrescentar(aberto)
+        return linhas
+
+    async for chunk in stream:
+        for linha in consumir(decoder.decode(chunk)):
+            yield linha
+    for linha in consumir(decoder.decode(b"", final=True)):
+        yield linha
+    if partes or descartando:
+        yield fechar()
+
+
+class _Alimentador:
+    """Iterador de linhas para um único csv.reader, abastecido registro a registro."""
+
+    def __init__(self):
+        self.linhas = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.linhas:
+            raise StopIteration
+        return self.linhas.popleft()
+
+
+async def iterar_registros(stream, formato: str):
+    """Gera (número da linha, dict) ou (número da linha, mensagem de erro) para cada registro.
+
+    No CSV, campos entre aspas podem conter quebras de linha: as linhas físicas são
+    acumuladas até as aspas fecharem e o registro inteiro vai para o mesmo csv.reader.
+    O número informado é o da primeira linha do registro.
+    """
+    cabecalho = None
+    numero = 0
+    alimentador = _Alimentador()
+    leitor = csv.reader(alimentador)
+    pendentes, aspas, inicio, tamanho = [], 0, 0, 0
+
+    def registro_csv(valores):
+        nonlocal cabecalho
+        if cabecalho is None:
+            cabecalho = [c.strip() for c in valores]
+            return None
+        if len(valores) != len(cabecalho):
+            return f"Esperadas {len(cabecalho)} colunas, recebidas {len(valores)}"
+        return dict(zip(cabecalho, valores))
+
+    async for linha in iterar_linhas(stream):
+        numero += 1
+        if linha is LINHA_GRANDE_DEMAIS:
+            # Um registro CSV em andamento também se perde: a linha cortada fazia parte dele
+            yield (inicio if pendentes else numero), f"Linha com mais de {MAX_LINHA} caracteres"
+            pendentes, aspas, tamanho = [], 0, 0
+            continue
+        if formato == FORMATO_NDJSON:
+            if not linha.strip():
+                continue
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                yield numero, "JSON inválido"
+                continue
+            if not isinstance(registro, dict):
+                yield numero, "Cada linha deve ser um objeto JSON"
+                continue
+            yield numero, registro
+            continue
+
+        if not pendentes:
+            if not linha.strip():
+                continue
+            inicio = numero
+        pendentes.append(linha + "\n")
+        aspas += linha.count('"')
+        tamanho += len(linha)
+        if tamanho > MAX_REGISTRO_CSV:
+            yield inicio, "Registro CSV grande demais (aspas sem fechamento?)"
+            pendentes, aspas, tamanho = [], 0, 0
+            continue
+        if aspas % 2:
+            continue  # campo entre aspas continua na próxima linha
+
+        alimentador.linhas.extend(pendentes)
+        pendentes, aspas, tamanho = [], 0, 0
+        try:
+            registro = registro_csv(next(leitor))
+        except csv.Error as exc:
+            alimentador.linhas.clear()
+            yield inicio, f"CSV inválido: {exc}"
+            continue
+        if registro is not None:
+            yield inicio, registro
+
+    if pendentes:
+        yield inicio, "Aspas sem fechamento no fim do arquivo"
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+import random
+import uuid
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import INVALIDATION_CHANNEL
+from app.database import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+ORIGEM = uuid.uuid4().hex  # identifica este processo nos eventos (o próprio NOTIFY é ignorado)
+_inscritos = {}  # entidade -> [callback(chave)]; chave None significa "descartar tudo"
+_PENDENTES = "invalidacoes_pendentes"  # chave em Session.info
+
+
+def inscrever(entidade: str, callback, inscritos: dict = None):
+    (_inscritos if inscritos is None else inscritos).setdefault(entidade, []).append(callback)
+
+
+def _aplicar(entidade: str, chave, inscritos: dict = None):
+    for callback in (_inscritos if inscritos is None else inscritos).get(entidade, ()):
+        try:
+            callback(chave)
+        except Exception:
+            logger.exception("Falha ao invalidar cache de %s", entidade)
+
+
+def _aplicar_todos(inscritos: dict = None):
+    inscritos = _inscritos if inscritos is None else inscritos
+    for entidade in list(inscritos):
+        _aplicar(entidade, None, inscritos)
+
+
+def _mensagem(entidade: str, chave, origem: str = ORIGEM) -> str:
+    return json.dumps({"entidade": entidade, "chave": chave, "origem": origem})
+
+
+def _adiar(sessao: Session, entidade: str, chave):
+    sessao.info.setdefault(_PENDENTES, []).append((entidade, chave))
+
+
+# 🔹 A invalidação local só acontece depois do COMMIT: antes disso um leitor concorrente
+# ainda veria o valor antigo no banco e o colocaria de volta no cache
+@event.listens_for(Session, "after_commit")
+def _apos_commit(sessao):
+    for entidade, chave in sessao.info.pop(_PENDENTES, ()):
+        _aplicar(entidade, chave)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _apos_rollback(sessao, transacao_anterior):
+    # Só o rollback da transação externa descarta; o de um SAVEPOINT ainda pode terminar em commit
+    if transacao_anterior.parent is None:
+        sessao.info.pop(_PENDENTES, None)
+
+
+async def publicar(db: AsyncSession, entidade: str, chave=None):
+    """Agenda o NOTIFY na transação do chamador e a invalidação local para depois do commit."""
+    _adiar(db.sync_session, entidade, chave)
+    await db.execute(select(func.pg_notify(INVALIDATION_CHANNEL, _mensagem(entidade, chave))))
+
+
+def publicar_sync(sessao: Session, connection, entidade: str, chave=None):
+    """Mesma coisa a partir de eventos do ORM, que recebem a sessão e a conexão síncronas do flush."""
+    _adiar(sessao, entidade, chave)
+    connection.execute(select(func.pg_notify(INVALIDATION_CHANNEL, _mensagem(entidade, chave))))
+
+
+class InvalidationBus:
+    """Conexão asyncpg dedicada ao LISTEN, com reconexão automática.
+
+    Ao reconectar, descarta todos os caches inscritos, já que eventos podem ter
+    sido perdidos enquanto a conexão estava fora. Eventos com a própria `origem`
+    são ignorados: o processo que publicou já invalidou localmente após o commit.
+    `inscritos` troca o registro de callbacks do processo por outro (workers simulados nos testes).
+    """
+
+    def __init__(self, dsn: str = DATABASE_URL.replace("postgresql+asyncpg", "postgresql"), origem: str = ORIGEM,
+                 inscritos: dict = None):
+        self.dsn = dsn
+        self.origem = origem
+        self.inscritos = _inscritos if inscritos is None else inscritos
+        self.conectado = False
+        self._task = None
+        self.recebidos = 0
+        self.reconexoes = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._executar())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _ao_notificar(self, connection, pid, canal, payload):
+        try:
+            evento = json.loads(payload)
+        except ValueError:
+            return
+        if evento.get("origem") == self.origem:
+            return
+        self.recebidos += 1
+        _aplicar(evento.get("entidade"), evento.get("chave"), self.inscritos)
+
+    async def _executar(self):
+        espera = 1.0
+        perdeu_eventos = False
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                caiu = asyncio.Event()
+                conn.add_termination_listener(lambda _: caiu.set())
+                await conn.add_listener(INVALIDATION_CHANNEL, self._ao_notificar)
+                self.conectado = True
+                if perdeu_eventos:
+                    self.reconexoes += 1
+                # Eventos de antes do LISTEN (ou do tempo desconectado) se perderam: descarta tudo
+                _aplicar_todos(self.inscritos)
+                espera = 1.0
+                # Aguarda a queda da conexão, conferindo periodicamente se ela segue viva
+                while not caiu.is_set():
+                    try:
+                        await asyncio.wait_for(caiu.wait(), timeout=30)
+                    except asyncio.TimeoutError:
+                        await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Barramento de invalidação desconectado; reconectando em %.1fs", espera, exc_info=True)
+            finally:
+                self.conectado = False
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            perdeu_eventos = True
+            await asyncio.sleep(espera * random.uniform(0.5, 1.5))
+            espera = min(espera * 2, 30.0)
+
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,29 @@
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from app.models import Veiculo, Relatorio, Inspecao, Patio, Camera
+
+# 🔹 Perfis de carregamento das rotas de detalhe.
+# Cada perfil carrega de uma vez só as colunas que o schema de resposta usa, sem lazy loads
+# (que no asyncio falham ou viram N+1). Ao mudar um schema, ajuste o perfil correspondente.
+
+# VeiculoDetalhe: 2 consultas (veículo + relatórios via IN)
+VEICULO_COM_RELATORIOS = (
+    load_only(Veiculo.id, Veiculo.placa, Veiculo.modelo, Veiculo.ano, Veiculo.cor, Veiculo.km),
+    selectinload(Veiculo.relatorios).load_only(
+        Relatorio.id, Relatorio.veiculo_id, Relatorio.inspecao_id, Relatorio.data, Relatorio.resultado, Relatorio.arquivo_pdf
+    ),
+)
+
+# RelatorioDetalhe: 1 consulta (JOIN com veículo e inspeção)
+RELATORIO_COMPLETO = (
+    joinedload(Relatorio.veiculo).load_only(Veiculo.id, Veiculo.placa, Veiculo.modelo, Veiculo.ano, Veiculo.cor, Veiculo.km),
+    joinedload(Relatorio.inspecao).load_only(Inspecao.id, Inspecao.data, Inspecao.placa, Inspecao.status),
+)
+
+# PatioDetalhe: 3 consultas (pátio + câmeras + inspeções em aberto)
+PATIO_COM_CAMERAS_E_INSPECOES = (
+    load_only(Patio.id, Patio.nome),
+    selectinload(Patio.cameras).load_only(Camera.id, Camera.tipo, Camera.rtmp_url, Camera.patio_id),
+    selectinload(Patio.inspecoes.and_(Inspecao.status != "Concluída")).load_only(
+        Inspecao.id, Inspecao.data, Inspecao.placa, Inspecao.status, Inspecao.patio_id
+    ),
+)
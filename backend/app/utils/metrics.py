@@ -0,0 +1,190 @@
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter as ContagemConsultas
+from contextvars import ContextVar
+from sqlalchemy import event
+from app.core.config import N_PLUS_ONE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _rotulos(nomes, valores) -> str:
+    if not nomes:
+        return ""
+    pares = ",".join(f'{n}="{str(v)}"'.replace("\n", " ") for n, v in zip(nomes, valores))
+    return "{" + pares + "}"
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, descricao: str, rotulos=()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        REGISTRO.append(self)
+
+    def cabecalho(self) -> list:
+        return [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} {self.tipo}"]
+
+
+class Counter(_Metrica):
+    tipo = "counter"
+
+    def inc(self, *rotulos, valor: float = 1.0):
+        self._valores[rotulos] = self._valores.get(rotulos, 0.0) + valor
+
+    def render(self) -> list:
+        return self.cabecalho() + [f"{self.nome}{_rotulos(self.rotulos, r)} {v}" for r, v in self._valores.items()]
+
+
+class Gauge(Counter):
+    tipo = "gauge"
+
+    def dec(self, *rotulos, valor: float = 1.0):
+        self.inc(*rotulos, valor=-valor)
+
+
+class Histogram(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, descricao: str, rotulos=(), buckets=BUCKETS_LATENCIA):
+        super().__init__(nome, descricao, rotulos)
+        self.buckets = tuple(buckets)
+
+    def observe(self, valor: float, *rotulos):
+        serie = self._valores.get(rotulos)
+        if serie is None:
+            serie = self._valores[rotulos] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        serie[0][bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+        serie[2] += 1
+
+    def render(self) -> list:
+        linhas = self.cabecalho()
+        nomes_le = self.rotulos + ("le",)
+        for rotulos, (contagens, soma, total) in self._valores.items():
+            acumulado = 0
+            for limite, contagem in zip(self.buckets, contagens):
+                acumulado += contagem
+                linhas.append(f"{self.nome}_bucket{_rotulos(nomes_le, rotulos + (limite,))} {acumulado}")
+            linhas.append(f"{self.nome}_bucket{_rotulos(nomes_le, rotulos + ('+Inf',))} {total}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, rotulos)} {soma}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, rotulos)} {total}")
+        return linhas
+
+
+REGISTRO = []
+_coletores = []  # funções que devolvem linhas prontas (ex.: estatísticas de caches)
+
+
+def registrar_coletor(coletor):
+    _coletores.append(coletor)
+
+
+def gauge_linhas(nome: str, descricao: str, valores: dict, rotulo: str = None) -> list:
+    """Formata um dicionário de valores instantâneos como gauge (com um rótulo opcional)."""
+    linhas = [f"# HELP {nome} {descricao}", f"# TYPE {nome} gauge"]
+    for chave, valor in valores.items():
+        linhas.append(f"{nome}{_rotulos((rotulo,), (chave,)) if rotulo else ''} {valor}")
+    return linhas
+
+
+def render() -> str:
+    linhas = []
+    for metrica in REGISTRO:
+        linhas.extend(metrica.render())
+    for coletor in _coletores:
+        try:
+            linhas.extend(coletor())
+        except Exception:
+            logger.exception("Falha em coletor de métricas")
+    return "\n".join(linhas) + "\n"
+
+
+# 🔹 Métricas HTTP, banco e serviços externos
+http_latencia = Histogram("http_request_duration_seconds", "Latência das requisições por rota", ("method", "route", "status"))
+http_em_andamento = Gauge("http_requests_in_progress", "Requisições em andamento", ("method",))
+db_consultas = Histogram("db_queries_per_request", "Consultas SQL por requisição", ("route",), BUCKETS_CONSULTAS)
+db_tempo = Histogram("db_time_per_request_seconds", "Tempo gasto no banco por requisição", ("route",))
+db_n_mais_um = Counter("db_n_plus_one_suspected_total", "Requisições que repetiram a mesma consulta muitas vezes", ("route",))
+externo_latencia = Histogram("outbound_request_duration_seconds", "Latência das chamadas aos microsserviços", ("service", "method", "outcome"))
+
+
+class _EstatisticasRequisicao:
+    __slots__ = ("consultas", "tempo_db", "sqls")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_db = 0.0
+        self.sqls = ContagemConsultas()
+
+
+_requisicao_atual = ContextVar("requisicao_atual", default=None)
+
+
+def instrumentar_engine(engine):
+    """Conta consultas e tempo de banco da requisição corrente (eventos de cursor do SQLAlchemy)."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_inicio", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info["metrics_inicio"].pop()
+        stats = _requisicao_atual.get()
+        if stats is not None:
+            stats.consultas += 1
+            stats.tempo_db += time.perf_counter() - inicio
+            stats.sqls[statement] += 1
+
+
+def observar_externo(servico: str, metodo: str, resultado: str, duracao: float):
+    externo_latencia.observe(duracao, servico, metodo, resultado)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: latência por rota, requisições em andamento e custo de banco por requisição."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        status = {"codigo": 500}
+        stats = _EstatisticasRequisicao()
+        token = _requisicao_atual.set(stats)
+        http_em_andamento.inc(metodo)
+        inicio = time.perf_counter()
+
+        async def send_instrumentado(mensagem):
+            if mensagem["type"] == "http.response.start":
+                status["codigo"] = mensagem["status"]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, send_instrumentado)
+        finally:
+            duracao = time.perf_counter() - inicio
+            http_em_andamento.dec(metodo)
+            _requisicao_atual.reset(token)
+            # Template da rota (ex.: /api/veiculos/{veiculo_id}) para não explodir a cardinalidade
+            rota = getattr(scope.get("route"), "path", None) or getattr(scope.get("endpoint"), "__name__", None) or "unmatched"
+            http_latencia.observe(duracao, metodo, rota, status["codigo"])
+            db_consultas.observe(stats.consultas, rota)
+            db_tempo.observe(stats.tempo_db, rota)
+            if stats.sqls and max(stats.sqls.values()) >= N_PLUS_ONE_THRESHOLD:
+                db_n_mais_um.inc(rota)
+                sql, vezes = stats.sqls.most_common(1)[0]
+                logger.warning("Possível N+1 em %s %s: consulta repetida %d vezes: %s", metodo, rota, vezes, sql[:200])
@@ -0,0 +1,148 @@
+import asyncio
+import random
+import time
+import httpx
+from app.core.config import (
+    MICRO_RTMP_URL,
+    MICRO_AI_URL,
+    MICRO_AI_TOKEN,
+    MICRO_HTTP_TIMEOUT,
+    MICRO_HTTP_MAX_CONNECTIONS,
+    MICRO_HTTP_KEEPALIVE,
+    MICRO_HTTP_RETRIES,
+    MICRO_HTTP_BACKOFF,
+    MICRO_CIRCUIT_FAILURES,
+    MICRO_CIRCUIT_RESET,
+)
+from app.utils.metrics import observar_externo
+
+
+class MicroServicoIndisponivel(Exception):
+    """Circuito aberto ou todas as tentativas falharam."""
+
+
+# 🔹 Circuit breaker: abre após N falhas seguidas; passado o reset fica meio aberto e
+# libera uma única sonda. Sucesso fecha, falha reabre. Sonda que nunca reportar
+# (cancelada no meio) expira depois de outro reset e a próxima chamada vira a sonda.
+class CircuitBreaker:
+    def __init__(self, max_falhas: int, reset_segundos: float):
+        self.max_falhas = max_falhas
+        self.reset_segundos = reset_segundos
+        self.falhas = 0
+        self.aberto_ate = 0.0
+        self.sonda_ate = 0.0  # > 0 enquanto a sonda do estado meio aberto está em andamento
+
+    @property
+    def estado(self) -> str:
+        if self.falhas < self.max_falhas:
+            return "fechado"
+        return "aberto" if time.monotonic() < self.aberto_ate else "meio_aberto"
+
+    def permite(self) -> bool:
+        estado = self.estado
+        if estado == "fechado":
+            return True
+        if estado == "aberto":
+            return False
+        agora = time.monotonic()
+        if agora < self.sonda_ate:
+            return False
+        self.sonda_ate = agora + self.reset_segundos
+        return True
+
+    def sucesso(self):
+        self.falhas = 0
+        self.sonda_ate = 0.0
+
+    def falha(self):
+        self.falhas += 1
+        if self.falhas >= self.max_falhas:
+            self.aberto_ate = time.monotonic() + self.reset_segundos
+            self.sonda_ate = 0.0
+
+
+class MicroServicoClient:
+    """Cliente HTTP assíncrono compartilhado, com keep-alive, timeout, retry e circuit breaker."""
+
+    def __init__(self, nome: str, base_url: str, headers: dict = None):
+        self.nome = nome
+        self.base_url = base_url
+        self.headers = headers or {}
+        self.breaker = CircuitBreaker(MICRO_CIRCUIT_FAILURES, MICRO_CIRCUIT_RESET)
+        self._client = None
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=MICRO_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=MICRO_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=MICRO_HTTP_KEEPALIVE,
+                ),
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, path: str, *, retries: int = None, timeout: float = None, **kwargs) -> httpx.Response:
+        if self._client is None:
+            await self.start()
+        if not self.breaker.permite():
+            raise MicroServicoIndisponivel(f"{self.nome}: circuito aberto")
+
+        # POST não é idempotente: por padrão só repete quando a conexão nem chegou a ser feita
+        if retries is None:
+            retries = MICRO_HTTP_RETRIES if method == "GET" else 0
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        tentativa = 0
+        while True:
+            inicio = time.perf_counter()
+            try:
+                response = await self._client.request(method, path, **kwargs)
+                observar_externo(self.nome, method, str(response.status_code), time.perf_counter() - inicio)
+                if response.status_code < 500:
+                    self.breaker.sucesso()
+                    return response
+                erro = f"HTTP {response.status_code}"
+            except httpx.ConnectError as exc:
+                observar_externo(self.nome, method, "connect_error", time.perf_counter() - inicio)
+                erro = repr(exc)
+                if method != "GET" and tentativa == 0:
+                    retries = max(retries, 1)
+            except httpx.TransportError as exc:
+                observar_externo(self.nome, method, type(exc).__name__, time.perf_counter() - inicio)
+                erro = repr(exc)
+
+            self.breaker.falha()
+            if tentativa >= retries or self.breaker.estado != "fechado":
+                raise MicroServicoIndisponivel(f"{self.nome}: {erro}")
+            # Backoff exponencial com jitter completo
+            await asyncio.sleep(random.uniform(0, MICRO_HTTP_BACKOFF * (2 ** tentativa)))
+            tentativa += 1
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+
+# 🔹 Instâncias compartilhadas pelo processo (abertas/fechadas nos eventos da aplicação)
+rtmp_client = MicroServicoClient("micro-rtmp", MICRO_RTMP_URL)
+ai_client = MicroServicoClient("micro-ai", MICRO_AI_URL, headers={"Authorization": f"Bearer {MICRO_AI_TOKEN}"})
+
+
+async def start_clients():
+    await rtmp_client.start()
+    await ai_client.start()
+
+
+async def close_clients():
+    await rtmp_client.close()
+    await ai_client.close()
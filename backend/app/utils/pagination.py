@@ -0,0 +1,67 @@
+import base64
+import json
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+from app.core.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _codificar_cursor(valores) -> str:
+    bruto = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in valores], separators=(",", ":"))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor: str, colunas) -> list:
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(bruto)
+        if len(valores) != len(colunas):
+            raise ValueError
+        convertidos = []
+        for coluna, valor in zip(colunas, valores):
+            tipo = coluna.type.python_type
+            convertidos.append(tipo.fromisoformat(valor) if hasattr(tipo, "fromisoformat") else tipo(valor))
+        return convertidos
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+class Paginacao:
+    """Dependência de paginação por cursor (keyset) com `limit` e `cursor` opacos.
+
+    Opt-in: sem `limit` nem `cursor` a listagem devolve todas as linhas, como antes,
+    para clientes que não leem o cabeçalho. Com `cursor` e sem `limit` vale
+    PAGE_SIZE_DEFAULT. O cursor da próxima página vai no cabeçalho X-Next-Cursor,
+    mantendo o corpo da resposta como uma lista simples.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX),
+        cursor: Optional[str] = Query(None),
+    ):
+        self.limit = limit if limit is not None or not cursor else PAGE_SIZE_DEFAULT
+        self.cursor = cursor
+        self._colunas = ()
+
+    def aplicar(self, stmt, *colunas, desc: bool = False):
+        """Ordena pelas colunas-chave, filtra após o cursor e busca limit + 1 linhas."""
+        self._colunas = colunas
+        if self.cursor:
+            valores = _decodificar_cursor(self.cursor, colunas)
+            chave = tuple_(*colunas)
+            stmt = stmt.where(chave < tuple(valores) if desc else chave > tuple(valores))
+        ordem = [c.desc() for c in colunas] if desc else list(colunas)
+        stmt = stmt.order_by(*ordem)
+        return stmt if self.limit is None else stmt.limit(self.limit + 1)
+
+    def pagina(self, itens, response: Response) -> list:
+        """Corta a linha extra e publica o cursor da próxima página, se houver."""
+        itens = list(itens)
+        if self.limit is not None and len(itens) > self.limit:
+            itens = itens[: self.limit]
+            ultimo = itens[-1]
+            response.headers[NEXT_CURSOR_HEADER] = _codificar_cursor([getattr(ultimo, c.key) for c in self._colunas])
+        return itens
@@ -0,0 +1,62 @@
+"""Renderização dos PDFs de relatório, executada nos processos do pool (app.utils.pdf_reports).
+
+Fica separada do resto para que os processos filhos (iniciados com spawn) só importem
+o reportlab, sem FastAPI, SQLAlchemy nem os engines do banco.
+"""
+import os
+import tempfile
+
+
+def renderizar_pdf(dados: dict, destino: str):
+    """Roda no pool de processos: monta o PDF e grava de forma atômica em `destino`."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+    from xml.sax.saxutils import escape
+
+    estilos = getSampleStyleSheet()
+
+    def tabela(linhas):
+        return Table([[rotulo, "" if valor is None else str(valor)] for rotulo, valor in linhas], hAlign="LEFT")
+
+    conteudo = [
+        Paragraph("Relatório de Inspeção Veicular", estilos["Title"]),
+        Paragraph(f"Relatório nº {dados['id']} — {dados['data']}", estilos["Normal"]),
+        Spacer(1, 12),
+        Paragraph("Veículo", estilos["Heading2"]),
+        tabela([("Placa", dados["placa"]), ("Modelo", dados["modelo"]), ("Ano", dados["ano"]), ("Cor", dados["cor"]), ("Km", dados["km"])]),
+        Spacer(1, 12),
+        Paragraph("Inspeção", estilos["Heading2"]),
+        tabela([("Número", dados["inspecao_id"]), ("Data", dados["inspecao_data"]), ("Status", dados["status"]), ("Pátio", dados["patio_id"])]),
+        Paragraph(escape(dados["inspecao_resultado"] or ""), estilos["Normal"]),
+        Spacer(1, 12),
+        Paragraph("Resultado", estilos["Heading2"]),
+        Paragraph(escape(dados["resultado"] or ""), estilos["Normal"]),
+    ]
+
+    diretorio = os.path.dirname(destino)
+    os.makedirs(diretorio, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+    os.close(fd)
+    try:
+        SimpleDocTemplate(temporario, pagesize=A4, title=f"Relatório {dados['id']}").build(conteudo)
+        os.replace(temporario, destino)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+    _remover_versoes_antigas(diretorio, destino)
+
+
+def _remover_versoes_antigas(diretorio: str, atual: str):
+    """Apaga os PDFs anteriores do mesmo relatório (hash de dados que já mudaram).
+
+    Se duas versões forem renderizadas ao mesmo tempo e a mais nova for apagada pela
+    outra, a rota simplesmente a agenda de novo no próximo acesso.
+    """
+    for nome in os.listdir(diretorio):
+        caminho = os.path.join(diretorio, nome)
+        if nome.endswith(".pdf") and caminho != atual:
+            try:
+                os.unlink(caminho)
+            except FileNotFoundError:
+                pass
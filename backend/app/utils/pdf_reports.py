@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import REPORTS_DIR, PDF_WORKERS
+from app.database import AsyncSessionLocal
+from app.models import Relatorio, Inspecao, Veiculo
+from app.utils.pdf_render import renderizar_pdf
+
+# Incrementar quando o layout mudar, para invalidar os PDFs já gerados
+VERSAO_LAYOUT = 1
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_em_andamento = {}  # hash -> Future da renderização
+
+
+async def carregar_dados(db: AsyncSession, relatorio_id: int, usuario_id: int):
+    """Busca, em uma consulta, só os campos que entram no PDF."""
+    stmt = (
+        select(
+            Relatorio.id, Relatorio.data, Relatorio.resultado,
+            Inspecao.id.label("inspecao_id"), Inspecao.data.label("inspecao_data"), Inspecao.status,
+            Inspecao.resultado.label("inspecao_resultado"), Inspecao.patio_id,
+            Veiculo.placa, Veiculo.modelo, Veiculo.ano, Veiculo.cor, Veiculo.km,
+        )
+        .join(Inspecao, Inspecao.id == Relatorio.inspecao_id)
+        .join(Veiculo, Veiculo.id == Relatorio.veiculo_id)
+        .where(Relatorio.id == relatorio_id, Relatorio.usuario_id == usuario_id)
+    )
+    linha = (await db.execute(stmt)).first()
+    if linha is None:
+        return None
+    return {chave: (valor.isoformat() if hasattr(valor, "isoformat") else valor) for chave, valor in linha._mapping.items()}
+
+
+def hash_dados(dados: dict) -> str:
+    bruto = json.dumps({"layout": VERSAO_LAYOUT, "dados": dados}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(bruto.encode()).hexdigest()
+
+
+def caminho_pdf(relatorio_id: int, hash_: str) -> str:
+    # Um diretório por relatório: a versão nova substitui as anteriores (pdf_render.renderizar_pdf)
+    return os.path.join(REPORTS_DIR, str(relatorio_id), f"{hash_}.pdf")
+
+
+def _obter_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn em vez do fork padrão do Linux: a essa altura o processo já tem threads
+        # (executor do bcrypt, asyncpg, executor padrão do loop) e um fork herdaria locks presos.
+        # Os filhos só importam app.utils.pdf_render, sem o resto da aplicação.
+        _executor = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def agendar_renderizacao(dados: dict, hash_: str) -> asyncio.Future:
+    """Dispara a renderização no pool, uma única vez por hash de conteúdo."""
+    futuro = _em_andamento.get(hash_)
+    if futuro is None:
+        loop = asyncio.get_running_loop()
+        futuro = loop.run_in_executor(_obter_executor(), renderizar_pdf, dados, caminho_pdf(dados["id"], hash_))
+        _em_andamento[hash_] = futuro
+        futuro.add_done_callback(lambda f: _finalizar(hash_, f))
+    return futuro
+
+
+def _finalizar(hash_: str, futuro: asyncio.Future):
+    _em_andamento.pop(hash_, None)
+    if not futuro.cancelled() and futuro.exception() is not None:
+        logger.error("Falha ao gerar PDF %s", hash_, exc_info=futuro.exception())
+
+
+async def gerar_em_segundo_plano(relatorio_id: int, usuario_id: int):
+    """Usado após criar um relatório: gera o PDF fora do caminho da requisição."""
+    async with AsyncSessionLocal() as session:
+        dados = await carregar_dados(session, relatorio_id, usuario_id)
+    if dados is not None:
+        hash_ = hash_dados(dados)
+        if not os.path.exists(caminho_pdf(relatorio_id, hash_)):
+            await agendar_renderizacao(dados, hash_)
+
+
+def _intervalo(range_header: str, tamanho: int):
+    """Interpreta um único intervalo `bytes=inicio-fim` (None se não for satisfazível)."""
+    unidade, _, especificacao = range_header.partition("=")
+    if unidade.strip() != "bytes" or "," in especificacao:
+        return None
+    inicio, _, fim = especificacao.strip().partition("-")
+    try:
+        if inicio == "":
+            sufixo = int(fim)
+            if sufixo <= 0:
+                return None
+            return max(0, tamanho - sufixo), tamanho - 1
+        inicio = int(inicio)
+        fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+    except ValueError:
+        return None
+    if inicio >= tamanho or inicio > fim:
+        return None
+    return inicio, fim
+
+
+def servir_pdf(request: Request, caminho: str, etag: str, nome: str) -> Response:
+    """Entrega o arquivo com ETag, Cache-Control e suporte a Range de um intervalo."""
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=0, must-revalidate",
+        "Content-Disposition": f'inline; filename="{nome}"',
+    }
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == etag):
+        tamanho = os.path.getsize(caminho)
+        intervalo = _intervalo(range_header, tamanho)
+        if intervalo is None:
+            raise HTTPException(status_code=416, detail="Intervalo inválido", headers={"Content-Range": f"bytes */{tamanho}"})
+        inicio, fim = intervalo
+        with open(caminho, "rb") as arquivo:
+            arquivo.seek(inicio)
+            conteudo = arquivo.read(fim - inicio + 1)
+        headers["Content-Range"] = f"bytes {inicio}-{fim}/{tamanho}"
+        return Response(content=conteudo, status_code=206, media_type="application/pdf", headers=headers)
+    return FileResponse(caminho, media_type="application/pdf", headers=headers)
+
+
+def shutdown_pdf_executor():
+    if _executor is not None:
+        _executor.shutdown(wait=False)
@@ -0,0 +1,23 @@
+import re
+
+_NAO_ALFANUMERICO = re.compile(r"[^A-Z0-9]")
+_FORMATO_ANTIGO = re.compile(r"^[A-Z]{3}[0-9]{4}$")
+_DIGITO_PARA_LETRA = str.maketrans("0123456789", "ABCDEFGHIJ")
+
+
+def limpar_placa(valor: str) -> str:
+    """Maiúsculas, sem espaços, hífens ou outros separadores. Espelhada pela função SQL limpar_placa()."""
+    return _NAO_ALFANUMERICO.sub("", (valor or "").upper())
+
+
+def normalizar_placa(valor: str) -> str:
+    """Forma canônica usada nas buscas: placas no formato antigo (ABC1234) viram Mercosul (ABC1C34).
+
+    A conversão segue a regra do Denatran para o 5º caractere (0→A, 1→B, ..., 9→J), então
+    a mesma placa é encontrada em qualquer um dos formatos. Espelhada pela função SQL
+    normalizar_placa() criada na migração.
+    """
+    placa = limpar_placa(valor)
+    if _FORMATO_ANTIGO.match(placa):
+        placa = placa[:4] + placa[4].translate(_DIGITO_PARA_LETRA) + placa[5:]
+    return placa
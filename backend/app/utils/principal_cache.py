@@ -0,0 +1,124 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+from app.core.config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL
+from app.models import User
+from app.utils.invalidation import inscrever, publicar_sync
+
+
+# 🔹 Usuário autenticado, resolvido uma vez por token
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    name: str
+    role: str
+
+
+class PrincipalCache:
+    """Cache LRU + TTL de Principal indexado pelo digest do token.
+
+    Cada entrada expira no menor valor entre o TTL configurado e o `exp` do JWT,
+    então um token vencido nunca é servido pelo cache.
+    """
+
+    def __init__(self, max_entradas: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # digest -> (principal, expira_em)
+        self._por_usuario = {}  # user_id -> {digest}
+        self.hits = 0
+        self.misses = 0
+        self.expirados = 0
+        self.evictions = 0
+        self.invalidacoes = 0
+
+    @staticmethod
+    def _chave(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def obter(self, token: str):
+        chave = self._chave(token)
+        entrada = self._entradas.get(chave)
+        if entrada is None:
+            self.misses += 1
+            return None
+        principal, expira_em = entrada
+        if time.time() >= expira_em:
+            self.expirados += 1
+            self.misses += 1
+            self._remover(chave)
+            return None
+        self._entradas.move_to_end(chave)
+        self.hits += 1
+        return principal
+
+    def guardar(self, token: str, principal: Principal, exp: float):
+        chave = self._chave(token)
+        self._entradas[chave] = (principal, min(time.time() + self.ttl, exp))
+        self._entradas.move_to_end(chave)
+        self._por_usuario.setdefault(principal.id, set()).add(chave)
+        while len(self._entradas) > self.max_entradas:
+            antiga = next(iter(self._entradas))
+            self._remover(antiga)
+            self.evictions += 1
+
+    def _remover(self, chave: bytes):
+        entrada = self._entradas.pop(chave, None)
+        if entrada is None:
+            return
+        chaves = self._por_usuario.get(entrada[0].id)
+        if chaves is not None:
+            chaves.discard(chave)
+            if not chaves:
+                del self._por_usuario[entrada[0].id]
+
+    def invalidar_usuario(self, user_id: int):
+        for chave in list(self._por_usuario.get(user_id, ())):
+            self._remover(chave)
+            self.invalidacoes += 1
+
+    def invalidar_todos(self):
+        self.invalidacoes += len(self._entradas)
+        self._entradas.clear()
+        self._por_usuario.clear()
+
+    def estatisticas(self) -> dict:
+        consultas = self.hits + self.misses
+        return {
+            "entradas": len(self._entradas),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / consultas, 4) if consultas else 0.0,
+            "expirados": self.expirados,
+            "evictions": self.evictions,
+            "invalidacoes": self.invalidacoes,
+        }
+
+
+principal_cache = PrincipalCache()
+
+
+def _invalidar(user_id):
+    if user_id is None:
+        principal_cache.invalidar_todos()
+    else:
+        principal_cache.invalidar_usuario(user_id)
+
+
+inscrever("usuario", _invalidar)
+
+
+# 🔹 Ganchos de invalidação: mudança de papel ou remoção do usuário derruba o cache dele em todos os workers
+@event.listens_for(User, "after_update")
+def _usuario_atualizado(mapper, connection, target):
+    if inspect(target).attrs.role.history.has_changes():
+        publicar_sync(object_session(target), connection, "usuario", target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _usuario_removido(mapper, connection, target):
+    publicar_sync(object_session(target), connection, "usuario", target.id)
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from sqlalchemy import text
+from app.core.config import (
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_TRUST_PROXY,
+    RATE_LIMIT_PROXY_HOPS,
+    RATE_LIMIT_PG_TTL,
+)
+from app.utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+rate_limit_bloqueios = Counter("rate_limit_bloqueios_total", "Requisições recusadas pelo rate limit", ("rota", "escopo"))
+
+# Teto do corpo lido para extrair o e-mail; login e cadastro cabem com folga, acima disso responde 413
+MAX_CORPO_EMAIL = 8 * 1024
+
+
+@dataclass(frozen=True)
+class Limite:
+    """`quantidade` requisições a cada `periodo` segundos, com rajada de até `quantidade`."""
+    quantidade: int
+    periodo: float
+
+    @property
+    def taxa(self) -> float:
+        return self.quantidade / self.periodo
+
+
+@dataclass(frozen=True)
+class RegraLimite:
+    ip: Optional[Limite] = None
+    email: Optional[Limite] = None  # lido do campo "email" do corpo JSON
+
+
+class MemoriaBuckets:
+    """Token buckets no próprio processo: O(1) por requisição e no máximo `max_chaves` entradas (LRU)."""
+
+    def __init__(self, max_chaves: int = RATE_LIMIT_MAX_KEYS):
+        self.max_chaves = max_chaves
+        self._buckets = OrderedDict()  # chave -> (tokens, atualizado_em)
+        self.evictions = 0
+
+    async def consumir(self, chave: str, limite: Limite, custo: float = 1.0) -> float:
+        """Retorna 0 se liberado, senão os segundos até haver tokens suficientes."""
+        agora = time.monotonic()
+        bucket = self._buckets.get(chave)
+        if bucket is None:
+            tokens = float(limite.quantidade)
+        else:
+            tokens = min(limite.quantidade, bucket[0] + (agora - bucket[1]) * limite.taxa)
+            self._buckets.move_to_end(chave)
+
+        espera = 0.0
+        if tokens >= custo:
+            tokens -= custo
+        else:
+            espera = (custo - tokens) / limite.taxa
+        self._buckets[chave] = (tokens, agora)
+
+        while len(self._buckets) > self.max_chaves:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+        return espera
+
+    def estatisticas(self) -> dict:
+        return {"chaves": len(self._buckets), "evictions": self.evictions}
+
+
+class PostgresBuckets:
+    """Buckets compartilhados entre nós numa tabela UNLOGGED (ver migração de rate_limit_buckets).
+
+    Cada consumo é um único upsert atômico (função rate_limit_consumir) usando o relógio do
+    banco. Se o banco falhar, cai para os buckets locais em vez de bloquear o login.
+    """
+
+    # Chamadas entre limpezas de buckets ociosos
+    INTERVALO_LIMPEZA = 1000
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.local = MemoriaBuckets()
+        self._chamadas = 0
+        self.falhas = 0
+
+    async def consumir(self, chave: str, limite: Limite, custo: float = 1.0) -> float:
+        try:
+            async with self.engine.begin() as conn:
+                permitido, tokens = (await conn.execute(
+                    text("SELECT o_permitido, o_tokens FROM rate_limit_consumir(:chave, :rajada, :taxa, :custo)"),
+                    {"chave": chave, "rajada": float(limite.quantidade), "taxa": limite.taxa, "custo": float(custo)},
+                )).one()
+                self._chamadas += 1
+                if self._chamadas % self.INTERVALO_LIMPEZA == 0:
+                    await conn.execute(
+                        text("DELETE FROM rate_limit_buckets WHERE atualizado_em < extract(epoch FROM clock_timestamp()) - :ttl"),
+                        {"ttl": float(RATE_LIMIT_PG_TTL)},
+                    )
+        except Exception:
+            self.falhas += 1
+            logger.warning("Rate limit: banco indisponível, usando buckets locais", exc_info=True)
+            return await self.local.consumir(chave, limite, custo)
+        return 0.0 if permitido else (custo - tokens) / limite.taxa
+
+    def estatisticas(self) -> dict:
+        return {"chaves_locais": len(self.local._buckets), "falhas": self.falhas}
+
+
+def criar_store(engine):
+    if RATE_LIMIT_BACKEND == "postgres":
+        return PostgresBuckets(engine)
+    return MemoriaBuckets()
+
+
+def _ip_cliente(scope) -> str:
+    # O cliente escreve o que quiser à esquerda do X-Forwarded-For; só as entradas que
+    # os RATE_LIMIT_PROXY_HOPS proxies confiáveis acrescentaram (da direita) valem
+    if RATE_LIMIT_TRUST_PROXY:
+        entradas = [
+            ip.strip()
+            for nome, valor in scope.get("headers", ())
+            if nome == b"x-forwarded-for"
+            for ip in valor.decode("latin-1").split(",")
+            if ip.strip()
+        ]
+        if len(entradas) >= RATE_LIMIT_PROXY_HOPS:
+            return entradas[-RATE_LIMIT_PROXY_HOPS]
+    cliente = scope.get("client")
+    return cliente[0] if cliente else "desconhecido"
+
+
+def _email_do_corpo(corpo: bytes) -> Optional[str]:
+    try:
+        dados = json.loads(corpo)
+    except ValueError:
+        return None
+    email = dados.get("email") if isinstance(dados, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI: aplica as regras de `regras[(método, caminho)]` antes de chegar à rota.
+
+    O bucket por IP é consultado primeiro; o por e-mail (hash SHA-256 do endereço) só quando o
+    IP passou, para um atacante não esgotar o bucket de uma vítima a partir de IPs bloqueados.
+    """
+
+    def __init__(self, app, regras: Dict[Tuple[str, str], RegraLimite], store=None):
+        self.app = app
+        self.regras = regras
+        self.store = store if store is not None else MemoriaBuckets()
+
+    async def __call__(self, scope, receive, send):
+        regra = self.regras.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if regra is None:
+            await self.app(scope, receive, send)
+            return
+
+        rota = scope["path"]
+        if regra.ip is not None:
+            espera = await self.store.consumir(f"{rota}|ip|{_ip_cliente(scope)}", regra.ip)
+            if espera:
+                rate_limit_bloqueios.inc(rota, "ip")
+                await self._recusar(send, espera)
+                return
+
+        if regra.email is not None:
+            receive, email = await self._ler_email(scope, receive)
+            if receive is None:
+                await self._responder(send, 413, {"detail": "Corpo da requisição grande demais"})
+                return
+            if email is not None:
+                digest = hashlib.sha256(email.encode()).hexdigest()[:32]
+                espera = await self.store.consumir(f"{rota}|email|{digest}", regra.email)
+                if espera:
+                    rate_limit_bloqueios.inc(rota, "email")
+                    await self._recusar(send, espera)
+                    return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _ler_email(scope, receive):
+        """Lê o corpo para extrair o e-mail e devolve um `receive` que o reentrega à rota.
+
+        Nunca guarda mais que MAX_CORPO_EMAIL bytes (com ou sem Content-Length, inclusive
+        chunked): acima disso devolve `receive` None e a requisição é recusada com 413.
+        """
+        for nome, valor in scope.get("headers", ()):
+            if nome == b"content-length" and valor.isdigit() and int(valor) > MAX_CORPO_EMAIL:
+                return None, None
+
+        mensagens, tamanho = [], 0
+        while True:
+            mensagem = await receive()
+            mensagens.append(mensagem)
+            if mensagem["type"] != "http.request":
+                break
+            tamanho += len(mensagem.get("body", b""))
+            if tamanho > MAX_CORPO_EMAIL:
+                return None, None
+            if not mensagem.get("more_body", False):
+                break
+
+        corpo = b"".join(m.get("body", b"") for m in mensagens if m["type"] == "http.request")
+
+        async def receive_reenviado():
+            if mensagens:
+                return mensagens.pop(0)
+            return await receive()
+
+        return receive_reenviado, _email_do_corpo(corpo)
+
+    @staticmethod
+    async def _responder(send, status: int, corpo: dict, headers: list = ()):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), *headers],
+        })
+        await send({"type": "http.response.body", "body": json.dumps(corpo).encode()})
+
+    async def _recusar(self, send, espera: float):
+        await self._responder(
+            send, 429, {"detail": "Muitas tentativas. Tente novamente em instantes."},
+            [(b"retry-after", str(max(1, math.ceil(espera))).encode())],
+        )
@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, async_engine, criar_engine_async, DATABASE_REPLICA_URLS
+from app.core.config import (
+    REPLICA_POOL_SIZE,
+    REPLICA_MAX_LAG,
+    REPLICA_LAG_CHECK_INTERVAL,
+    READ_YOUR_WRITES_SECONDS,
+    READ_YOUR_WRITES_MAX_KEYS,
+)
+from app.utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+sessoes_leitura = Counter("db_read_sessions_total", "Sessões de leitura por destino", ("destino",))
+
+# 🔹 Engines das réplicas, com o mesmo perfil de pool do primário
+replica_engines = [criar_engine_async(url, REPLICA_POOL_SIZE) for url in DATABASE_REPLICA_URLS]
+
+COOKIE_PRIMARIO = "vt_primario"
+METODOS_LEITURA = {"GET", "HEAD", "OPTIONS"}
+ROTAS_SEM_ESCRITA = {"/api/auth/login"}  # POSTs que só leem: não fixam o cliente no primário
+
+# Atraso de replicação em segundos; 0 quando não há nada pendente de replay (réplica ociosa)
+SQL_ATRASO = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class MonitorReplicas:
+    """Mede o atraso de cada réplica periodicamente e mantém a lista das utilizáveis.
+
+    Até a primeira medição (ou se todas falharem/atrasarem além de REPLICA_MAX_LAG)
+    nenhuma réplica é usada e as leituras vão para o primário.
+    """
+
+    def __init__(self, engines: list):
+        self.engines = engines
+        self.atrasos = [None] * len(engines)  # None = sem medição ou inacessível
+        self.saudaveis = []
+        self._rodizio = itertools.count()
+        self._task = None
+
+    def start(self):
+        if self.engines and self._task is None:
+            self._task = asyncio.ensure_future(self._executar())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for engine in self.engines:
+            await engine.dispose()
+
+    async def _medir(self, engine):
+        async with engine.connect() as conn:
+            return float((await conn.execute(SQL_ATRASO)).scalar())
+
+    async def _executar(self):
+        while True:
+            for indice, engine in enumerate(self.engines):
+                try:
+                    self.atrasos[indice] = await asyncio.wait_for(self._medir(engine), REPLICA_LAG_CHECK_INTERVAL)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    if self.atrasos[indice] is not None:
+                        logger.warning("Réplica %d inacessível, saindo da rotação: %r", indice, exc)
+                    self.atrasos[indice] = None
+            self.saudaveis = [
+                engine for engine, atraso in zip(self.engines, self.atrasos)
+                if atraso is not None and atraso <= REPLICA_MAX_LAG
+            ]
+            await asyncio.sleep(REPLICA_LAG_CHECK_INTERVAL)
+
+    def escolher(self):
+        """Réplica saudável em rodízio, ou None."""
+        saudaveis = self.saudaveis
+        if not saudaveis:
+            return None
+        return saudaveis[next(self._rodizio) % len(saudaveis)]
+
+    def estatisticas(self) -> dict:
+        return {f"replica{i}": (-1 if atraso is None else atraso) for i, atraso in enumerate(self.atrasos)}
+
+
+class EscritasRecentes:
+    """Digests de tokens que escreveram há menos de READ_YOUR_WRITES_SECONDS (LRU, por processo).
+
+    Complementa o cookie para clientes que não guardam cookies (apps móveis). Como é
+    local ao worker, em implantações com vários workers o cookie é a garantia principal.
+    """
+
+    def __init__(self, janela: float = READ_YOUR_WRITES_SECONDS, max_chaves: int = READ_YOUR_WRITES_MAX_KEYS):
+        self.janela = janela
+        self.max_chaves = max_chaves
+        self._expira = OrderedDict()  # digest -> monotonic de expiração
+
+    @staticmethod
+    def _chave(autorizacao: bytes) -> bytes:
+        return hashlib.sha256(autorizacao).digest()
+
+    def marcar(self, autorizacao: bytes):
+        chave = self._chave(autorizacao)
+        self._expira[chave] = time.monotonic() + self.janela
+        self._expira.move_to_end(chave)
+        while len(self._expira) > self.max_chaves:
+            self._expira.popitem(last=False)
+
+    def recente(self, autorizacao: bytes) -> bool:
+        chave = self._chave(autorizacao)
+        expira = self._expira.get(chave)
+        if expira is None:
+            return False
+        if time.monotonic() >= expira:
+            del self._expira[chave]
+            return False
+        return True
+
+
+replica_monitor = MonitorReplicas(replica_engines)
+escritas_recentes = EscritasRecentes()
+
+
+def _autorizacao(headers) -> bytes:
+    for nome, valor in headers:
+        if nome == b"authorization":
+            return valor
+    return b""
+
+
+def engine_leitura(request: Request):
+    """Engine para as leituras desta requisição: réplica saudável, salvo escrita recente do cliente."""
+    if not replica_monitor.saudaveis or request.cookies.get(COOKIE_PRIMARIO):
+        return async_engine
+    autorizacao = _autorizacao(request.scope.get("headers", ()))
+    if autorizacao and escritas_recentes.recente(autorizacao):
+        return async_engine
+    return replica_monitor.escolher() or async_engine
+
+
+def sessao_leitura(request: Request) -> AsyncSession:
+    engine = engine_leitura(request)
+    sessoes_leitura.inc("primario" if engine is async_engine else "replica")
+    return AsyncSessionLocal(bind=engine)
+
+
+# 🔹 Dependência para rotas só de leitura (GET); escritas continuam em get_db
+async def get_db_leitura(request: Request):
+    async with sessao_leitura(request) as session:
+        yield session
+
+
+class ReadYourWritesMiddleware:
+    """Após uma requisição de escrita bem-sucedida (2xx/3xx), fixa o cliente no primário por READ_YOUR_WRITES_SECONDS.
+
+    Grava o cookie `vt_primario` na resposta e o digest do Authorization em `escritas_recentes`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cookie = (
+            f"{COOKIE_PRIMARIO}=1; Max-Age={READ_YOUR_WRITES_SECONDS}; Path=/; HttpOnly; SameSite=Lax"
+        ).encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in METODOS_LEITURA or scope["path"] in ROTAS_SEM_ESCRITA:
+            await self.app(scope, receive, send)
+            return
+
+        autorizacao = _autorizacao(scope.get("headers", ()))
+
+        async def send_marcado(mensagem):
+            # Só escrita aceita fixa: 4xx/5xx (login errado, 429, validação) não mudaram nada
+            if mensagem["type"] == "http.response.start" and mensagem["status"] < 400:
+                if autorizacao:
+                    escritas_recentes.marcar(autorizacao)
+                mensagem = {**mensagem, "headers": list(mensagem.get("headers", [])) + [(b"set-cookie", self.cookie)]}
+            await send(mensagem)
+
+        await self.app(scope, receive, send_marcado)
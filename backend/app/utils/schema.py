@@ -0,0 +1,49 @@
+import os
+from sqlalchemy import text
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+
+class SchemaDesatualizado(RuntimeError):
+    """Revisão do banco diferente do head das migrações."""
+
+
+class SchemaAusente(SchemaDesatualizado):
+    """Banco nunca migrado: nenhuma tabela da aplicação existe."""
+
+
+def alembic_config() -> Config:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    return config
+
+
+def revisoes_head() -> set:
+    """Lê o(s) head(s) direto dos arquivos de migração, sem tocar no banco."""
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+async def revisoes_banco(conn) -> set:
+    """Uma única consulta à tabela alembic_version (vazia se o banco nunca foi migrado)."""
+    try:
+        result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+    except Exception:
+        return set()
+    return set(result.scalars().all())
+
+
+async def verificar_schema(conn) -> None:
+    head = revisoes_head()
+    atual = await revisoes_banco(conn)
+    if not atual:
+        raise SchemaAusente(
+            f"Banco sem nenhuma migração aplicada, migrações em {sorted(head)}. "
+            "Rode `python -m app.cli migrate`."
+        )
+    if atual != head:
+        raise SchemaDesatualizado(
+            f"Banco na revisão {sorted(atual) or 'nenhuma'}, migrações em {sorted(head)}. "
+            "Rode `python -m app.cli migrate`."
+        )
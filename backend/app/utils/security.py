@@ -1,11 +1,23 @@
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
+import asyncio
+import threading
+import time
+from typing import Optional
 import jwt
 from dotenv import load_dotenv
 import os
 from jose import JWTError
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, EVENTS_TICKET_SECONDS
+from app.database import AsyncSessionLocal, async_engine
+from app.models import User
+from app.utils.principal_cache import Principal, principal_cache
+from app.utils.replicas import METODOS_LEITURA, sessao_leitura
 
 # Carregar variáveis do .env
 load_dotenv()
@@ -26,6 +38,49 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+# 🔹 Pool dedicado ao bcrypt: cada hash leva ~100-300 ms e não pode travar o event loop
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_pendentes = 0  # hashes enfileirados ou rodando no pool
+_hash_lock = threading.Lock()
+
+def _liberar_hash(_futuro):
+    # Roda na thread do bcrypt (ou no cancel de um job ainda na fila), não no event loop
+    global _hash_pendentes
+    with _hash_lock:
+        _hash_pendentes -= 1
+
+async def _executar_hash(func, *args):
+    global _hash_pendentes
+    with _hash_lock:
+        saturado = _hash_pendentes >= PASSWORD_HASH_MAX_PENDING
+        if not saturado:
+            _hash_pendentes += 1
+    # Pool saturado: melhor recusar rápido do que enfileirar logins indefinidamente
+    if saturado:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Servidor ocupado, tente novamente em instantes",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        futuro = _hash_executor.submit(func, *args)
+    except BaseException:
+        _liberar_hash(None)
+        raise
+    # A vaga só é devolvida quando o job termina: se o cliente desconectar, o await é
+    # cancelado mas o bcrypt já em execução continua ocupando a thread
+    futuro.add_done_callback(_liberar_hash)
+    return await asyncio.wrap_future(futuro)
+
+async def hash_password_async(password: str) -> str:
+    return await _executar_hash(hash_password, password)
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await _executar_hash(verify_password, plain_password, hashed_password)
+
+def shutdown_hash_executor():
+    _hash_executor.shutdown(wait=False)
+
 # Função para gerar token JWT
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -45,7 +100,62 @@ def decode_access_token(token: str):
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)) -> Principal:
+    return await autenticar_token(token, request)
+
+# 🔹 Ticket do EventSource: JWT curto que só abre o /events. O token de acesso nunca vai
+# na URL (logs de acesso, proxies, histórico do navegador)
+USO_TICKET_SSE = "sse"
+
+def criar_ticket_sse(principal: Principal) -> str:
+    expira = datetime.utcnow() + timedelta(seconds=EVENTS_TICKET_SECONDS)
+    return jwt.encode({"sub": principal.email, "name": principal.name, "uso": USO_TICKET_SSE, "exp": expira}, SECRET_KEY, algorithm=ALGORITHM)
+
+# 🔹 Variante para EventSource, que não envia cabeçalhos: aceita o Bearer ou ?ticket=
+async def get_current_user_sse(
+    request: Request,
+    token: Optional[str] = Depends(OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)),
+    ticket: Optional[str] = Query(None),
+) -> Principal:
+    if token:
+        return await autenticar_token(token, request)
+
+    payload = decode_access_token(ticket) if ticket else None
+    user = None
+    if payload is not None and payload.get("uso") == USO_TICKET_SSE and "sub" in payload:
+        user = await _buscar_principal(payload["sub"], request)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Ticket de eventos inválido ou expirado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return Principal(id=user.id, email=payload["sub"], name=payload.get("name", ""), role=user.role)
+
+def stmt_principal(email: str):
+    return select(User.id, User.role).where(User.email == email)
+
+def _sessao_autenticacao(request: Request) -> AsyncSession:
+    # GETs autenticam na mesma réplica das suas leituras (ou no primário, se o cliente estiver fixado)
+    if request.method in METODOS_LEITURA:
+        return sessao_leitura(request)
+    return AsyncSessionLocal()
+
+async def _buscar_principal(email: str, request: Request):
+    async with _sessao_autenticacao(request) as db:
+        user = (await db.execute(stmt_principal(email))).first()
+        if user is not None or db.bind is async_engine:
+            return user
+    # Usuário recém-criado que a réplica ainda não recebeu: confirma no primário
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(stmt_principal(email))).first()
+
+async def autenticar_token(token: str, request: Request) -> Principal:
+    # 🔹 Token já visto: evita decodificar o JWT e consultar o usuário de novo
+    principal = principal_cache.obter(token)
+    if principal is not None:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token inválido ou expirado",
@@ -58,11 +168,15 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         or "sub" not in payload
         or "name" not in payload
         or "role" not in payload
+        or "uso" in payload  # ticket de SSE não serve como token de acesso
     ):
         raise credentials_exception
 
-    return {
-        "email": payload["sub"],
-        "name": payload["name"],
-        "role": payload["role"]
-    }
\ No newline at end of file
+    # A sessão só é aberta quando o cache falha
+    user = await _buscar_principal(payload["sub"], request)
+    if user is None:
+        raise credentials_exception
+
+    principal = Principal(id=user.id, email=payload["sub"], name=payload["name"], role=user.role)
+    principal_cache.guardar(token, principal, payload.get("exp", time.time()))
+    return principal
@@ -0,0 +1,70 @@
+import asyncio
+import time
+from app.core.config import STREAMS_CACHE_TTL
+
+
+class StreamCache:
+    """Cache em memória da listagem /streams com TTL curto e coalescência de requisições.
+
+    Várias requisições concorrentes com o cache expirado compartilham uma única
+    chamada ao Micro RTMP. Mantém também o índice patio_id -> streams.
+    """
+
+    def __init__(self, carregar, ttl: float = STREAMS_CACHE_TTL):
+        self._carregar = carregar  # corrotina que retorna o JSON de /streams
+        self.ttl = ttl
+        self._dados = None
+        self._por_patio = {}
+        self._expira_em = 0.0
+        self._em_voo = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def _atualizar(self):
+        dados = await self._carregar()
+        por_patio = {}
+        for stream in dados.get("streams", []):
+            por_patio.setdefault(stream.get("patio_id"), []).append(stream)
+        self._dados = dados
+        self._por_patio = por_patio
+        self._expira_em = time.monotonic() + self.ttl
+        return dados
+
+    async def obter(self) -> dict:
+        if self._dados is not None and time.monotonic() < self._expira_em:
+            self.hits += 1
+            return self._dados
+
+        # Já existe uma consulta em andamento: aguarda o mesmo resultado
+        if self._em_voo is not None:
+            self.coalesced += 1
+            return await asyncio.shield(self._em_voo)
+
+        self.misses += 1
+        self._em_voo = asyncio.ensure_future(self._atualizar())
+        self._em_voo.add_done_callback(self._finalizar_voo)
+        return await asyncio.shield(self._em_voo)
+
+    def _finalizar_voo(self, future):
+        self._em_voo = None
+        if not future.cancelled():
+            future.exception()  # evita o aviso de exceção não recuperada
+
+    async def por_patios(self, patio_ids) -> list:
+        await self.obter()
+        streams = []
+        for patio_id in patio_ids:
+            streams.extend(self._por_patio.get(patio_id, ()))
+        return streams
+
+    def invalidar(self):
+        self._expira_em = 0.0
+
+    def estatisticas(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "patios_indexados": len(self._por_patio),
+        }
@@ -0,0 +1,102 @@
+"""Roda EXPLAIN nas consultas quentes das rotas e falha se alguma fizer Seq Scan numa tabela grande.
+
+    python -m benchmarks.explain                   # depois de `python -m benchmarks.seed`
+    python -m benchmarks.explain --min-linhas 5000
+
+As consultas vêm das mesmas funções `stmt_*` que as rotas executam, então o gate
+acompanha o que roda de verdade. Usa o primeiro usuário semeado para os parâmetros.
+
+O planner roda com as configurações padrão, sobre os volumes do seed: o plano é o
+que a API teria em produção. Seq Scan em tabela pequena (pátios, câmeras, usuários)
+é a escolha certa e não conta; só falha a consulta que varre uma tabela com pelo
+menos --min-linhas linhas estimadas (pg_class.reltuples). Sai com código 1 listando
+essas consultas e seus planos.
+"""
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app.core.config import PAGE_SIZE_DEFAULT
+from app.database import sync_engine
+from app.models import User, Relatorio, Veiculo
+from app.routes import agenda, cameras, events, inspecoes, relatorios, veiculos
+from app.utils.disponibilidade import stmt_ocupacao, stmt_ocupacao_slot
+from app.utils.pagination import Paginacao
+from app.utils.placa import normalizar_placa
+from app.utils.security import stmt_principal
+from benchmarks.seed import LOCAIS, email, placa
+
+MIN_LINHAS = 10_000
+
+
+def _primeira_pagina() -> Paginacao:
+    return Paginacao(limit=PAGE_SIZE_DEFAULT, cursor=None)
+
+
+def consultas(user_id: int, patio_ids: list, inspecao_id: int, placa_: str) -> dict:
+    hoje = date.today()
+    return {
+        "veiculos.listar": veiculos.stmt_listagem(user_id, _primeira_pagina()),
+        "veiculos.busca": veiculos.stmt_busca(user_id, "1234"),
+        "veiculos.historico": veiculos.stmt_historico(user_id, email(0), placa_),
+        "veiculos.bulk_existentes": veiculos.stmt_placas_existentes([normalizar_placa(placa_), "ZZZ9Z99"]),
+        "relatorios.listar": relatorios.stmt_listagem(user_id, _primeira_pagina()),
+        "relatorios.por_inspecao": relatorios.stmt_listagem(user_id, _primeira_pagina(), inspecao_id=inspecao_id),
+        "relatorios.export": relatorios.stmt_exportacao(user_id),
+        "inspecoes.export": inspecoes.stmt_exportacao(email(0)),
+        "agenda.listar": agenda.stmt_listagem(user_id, _primeira_pagina()),
+        "agenda.resumo": agenda.stmt_resumo(user_id),
+        "agenda.disponibilidade": stmt_ocupacao(LOCAIS[0], hoje, hoje + timedelta(days=30)),
+        "agenda.reservar_slot": stmt_ocupacao_slot(LOCAIS[0], hoje, 0),
+        "cameras.patios": cameras.stmt_patios_do_usuario(user_id),
+        "events.inspecoes": events.stmt_varredura_inspecoes(patio_ids),
+        "auth.usuario": stmt_principal(email(0)),
+    }
+
+
+def _varreduras(no: dict):
+    """Tabelas lidas por Seq Scan em qualquer ponto do plano (JSON do EXPLAIN)."""
+    if no.get("Node Type") == "Seq Scan":
+        yield no["Relation Name"]
+    for filho in no.get("Plans", ()):
+        yield from _varreduras(filho)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.explain")
+    parser.add_argument("--min-linhas", type=int, default=MIN_LINHAS,
+                        help="Seq Scan só falha em tabelas com pelo menos isso de linhas estimadas")
+    args = parser.parse_args(argv)
+
+    falhas = []
+    with sync_engine.connect() as conn:
+        user_id = conn.execute(select(User.id).where(User.email == email(0))).scalar()
+        if user_id is None:
+            print("Rode `python -m benchmarks.seed` antes.", file=sys.stderr)
+            return 2
+        patio_ids = conn.execute(cameras.stmt_patios_do_usuario(user_id)).scalars().all() or [0]
+        inspecao_id = conn.execute(select(Relatorio.inspecao_id).where(Relatorio.usuario_id == user_id).limit(1)).scalar() or 0
+        placa_ = conn.execute(select(Veiculo.placa).where(Veiculo.usuario_id == user_id).limit(1)).scalar() or placa(0, 0)
+        linhas = dict(conn.exec_driver_sql(
+            "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        ).all())
+
+        for nome, stmt in consultas(user_id, patio_ids, inspecao_id, placa_).items():
+            sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            plano = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+            plano = json.loads(plano) if isinstance(plano, str) else plano
+            grandes = sorted({t for t in _varreduras(plano[0]["Plan"]) if linhas.get(t, 0) >= args.min_linhas})
+            situacao = f"SEQ SCAN em {', '.join(grandes)}" if grandes else "ok"
+            print(f"{nome:28s} {situacao}")
+            if grandes:
+                texto = "\n".join(conn.exec_driver_sql(f"EXPLAIN {sql}").scalars())
+                falhas.append((nome, texto))
+    for nome, plano in falhas:
+        print(f"\n--- {nome}\n{plano}", file=sys.stderr)
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
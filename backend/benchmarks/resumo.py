@@ -0,0 +1,123 @@
+"""Mede o /agenda/resumo com um usuário de muitos agendamentos (100k por padrão).
+
+    python -m benchmarks.resumo                         # 100k agendamentos, 20 repetições
+    python -m benchmarks.resumo --agendamentos 250000 -o resumo.json
+
+Compara, no mesmo banco, as três formas de montar o resumo:
+
+- carregar_tudo: o código antigo, todos os Agendamento em Python e três passadas;
+- agregado: stmt_resumo (COUNT ... FILTER, MAX), coberto por ix_agendamentos_usuario_status_data;
+- materializado: a linha de agenda_resumos que a rota lê.
+
+O usuário bench-resumo@vistotrack.com é recriado a cada execução; os demais dados
+do banco não são tocados. O banco precisa estar migrado.
+"""
+import argparse
+import json
+import random
+import sys
+import time as relogio
+from datetime import date, time, timedelta
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from app.database import sync_engine
+from app.models import User, Agendamento, AgendaResumo
+from app.routes.agenda import stmt_resumo
+from benchmarks.seed import LOCAIS, _inserir
+
+EMAIL = "bench-resumo@vistotrack.com"
+
+
+def semear(agendamentos: int, semente: int) -> int:
+    rnd = random.Random(semente)
+    hoje = date.today()
+    with sync_engine.begin() as conn:
+        antigo = conn.execute(select(User.id).where(User.email == EMAIL)).scalar()
+        if antigo is not None:
+            conn.execute(delete(AgendaResumo).where(AgendaResumo.usuario_id == antigo))
+            conn.execute(delete(Agendamento).where(Agendamento.usuario_id == antigo))
+            conn.execute(delete(User).where(User.id == antigo))
+        user_id = conn.execute(
+            insert(User).values(nome="Bench resumo", email=EMAIL, telefone="11999999999", senha="x", role="user").returning(User.id)
+        ).scalar()
+        _inserir(conn, Agendamento, [
+            {"usuario_id": user_id, "data": hoje + timedelta(days=rnd.randint(-3650, 90)),
+             "horario": time(rnd.randint(8, 17), rnd.choice([0, 30])), "local": rnd.choice(LOCAIS),
+             "status": rnd.choice(["Pendente", "Concluído"])}
+            for _ in range(agendamentos)
+        ])
+        pendentes, concluidos, ultimo = conn.execute(stmt_resumo(user_id)).one()
+        conn.execute(insert(AgendaResumo).values(
+            usuario_id=user_id, pendentes=pendentes, concluidos=concluidos, ultimo_agendamento=ultimo
+        ))
+        conn.exec_driver_sql("ANALYZE agendamentos")
+        conn.exec_driver_sql("ANALYZE agenda_resumos")
+    return user_id
+
+
+def carregar_tudo(db: Session, user_id: int) -> tuple:
+    agendamentos = db.execute(select(Agendamento).where(Agendamento.usuario_id == user_id)).scalars().all()
+    pendentes = len([a for a in agendamentos if a.status == "Pendente"])
+    concluidos = len([a for a in agendamentos if a.status == "Concluído"])
+    ultimo = max([a.data for a in agendamentos], default=None)
+    db.expunge_all()
+    return pendentes, concluidos, ultimo
+
+
+def agregado(db: Session, user_id: int) -> tuple:
+    return tuple(db.execute(stmt_resumo(user_id)).one())
+
+
+def materializado(db: Session, user_id: int) -> tuple:
+    resumo = db.get(AgendaResumo, user_id)
+    db.expunge_all()  # sem isso o identity map responderia as repetições sem ir ao banco
+    return resumo.pendentes, resumo.concluidos, resumo.ultimo_agendamento
+
+
+def medir(funcao, db: Session, user_id: int, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = relogio.perf_counter()
+        funcao(db, user_id)
+        tempos.append(relogio.perf_counter() - inicio)
+    tempos.sort()
+    return {
+        "min_ms": round(tempos[0] * 1000, 2),
+        "mediana_ms": round(tempos[len(tempos) // 2] * 1000, 2),
+        "max_ms": round(tempos[-1] * 1000, 2),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.resumo")
+    parser.add_argument("--agendamentos", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("-o", "--saida")
+    args = parser.parse_args(argv)
+
+    user_id = semear(args.agendamentos, args.seed)
+    resultado = {"agendamentos": args.agendamentos, "repeticoes": args.repeticoes, "estrategias": {}}
+    with Session(sync_engine) as db:
+        esperado = carregar_tudo(db, user_id)
+        for nome, funcao in (("carregar_tudo", carregar_tudo), ("agregado", agregado), ("materializado", materializado)):
+            # As três precisam concordar, senão o tempo medido não vale nada
+            if funcao(db, user_id) != esperado:
+                print(f"{nome} divergiu de carregar_tudo", file=sys.stderr)
+                return 1
+            resultado["estrategias"][nome] = medir(funcao, db, user_id, args.repeticoes)
+
+    base = resultado["estrategias"]["carregar_tudo"]["mediana_ms"]
+    for medida in resultado["estrategias"].values():
+        medida["ganho"] = round(base / max(medida["mediana_ms"], 0.001), 1)
+
+    texto = json.dumps(resultado, indent=2)
+    print(texto)
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            arquivo.write(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
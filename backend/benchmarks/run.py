@@ -0,0 +1,222 @@
+"""Carga em concorrência fixa contra uma API em execução; resultado em JSON.
+
+    python -m benchmarks.stubs &                 # RTMP/IA locais
+    python -m benchmarks.seed                    # dados
+    RATE_LIMIT_ENABLED=false uvicorn app.main:app --workers 4 &   # API apontando para os stubs
+    python -m benchmarks.run --url http://127.0.0.1:8000 --concorrencia 32 --duracao 20 -o bench.json
+
+Para cada cenário registra throughput, latência p50/p95/p99 e consultas SQL
+por requisição (diferença do /metrics antes e depois). Compare os JSON de
+commits diferentes para achar regressões. O cenário "inspecoes" mede inspeções
+por segundo em GET /api/inspecoes/{id} sobre as inspeções semeadas de cada usuário.
+
+O rate limit de /api/auth/login (REGRAS_RATE_LIMIT em app/main.py) mede outra coisa
+que não a capacidade da API: suba o servidor com RATE_LIMIT_ENABLED=false. Se ele
+estiver ativo, o login inicial espera o Retry-After de cada 429 (fica lento, mas
+não falha) e as respostas 429 dos cenários são contadas em "limitadas", separadas
+de "erros".
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks.seed import BENCH_SENHA, email
+
+CENARIOS = {
+    "login": ("POST", "/api/auth/login"),
+    "veiculos": ("GET", "/api/veiculos/"),
+    "agenda_resumo": ("GET", "/api/agenda/resumo"),
+    "relatorios": ("GET", "/api/relatorios/"),
+    "cameras_me": ("GET", "/api/cameras/me"),
+    "cameras_ativas": ("GET", "/api/cameras/ativas"),
+    # Inspeções por segundo: cada requisição abre uma inspeção semeada do próprio usuário
+    "inspecoes": ("GET", "/api/inspecoes/{id}"),
+}
+
+_METRICA_CONSULTAS = re.compile(r'^db_queries_per_request_(sum|count)\{route="([^"]*)"\} ([0-9.e+-]+)$')
+
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def resumir(latencias: list, erros: int, duracao: float, limitadas: int = 0) -> dict:
+    return {
+        "requisicoes": len(latencias),
+        "erros": erros,
+        "limitadas": limitadas,
+        "throughput_rps": round(len(latencias) / duracao, 2) if duracao else 0.0,
+        "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 2),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 2),
+    }
+
+
+async def consultas_por_rota(client: httpx.AsyncClient) -> dict:
+    """Lê soma e contagem do histograma db_queries_per_request do /metrics."""
+    try:
+        texto = (await client.get("/metrics")).text
+    except httpx.HTTPError:
+        return {}
+    rotas = {}
+    for linha in texto.splitlines():
+        achou = _METRICA_CONSULTAS.match(linha)
+        if achou:
+            tipo, rota, valor = achou.groups()
+            rotas.setdefault(rota, {"sum": 0.0, "count": 0.0})[tipo] = float(valor)
+    return rotas
+
+
+# Esperas seguidas por 429 antes de desistir do login de um usuário
+MAX_ESPERAS_429 = 10
+
+
+async def autenticar(client: httpx.AsyncClient, usuarios: int) -> list:
+    tokens = []
+    avisado = False
+    for n in range(usuarios):
+        for _ in range(MAX_ESPERAS_429):
+            r = await client.post("/api/auth/login", json={"email": email(n), "senha": BENCH_SENHA})
+            if r.status_code != 429:
+                break
+            if not avisado:
+                print("Login limitado (429): use RATE_LIMIT_ENABLED=false no servidor; aguardando Retry-After", file=sys.stderr)
+                avisado = True
+            await asyncio.sleep(float(r.headers.get("retry-after", "1")))
+        r.raise_for_status()
+        tokens.append(r.json()["access_token"])
+    return tokens
+
+
+async def ids_de_inspecoes(client: httpx.AsyncClient, tokens: list) -> list:
+    """Ids das inspeções de cada usuário, lidos do export NDJSON (uma lista por token)."""
+    ids = []
+    for token in tokens:
+        r = await client.get("/api/inspecoes/export", params={"formato": "ndjson"},
+                             headers={"Authorization": f"Bearer {token}"})
+        r.raise_for_status()
+        ids.append([json.loads(linha)["id"] for linha in r.text.splitlines() if linha.strip()])
+    if not any(ids):
+        raise SystemExit("Nenhuma inspeção semeada: rode `python -m benchmarks.seed` com --inspecoes > 0")
+    return ids
+
+
+async def _martelar(client, metodo, caminho, tokens, usuarios, ate, latencias, contagem, ids=None):
+    while time.perf_counter() < ate:
+        n = random.randrange(usuarios)
+        if ids is not None and not ids[n]:
+            continue
+        alvo = caminho.format(id=random.choice(ids[n])) if ids is not None else caminho
+        inicio = time.perf_counter()
+        try:
+            if metodo == "POST":
+                r = await client.post(alvo, json={"email": email(n), "senha": BENCH_SENHA})
+            else:
+                headers = {"Authorization": f"Bearer {tokens[n]}"} if tokens else {}
+                r = await client.get(alvo, headers=headers)
+            codigo = r.status_code
+        except httpx.HTTPError:
+            codigo = None
+        latencias.append(time.perf_counter() - inicio)
+        if codigo == 429:
+            contagem["limitadas"] += 1
+        elif codigo is None or codigo >= 400:
+            contagem["erros"] += 1
+
+
+async def cenario(client, nome, tokens, args, ids=None) -> dict:
+    metodo, caminho = CENARIOS[nome]
+    latencias, contagem = [], {"erros": 0, "limitadas": 0}
+    antes = await consultas_por_rota(client)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _martelar(client, metodo, caminho, tokens, args.usuarios, inicio + args.duracao, latencias, contagem, ids)
+        for _ in range(args.concorrencia)
+    ))
+    duracao = time.perf_counter() - inicio
+    resultado = resumir(latencias, contagem["erros"], duracao, contagem["limitadas"])
+
+    depois = await consultas_por_rota(client)
+    rota = depois.get(caminho) or depois.get(caminho.rstrip("/")) or {}
+    base = antes.get(caminho) or antes.get(caminho.rstrip("/")) or {}
+    requisicoes = rota.get("count", 0) - base.get("count", 0)
+    if requisicoes:
+        resultado["db_consultas_por_requisicao"] = round((rota["sum"] - base.get("sum", 0)) / requisicoes, 2)
+    return resultado
+
+
+async def ping_durante_login(client, args) -> dict:
+    """Latência do /ping enquanto uma tempestade de logins ocupa o bcrypt."""
+    ate = time.perf_counter() + args.duracao
+    login_lat, login_cont = [], {"erros": 0, "limitadas": 0}
+    ping_lat, ping_cont = [], {"erros": 0, "limitadas": 0}
+    inicio = time.perf_counter()
+    await asyncio.gather(
+        *(_martelar(client, "POST", "/api/auth/login", None, args.usuarios, ate, login_lat, login_cont) for _ in range(args.concorrencia)),
+        _martelar(client, "GET", "/ping", None, args.usuarios, ate, ping_lat, ping_cont),
+    )
+    duracao = time.perf_counter() - inicio
+    return {
+        "ping": resumir(ping_lat, ping_cont["erros"], duracao, ping_cont["limitadas"]),
+        "login": resumir(login_lat, login_cont["erros"], duracao, login_cont["limitadas"]),
+    }
+
+
+def commit_atual() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+async def executar(args) -> dict:
+    limites = httpx.Limits(max_connections=args.concorrencia * 2, max_keepalive_connections=args.concorrencia * 2)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=30) as client:
+        tokens = await autenticar(client, args.usuarios)
+        resultados = {}
+        for nome in args.cenarios:
+            if nome == "ping_durante_login":
+                resultados[nome] = await ping_durante_login(client, args)
+            elif nome == "inspecoes":
+                resultados[nome] = await cenario(client, nome, tokens, args, await ids_de_inspecoes(client, tokens))
+            else:
+                resultados[nome] = await cenario(client, nome, tokens, args)
+    return {
+        "commit": commit_atual(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {"url": args.url, "concorrencia": args.concorrencia, "duracao_s": args.duracao, "usuarios": args.usuarios},
+        "resultados": resultados,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--duracao", type=float, default=20, help="segundos por cenário")
+    parser.add_argument("--usuarios", type=int, default=50, help="usuários semeados a usar")
+    parser.add_argument("--cenarios", nargs="+", default=list(CENARIOS) + ["ping_durante_login"],
+                        choices=list(CENARIOS) + ["ping_durante_login"])
+    parser.add_argument("-o", "--saida", help="arquivo JSON (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    resultado = asyncio.run(executar(args))
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            arquivo.write(texto + "\n")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
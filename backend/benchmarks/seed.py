@@ -0,0 +1,127 @@
+"""Popula um Postgres local com volumes realistas para os benchmarks.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.seed --usuarios 50 --veiculos 200 \
+        --agendamentos 2000 --inspecoes 500 --relatorios 500
+
+O banco precisa estar migrado (`python -m app.cli migrate`). Todos os usuários
+são criados com a senha BENCH_SENHA e e-mails bench{n}@vistotrack.com.
+"""
+import argparse
+import random
+from datetime import date, time, timedelta
+from sqlalchemy import delete, insert, select
+from app.database import sync_engine
+from app.models import User, Veiculo, Agendamento, Inspecao, Relatorio, Patio, Camera, AgendaResumo
+from app.utils.security import hash_password
+from app.utils.placa import normalizar_placa
+
+BENCH_SENHA = "bench-senha"
+LOTE = 5000
+LOCAIS = ["Pátio Centro", "Pátio Norte", "Pátio Sul", "Pátio Leste"]
+
+
+def email(n: int) -> str:
+    return f"bench{n}@vistotrack.com"
+
+
+def placa(usuario: int, n: int) -> str:
+    return f"B{usuario:03d}{n:05d}"[:10]
+
+
+def _com_placa_norm(linhas: list) -> list:
+    # insert() do Core não passa pelo @validates("placa") dos modelos
+    for linha in linhas:
+        linha["placa_norm"] = normalizar_placa(linha["placa"])
+    return linhas
+
+
+def _inserir(conn, tabela, linhas):
+    for i in range(0, len(linhas), LOTE):
+        conn.execute(insert(tabela), linhas[i:i + LOTE])
+
+
+def seed(args):
+    rnd = random.Random(args.seed)
+    hoje = date.today()
+    senha = hash_password(BENCH_SENHA)  # bcrypt uma única vez
+
+    with sync_engine.begin() as conn:
+        antigos = select(User.id).where(User.email.like("bench%@vistotrack.com"))
+        ids = conn.execute(antigos).scalars().all()
+        if ids:
+            emails = conn.execute(select(User.email).where(User.id.in_(ids))).scalars().all()
+            conn.execute(delete(Relatorio).where(Relatorio.usuario_id.in_(ids)))
+            conn.execute(delete(Inspecao).where(Inspecao.usuario_email.in_(emails)))
+            conn.execute(delete(Camera).where(Camera.patio_id.in_(select(Patio.id).where(Patio.usuario_id.in_(ids)))))
+            conn.execute(delete(Patio).where(Patio.usuario_id.in_(ids)))
+            conn.execute(delete(Agendamento).where(Agendamento.usuario_id.in_(ids)))
+            conn.execute(delete(AgendaResumo).where(AgendaResumo.usuario_id.in_(ids)))
+            conn.execute(delete(Veiculo).where(Veiculo.usuario_id.in_(ids)))
+            conn.execute(delete(User).where(User.id.in_(ids)))
+
+        for u in range(args.usuarios):
+            user_id = conn.execute(
+                insert(User).values(nome=f"Bench {u}", email=email(u), telefone="11999999999", senha=senha, role="user").returning(User.id)
+            ).scalar()
+            patio_id = conn.execute(insert(Patio).values(nome=f"Pátio bench {u}", usuario_id=user_id).returning(Patio.id)).scalar()
+            _inserir(conn, Camera, [
+                {"tipo": "fixa", "rtmp_url": f"rtmp://stub/{patio_id}/{c}", "patio_id": patio_id} for c in range(4)
+            ])
+
+            veiculos = _com_placa_norm([
+                {"usuario_id": user_id, "placa": placa(u, v), "modelo": rnd.choice(["Gol", "Onix", "HB20", "Strada"]),
+                 "ano": rnd.randint(2005, 2025), "cor": rnd.choice(["Prata", "Preto", "Branco"]), "km": rnd.randint(0, 200000)}
+                for v in range(args.veiculos)
+            ])
+            _inserir(conn, Veiculo, veiculos)
+            veiculo_ids = conn.execute(select(Veiculo.id).where(Veiculo.usuario_id == user_id)).scalars().all()
+
+            _inserir(conn, Agendamento, [
+                {"usuario_id": user_id, "data": hoje + timedelta(days=rnd.randint(-365, 90)),
+                 "horario": time(rnd.randint(8, 17), rnd.choice([0, 30])), "local": rnd.choice(LOCAIS),
+                 "status": rnd.choice(["Pendente", "Concluído"])}
+                for _ in range(args.agendamentos)
+            ])
+
+            _inserir(conn, Inspecao, _com_placa_norm([
+                {"usuario_email": email(u), "data": hoje - timedelta(days=rnd.randint(0, 365)),
+                 "placa": placa(u, rnd.randrange(args.veiculos)) if args.veiculos else "BENCH000",
+                 "status": rnd.choice(["Pendente", "Em andamento", "Concluída", "Concluída"]),
+                 "resultado": None, "patio_id": patio_id}
+                for _ in range(args.inspecoes)
+            ]))
+            inspecao_ids = conn.execute(select(Inspecao.id).where(Inspecao.usuario_email == email(u))).scalars().all()
+
+            if veiculo_ids and inspecao_ids:
+                _inserir(conn, Relatorio, [
+                    {"veiculo_id": rnd.choice(veiculo_ids), "usuario_id": user_id, "inspecao_id": rnd.choice(inspecao_ids),
+                     "data": hoje - timedelta(days=rnd.randint(0, 365)), "resultado": rnd.choice(["Aprovado", "Reprovado"]),
+                     "arquivo_pdf": None}
+                    for _ in range(args.relatorios)
+                ])
+
+        # Resumo materializado da agenda, como as rotas manteriam
+        conn.exec_driver_sql("""
+            INSERT INTO agenda_resumos (usuario_id, pendentes, concluidos, ultimo_agendamento)
+            SELECT usuario_id, COUNT(*) FILTER (WHERE status = 'Pendente'),
+                   COUNT(*) FILTER (WHERE status = 'Concluído'), MAX(data)
+            FROM agendamentos GROUP BY usuario_id
+            ON CONFLICT (usuario_id) DO UPDATE SET pendentes = EXCLUDED.pendentes,
+                concluidos = EXCLUDED.concluidos, ultimo_agendamento = EXCLUDED.ultimo_agendamento
+        """)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.seed")
+    parser.add_argument("--usuarios", type=int, default=50)
+    parser.add_argument("--veiculos", type=int, default=200, help="por usuário")
+    parser.add_argument("--agendamentos", type=int, default=2000, help="por usuário")
+    parser.add_argument("--inspecoes", type=int, default=500, help="por usuário")
+    parser.add_argument("--relatorios", type=int, default=500, help="por usuário")
+    parser.add_argument("--seed", type=int, default=42)
+    seed(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compara a serialização das listagens: caminho padrão do FastAPI x orjson direto das linhas.
+
+    python -m benchmarks.serializacao                  # 10k linhas, 5 repetições
+    python -m benchmarks.serializacao --linhas 50000 -o serializacao.json
+
+Que os dois caminhos produzem exatamente os mesmos bytes é garantido por
+tests/test_fast_json.py, que usa os mesmos dados daqui. Não precisa de banco:
+os objetos ORM são transientes.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import date, timedelta
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.models import Veiculo, Relatorio
+from app.schemas import VeiculoResponse, RelatorioResponse
+from app.utils.fast_json import colunas_do_schema, resposta_linhas
+
+# Textos que exercitam o escape do JSON
+TEXTOS = ["Prata", "Ônibus São José", 'aspas "duplas" e \\ barra', "linha\nnova\ttab\x00\x1f", "emoji 🚗 </script>"]
+
+
+def veiculos(n: int) -> list:
+    return [
+        Veiculo(id=i, usuario_id=1, placa=f"BNC{i:04d}", modelo=TEXTOS[i % len(TEXTOS)], ano=2000 + i % 25,
+                cor=None if i % 7 == 0 else TEXTOS[(i + 1) % len(TEXTOS)], km=None if i % 11 == 0 else i * 137)
+        for i in range(1, n + 1)
+    ]
+
+
+def relatorios(n: int) -> list:
+    inicio = date(2024, 1, 1)
+    return [
+        Relatorio(id=i, veiculo_id=i, usuario_id=1, inspecao_id=i, data=inicio + timedelta(days=i % 365),
+                  resultado=TEXTOS[i % len(TEXTOS)], arquivo_pdf=None if i % 3 else f"storage/relatorios/{i}.pdf")
+        for i in range(1, n + 1)
+    ]
+
+
+def linhas_de(objetos: list, colunas: list) -> list:
+    """Mesmo formato de Row que select(*colunas) devolve."""
+    return [tuple(getattr(o, c.key) for c in colunas) for o in objetos]
+
+
+def caminho_padrao(objetos: list, schema) -> bytes:
+    """O que o FastAPI faz com response_model=List[schema]: from_orm por linha, jsonable_encoder, json.dumps."""
+    return JSONResponse(jsonable_encoder([schema.from_orm(o) for o in objetos])).body
+
+
+def caminho_rapido(linhas: list, colunas: list) -> bytes:
+    return resposta_linhas(linhas, colunas).body
+
+
+def medir(funcao, repeticoes: int) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return {"min_ms": round(tempos[0] * 1000, 2), "mediana_ms": round(tempos[len(tempos) // 2] * 1000, 2)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=10_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("-o", "--saida")
+    args = parser.parse_args()
+
+    resultado = {"linhas": args.linhas, "cenarios": {}}
+    for nome, objetos, modelo, schema in (
+        ("veiculos", veiculos(args.linhas), Veiculo, VeiculoResponse),
+        ("relatorios", relatorios(args.linhas), Relatorio, RelatorioResponse),
+    ):
+        colunas = colunas_do_schema(modelo, schema)
+        linhas = linhas_de(objetos, colunas)
+
+        padrao = medir(lambda: caminho_padrao(objetos, schema), args.repeticoes)
+        rapido = medir(lambda: caminho_rapido(linhas, colunas), args.repeticoes)
+        resultado["cenarios"][nome] = {
+            "padrao": padrao,
+            "orjson": rapido,
+            "ganho": round(padrao["mediana_ms"] / max(rapido["mediana_ms"], 0.001), 1),
+        }
+
+    texto = json.dumps(resultado, indent=2)
+    print(texto)
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            arquivo.write(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Stubs locais dos microsserviços RTMP e IA, com latência configurável.
+
+    python -m benchmarks.stubs --rtmp-port 9000 --ai-port 10000 --patios 1-50
+
+Aponte a API para eles com MICRO_RTMP_URL=http://127.0.0.1:9000/ e
+MICRO_AI_URL=http://127.0.0.1:10000/.
+"""
+import argparse
+import asyncio
+import random
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+
+def criar_rtmp(patios: range, cameras_por_patio: int, latencia: float) -> FastAPI:
+    app = FastAPI()
+    streams = [
+        {"camera_id": f"{p}-{c}", "patio_id": p, "status": "online", "rtmp_url": f"rtmp://stub/{p}/{c}"}
+        for p in patios for c in range(cameras_por_patio)
+    ]
+
+    @app.get("/streams")
+    async def listar():
+        await asyncio.sleep(latencia)
+        return {"streams": streams}
+
+    @app.get("/rtmp/status")
+    async def status(camera_id: str):
+        await asyncio.sleep(latencia)
+        return {"camera_id": camera_id, "status": "online"}
+
+    @app.get("/generate_stream_link")
+    async def link(camera_id: str):
+        await asyncio.sleep(latencia)
+        return {"camera_id": camera_id, "url": f"https://stub/hls/{camera_id}.m3u8"}
+
+    @app.post("/start")
+    async def start(body: dict):
+        await asyncio.sleep(latencia)
+        return {"rtmp_url": f"rtmp://stub/{body.get('patio_id')}/{random.randint(0, 10**6)}"}
+
+    return app
+
+
+def criar_ai(latencia: float, taxa_erro: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/analisar")
+    async def analisar(body: dict):
+        await asyncio.sleep(latencia)
+        if random.random() < taxa_erro:
+            return JSONResponse(status_code=500, content={"detail": "falha simulada"})
+        return {"inspecao_id": body.get("inspecao_id"), "aprovado": True, "avarias": []}
+
+    return app
+
+
+async def _servir(args):
+    inicio, _, fim = args.patios.partition("-")
+    patios = range(int(inicio), int(fim or inicio) + 1)
+    servidores = [
+        uvicorn.Server(uvicorn.Config(criar_rtmp(patios, args.cameras, args.latencia), port=args.rtmp_port, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(criar_ai(args.latencia_ai, args.taxa_erro_ai), port=args.ai_port, log_level="warning")),
+    ]
+    await asyncio.gather(*(s.serve() for s in servidores))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stubs")
+    parser.add_argument("--rtmp-port", type=int, default=9000)
+    parser.add_argument("--ai-port", type=int, default=10000)
+    parser.add_argument("--patios", default="1-50", help="intervalo de patio_id com streams")
+    parser.add_argument("--cameras", type=int, default=4, help="streams por pátio")
+    parser.add_argument("--latencia", type=float, default=0.02, help="segundos por chamada ao RTMP")
+    parser.add_argument("--latencia-ai", type=float, default=0.5, help="segundos por análise")
+    parser.add_argument("--taxa-erro-ai", type=float, default=0.0, help="fração de análises que falham")
+    asyncio.run(_servir(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""O resumo materializado da agenda acompanha criação, reagendamento e cancelamento.
+
+A cada passo o /agenda/resumo (que lê agenda_resumos) tem que bater com o agregado
+direto em agendamentos (stmt_resumo). O volume de 100k agendamentos é medido por
+`python -m benchmarks.resumo`.
+"""
+import asyncio
+import uuid
+from datetime import date, timedelta
+import httpx
+from tests.conftest import requer_banco
+
+requer_banco()
+
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+from app.database import AsyncSessionLocal, async_engine  # noqa: E402
+from app.models import User, Agendamento, AgendaResumo  # noqa: E402
+from app.routes import agenda  # noqa: E402
+from app.utils.principal_cache import Principal  # noqa: E402
+from app.utils.security import get_current_user  # noqa: E402
+
+
+async def _semear() -> Principal:
+    sufixo = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        usuario = User(nome="Teste", email=f"resumo-{sufixo}@vistotrack.com", telefone="11999999999", senha="x", role="user")
+        db.add(usuario)
+        await db.commit()
+        return Principal(id=usuario.id, email=usuario.email, name=usuario.nome, role=usuario.role)
+
+
+async def _limpar(principal: Principal):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(AgendaResumo).where(AgendaResumo.usuario_id == principal.id))
+        await db.execute(delete(Agendamento).where(Agendamento.usuario_id == principal.id))
+        await db.execute(delete(User).where(User.id == principal.id))
+        await db.commit()
+
+
+async def _agregado(usuario_id: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        pendentes, concluidos, ultimo = (await db.execute(agenda.stmt_resumo(usuario_id))).one()
+    return {
+        "pendentes": pendentes,
+        "concluidos": concluidos,
+        "ultimo_agendamento": ultimo.isoformat() if ultimo else "Nenhum agendamento encontrado",
+    }
+
+
+async def _executar() -> list:
+    principal = await _semear()
+    local = f"Pátio teste {principal.id}"
+    dia = date.today() + timedelta(days=30)
+    passos = []
+    try:
+        app = FastAPI()
+        app.include_router(agenda.router, prefix="/api")
+        app.dependency_overrides[get_current_user] = lambda: principal
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://teste") as client:
+            async def passo(nome: str):
+                resposta = await client.get("/api/agenda/resumo")
+                assert resposta.status_code == 200, resposta.text
+                passos.append((nome, resposta.json(), await _agregado(principal.id)))
+
+            await passo("vazio")
+            ids = []
+            for i, horario in enumerate(("09:00", "10:00", "11:00")):
+                r = await client.post("/api/agenda/", json={"data": (dia + timedelta(days=i)).isoformat(), "horario": horario, "local": local})
+                assert r.status_code == 200, r.text
+                ids.append(r.json()["id"])
+            await passo("criados")
+
+            r = await client.put(f"/api/agenda/{ids[0]}", json={"data": (dia + timedelta(days=10)).isoformat()})
+            assert r.status_code == 200, r.text
+            await passo("reagendado")
+
+            r = await client.delete(f"/api/agenda/{ids[1]}")
+            assert r.status_code == 200, r.text
+            await passo("cancelado")
+    finally:
+        await _limpar(principal)
+        await async_engine.dispose()
+    return passos
+
+
+def test_resumo_materializado_acompanha_as_escritas():
+    passos = asyncio.run(_executar())
+    for nome, resumo, agregado in passos:
+        assert resumo == agregado, nome
+
+    por_passo = {nome: resumo for nome, resumo, _ in passos}
+    assert por_passo["vazio"]["ultimo_agendamento"] == "Nenhum agendamento encontrado"
+    assert por_passo["criados"]["pendentes"] == 3
+    assert por_passo["reagendado"]["ultimo_agendamento"] == (date.today() + timedelta(days=40)).isoformat()
+    assert por_passo["cancelado"]["pendentes"] == 2
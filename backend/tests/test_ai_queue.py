@@ -0,0 +1,156 @@
+"""Fila de análise contra o Micro IA falso de benchmarks.stubs: reivindicação em lote,
+retry com backoff e dead-letter.
+
+reivindicar() pega qualquer job elegível da tabela: use um banco de teste dedicado.
+"""
+import asyncio
+import json
+import uuid
+from datetime import date
+import httpx
+from tests.conftest import requer_banco
+
+requer_banco()
+
+from sqlalchemy import delete, func, select, update  # noqa: E402
+from app.database import AsyncSessionLocal, async_engine  # noqa: E402
+from app.models import User, Inspecao, AnaliseJob  # noqa: E402
+from app.utils import ai_queue  # noqa: E402
+from app.utils.microservices import ai_client, CircuitBreaker  # noqa: E402
+from benchmarks.stubs import criar_ai  # noqa: E402
+
+
+def _fake_ai(monkeypatch, app=None, transport=None):
+    """Aponta o ai_client compartilhado para o Micro IA falso, com um circuito novo."""
+    transport = transport or httpx.ASGITransport(app=app)
+    monkeypatch.setattr(ai_client, "_client", httpx.AsyncClient(transport=transport, base_url="http://ai"))
+    monkeypatch.setattr(ai_client, "breaker", CircuitBreaker(max_falhas=1000, reset_segundos=30))
+
+
+async def _semear(jobs: int, max_tentativas: int = 5) -> dict:
+    sufixo = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        usuario = User(nome="Teste", email=f"fila-{sufixo}@vistotrack.com", telefone="11999999999", senha="x", role="user")
+        db.add(usuario)
+        await db.flush()
+        inspecao = Inspecao(usuario_email=usuario.email, data=date.today(), placa="FIL0A00", status="Concluída", resultado="notas do inspetor")
+        db.add(inspecao)
+        await db.flush()
+        ids = []
+        for i in range(jobs):
+            job = await ai_queue.enfileirar(db, inspecao.id, {"frames": [f"frame-{i}.jpg"]})
+            job.max_tentativas = max_tentativas
+            ids.append(job.id)
+        await db.commit()
+        return {"usuario_id": usuario.id, "inspecao_id": inspecao.id, "jobs": ids}
+
+
+async def _limpar(ids: dict):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(AnaliseJob).where(AnaliseJob.inspecao_id == ids["inspecao_id"]))
+        await db.execute(delete(Inspecao).where(Inspecao.id == ids["inspecao_id"]))
+        await db.execute(delete(User).where(User.id == ids["usuario_id"]))
+        await db.commit()
+
+
+async def _job(job_id: int) -> AnaliseJob:
+    async with AsyncSessionLocal() as db:
+        return await db.get(AnaliseJob, job_id)
+
+
+async def _liberar_backoff(job_id: int):
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(AnaliseJob).where(AnaliseJob.id == job_id).values(disponivel_em=func.now()))
+        await db.commit()
+
+
+def _executar(cenario, jobs: int = 1, max_tentativas: int = 5):
+    async def principal():
+        ids = await _semear(jobs, max_tentativas)
+        try:
+            return ids, await cenario(ids)
+        finally:
+            await _limpar(ids)
+            await ai_client.close()
+            await async_engine.dispose()
+
+    return asyncio.run(principal())
+
+
+def _dos_meus(reivindicados: list, ids: dict) -> list:
+    return [job for job in reivindicados if job[0] in ids["jobs"]]
+
+
+def test_workers_concorrentes_nao_reivindicam_o_mesmo_job():
+    async def worker() -> list:
+        pegos = []
+        while True:
+            lote = await ai_queue.reivindicar(2)
+            if not lote:
+                return pegos
+            pegos.extend(job[0] for job in lote)
+
+    async def cenario(ids):
+        return await asyncio.gather(worker(), worker(), worker())
+
+    ids, por_worker = _executar(cenario, jobs=12)
+    todos = [job_id for pegos in por_worker for job_id in pegos]
+    assert len(todos) == len(set(todos))
+    assert set(ids["jobs"]) <= set(todos)
+
+
+def test_sucesso_grava_a_analise_no_job_e_preserva_as_notas(monkeypatch):
+    _fake_ai(monkeypatch, app=criar_ai(latencia=0, taxa_erro=0))
+
+    async def cenario(ids):
+        for job in _dos_meus(await ai_queue.reivindicar(10), ids):
+            await ai_queue.processar(job)
+        async with AsyncSessionLocal() as db:
+            notas = (await db.execute(select(Inspecao.resultado).where(Inspecao.id == ids["inspecao_id"]))).scalar()
+        return await _job(ids["jobs"][0]), notas
+
+    ids, (job, notas) = _executar(cenario)
+    assert job.status == "concluido"
+    assert job.tentativas == 1
+    assert json.loads(job.resultado) == {"inspecao_id": ids["inspecao_id"], "aprovado": True, "avarias": []}
+    assert notas == "notas do inspetor"
+
+
+def test_erro_500_volta_para_a_fila_com_backoff_e_depois_vai_para_dead(monkeypatch):
+    _fake_ai(monkeypatch, app=criar_ai(latencia=0, taxa_erro=1))
+
+    async def cenario(ids):
+        estados = []
+        job_id = ids["jobs"][0]
+        for _ in range(2):
+            for job in _dos_meus(await ai_queue.reivindicar(10), ids):
+                await ai_queue.processar(job)
+            job = await _job(job_id)
+            async with AsyncSessionLocal() as db:
+                agora = (await db.execute(select(func.now()))).scalar()
+            reivindicavel = bool(_dos_meus(await ai_queue.reivindicar(10), ids))
+            estados.append((job.status, job.tentativas, job.disponivel_em > agora, reivindicavel, job.erro))
+            await _liberar_backoff(job_id)
+        return estados
+
+    _, estados = _executar(cenario, max_tentativas=2)
+    (status1, tentativas1, adiado1, reivindicavel1, erro1), (status2, tentativas2, _, reivindicavel2, _) = estados
+    # Primeira falha: pendente, mas só depois do backoff
+    assert (status1, tentativas1, adiado1, reivindicavel1) == ("pendente", 1, True, False)
+    assert erro1.startswith("HTTP 500")
+    # Segunda falha esgota max_tentativas: dead, e nunca mais é reivindicado
+    assert (status2, tentativas2, reivindicavel2) == ("dead", 2, False)
+
+
+def test_erro_4xx_vai_direto_para_dead(monkeypatch):
+    _fake_ai(monkeypatch, transport=httpx.MockTransport(lambda request: httpx.Response(422, json={"detail": "frames inválidos"})))
+
+    async def cenario(ids):
+        for job in _dos_meus(await ai_queue.reivindicar(10), ids):
+            await ai_queue.processar(job)
+        return await _job(ids["jobs"][0])
+
+    _, job = _executar(cenario)
+    assert job.status == "dead"
+    assert job.tentativas == 1
+    assert "frames inválidos" in job.erro
@@ -0,0 +1,38 @@
+"""O caminho orjson das listagens gera os mesmos bytes que o response_model do FastAPI (sem banco)."""
+import pytest
+from fastapi import Response
+from app.models import Veiculo, Relatorio
+from app.schemas import VeiculoResponse, RelatorioResponse
+from app.utils.fast_json import colunas_do_schema, resposta_linhas
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from benchmarks.serializacao import veiculos, relatorios, linhas_de, caminho_padrao, caminho_rapido
+
+
+@pytest.mark.parametrize("objetos, modelo, schema", [
+    (veiculos(200), Veiculo, VeiculoResponse),
+    (relatorios(200), Relatorio, RelatorioResponse),
+], ids=["veiculos", "relatorios"])
+def test_mesmos_bytes_do_caminho_padrao(objetos, modelo, schema):
+    # Os textos cobrem acentos, aspas, barra invertida, caracteres de controle e emoji; os nulos
+    # vêm de Veiculo.cor/km (colunas anuláveis) e Relatorio.arquivo_pdf
+    colunas = colunas_do_schema(modelo, schema)
+    assert caminho_rapido(linhas_de(objetos, colunas), colunas) == caminho_padrao(objetos, schema)
+
+
+def test_lista_vazia():
+    colunas = colunas_do_schema(Veiculo, VeiculoResponse)
+    assert caminho_rapido([], colunas) == caminho_padrao([], VeiculoResponse)
+
+
+def test_cursor_da_pagina_e_copiado():
+    colunas = colunas_do_schema(Veiculo, VeiculoResponse)
+    injetado = Response()
+    injetado.headers[NEXT_CURSOR_HEADER] = "abc"
+    assert resposta_linhas([], colunas, injetado).headers[NEXT_CURSOR_HEADER] == "abc"
+
+
+def test_veiculo_sem_cor_nem_km():
+    objetos = [v for v in veiculos(100) if v.cor is None or v.km is None]
+    assert any(v.cor is None for v in objetos) and any(v.km is None for v in objetos)
+    colunas = colunas_do_schema(Veiculo, VeiculoResponse)
+    assert caminho_rapido(linhas_de(objetos, colunas), colunas) == caminho_padrao(objetos, VeiculoResponse)
@@ -0,0 +1,86 @@
+"""O bcrypt roda no pool dedicado, fora do event loop, e o pool saturado responde 429.
+
+A latência do /ping durante uma tempestade de logins é medida por
+`python -m benchmarks.run --cenarios ping_durante_login`.
+"""
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from app.utils import security
+
+
+def test_hash_e_verificacao_assincronos():
+    async def cenario():
+        hash_ = await security.hash_password_async("segredo")
+        return await security.verify_password_async("segredo", hash_), await security.verify_password_async("outra", hash_)
+
+    assert asyncio.run(cenario()) == (True, False)
+
+
+def test_hash_nao_bloqueia_o_event_loop():
+    liberado = threading.Event()
+
+    def hash_lento():
+        # Se rodasse na thread do loop, o loop nunca chegaria a liberar o evento
+        return liberado.wait(timeout=2), threading.current_thread().name
+
+    async def cenario():
+        tarefa = asyncio.create_task(security._executar_hash(hash_lento))
+        await asyncio.sleep(0.01)
+        liberado.set()
+        return await tarefa
+
+    concluiu, thread = asyncio.run(cenario())
+    assert concluiu
+    assert thread.startswith("bcrypt")
+
+
+def test_pool_saturado_responde_429(monkeypatch):
+    monkeypatch.setattr(security, "PASSWORD_HASH_MAX_PENDING", 1)
+    liberado = threading.Event()
+
+    async def cenario():
+        ocupando = asyncio.create_task(security._executar_hash(liberado.wait, 2))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(HTTPException) as excinfo:
+                await security.verify_password_async("segredo", "$2b$12$invalido")
+        finally:
+            liberado.set()
+        await ocupando
+        return excinfo.value
+
+    erro = asyncio.run(cenario())
+    assert erro.status_code == 429
+    assert erro.headers["Retry-After"] == "1"
+    assert security._hash_pendentes == 0
+
+
+def test_cancelar_a_espera_nao_libera_a_vaga_do_job_em_execucao(monkeypatch):
+    monkeypatch.setattr(security, "PASSWORD_HASH_MAX_PENDING", 1)
+    rodando, liberado = threading.Event(), threading.Event()
+
+    def hash_lento():
+        rodando.set()
+        return liberado.wait(timeout=2)
+
+    async def cenario():
+        # Cliente desconectou: o await é cancelado, mas o bcrypt segue na thread
+        espera = asyncio.create_task(security._executar_hash(hash_lento))
+        await asyncio.get_running_loop().run_in_executor(None, rodando.wait, 2)
+        espera.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await espera
+        pendentes_apos_cancelar = security._hash_pendentes
+        with pytest.raises(HTTPException) as excinfo:
+            await security.verify_password_async("segredo", "$2b$12$invalido")
+        liberado.set()
+        while security._hash_pendentes:
+            await asyncio.sleep(0.01)
+        return pendentes_apos_cancelar, excinfo.value.status_code
+
+    pendentes, codigo = asyncio.run(cenario())
+    assert pendentes == 1
+    assert codigo == 429
+    assert security._hash_pendentes == 0
@@ -0,0 +1,54 @@
+"""Leitura em streaming dos corpos do POST /veiculos/bulk (sem banco)."""
+import asyncio
+from app.utils.ingest import FORMATO_CSV, FORMATO_NDJSON, LINHA_GRANDE_DEMAIS, iterar_linhas, iterar_registros
+
+
+async def _stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _linhas(*chunks, **kwargs):
+    async def coletar():
+        return [linha async for linha in iterar_linhas(_stream(*chunks), **kwargs)]
+    return asyncio.run(coletar())
+
+
+def _registros(formato, *chunks):
+    async def coletar():
+        return [item async for item in iterar_registros(_stream(*chunks), formato)]
+    return asyncio.run(coletar())
+
+
+def test_linhas_quebradas_entre_chunks():
+    assert _linhas(b"\xef\xbb\xbfplaca,mo", b"delo\r\nABC1234,Gol\n", b"XYZ9A87,Uno") == [
+        "placa,modelo", "ABC1234,Gol", "XYZ9A87,Uno",
+    ]
+
+
+def test_utf8_dividido_entre_chunks():
+    assert _linhas("Pátio\n".encode()[:2], "Pátio\n".encode()[2:]) == ["Pátio"]
+
+
+def test_linha_sem_quebra_e_descartada_sem_acumular():
+    # 100 chunks de 10 bytes sem "\n": nunca passa de max_linha em memória
+    linhas = _linhas(*[b"x" * 10] * 100, b"\nfim\n", max_linha=50)
+    assert linhas == [LINHA_GRANDE_DEMAIS, "fim"]
+
+
+def test_linha_grande_demais_no_fim_do_corpo():
+    assert _linhas(b"ok\n", b"y" * 60, max_linha=50) == ["ok", LINHA_GRANDE_DEMAIS]
+
+
+def test_csv_so_com_cr_vira_erro_por_linha():
+    corpo = b"placa,modelo\r" + b"ABC1234,Gol\r" * 10000
+    (linha, erro), = _registros(FORMATO_CSV, corpo)
+    assert linha == 1 and erro.startswith("Linha com mais de")
+
+
+def test_ndjson_segue_depois_da_linha_gigante():
+    corpo = b'{"placa": "' + b"A" * 70000 + b'"}\n{"placa": "ABC1234"}\n'
+    assert _registros(FORMATO_NDJSON, corpo) == [
+        (1, "Linha com mais de 65536 caracteres"),
+        (2, {"placa": "ABC1234"}),
+    ]
@@ -0,0 +1,64 @@
+"""Barramento de invalidação com dois workers simulados no mesmo banco.
+
+Cada worker tem o próprio registro de callbacks, como processos separados teriam:
+o que publica usa o registro do processo (onde cai a invalidação local pós-commit),
+o outro só recebe o que chega pelo NOTIFY.
+"""
+import asyncio
+import time
+from tests.conftest import requer_banco
+
+requer_banco()
+
+from app.database import AsyncSessionLocal, async_engine  # noqa: E402
+from app.utils import invalidation  # noqa: E402
+from app.utils.invalidation import InvalidationBus, inscrever, publicar  # noqa: E402
+
+ENTIDADE = "teste_barramento"
+
+
+async def _aguardar(condicao, limite: float = 5.0):
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim, "tempo esgotado"
+        await asyncio.sleep(0.05)
+
+
+async def _executar():
+    locais, remotos = [], []
+    deste_worker = InvalidationBus()  # mesma origem e mesmo registro de quem publica
+    outro_worker = InvalidationBus(origem="outro-worker", inscritos={})
+    deste_worker.start()
+    outro_worker.start()
+    try:
+        await _aguardar(lambda: deste_worker.conectado and outro_worker.conectado)
+        # Depois do descarte total feito a cada conexão
+        inscrever(ENTIDADE, locais.append)
+        inscrever(ENTIDADE, remotos.append, outro_worker.inscritos)
+
+        # Rollback: nem invalidação local nem NOTIFY
+        async with AsyncSessionLocal() as db:
+            await publicar(db, ENTIDADE, 1)
+            await db.rollback()
+
+        async with AsyncSessionLocal() as db:
+            await publicar(db, ENTIDADE, 2)
+            assert locais == []  # nada antes do commit
+            await db.commit()
+        assert locais == [2]  # invalidação local, logo após o commit
+
+        await _aguardar(lambda: remotos == [2])
+        await asyncio.sleep(0.3)  # tempo para um eventual eco do próprio NOTIFY chegar
+        assert locais == [2]  # o eco da própria origem é ignorado
+        assert remotos == [2]  # o rollback não chegou ao outro worker
+        assert deste_worker.recebidos == 0
+        assert outro_worker.recebidos == 1
+    finally:
+        invalidation._inscritos.pop(ENTIDADE, None)
+        await deste_worker.stop()
+        await outro_worker.stop()
+        await async_engine.dispose()
+
+
+def test_dois_workers_invalidam_uma_vez_cada():
+    asyncio.run(_executar())
@@ -0,0 +1,140 @@
+"""Circuit breaker e cliente dos microsserviços (sem rede: o stub RTMP roda via ASGITransport).
+
+A vazão do /cameras/ativas contra o stub é medida por
+`python -m benchmarks.run --cenarios cameras_ativas`.
+"""
+import asyncio
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from app.utils import microservices  # noqa: E402
+from app.utils.microservices import CircuitBreaker, MicroServicoClient, MicroServicoIndisponivel  # noqa: E402
+from benchmarks.stubs import criar_rtmp  # noqa: E402
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(microservices.time, "monotonic", lambda: agora[0])
+    return agora
+
+
+def _aberto(relogio) -> CircuitBreaker:
+    breaker = CircuitBreaker(max_falhas=2, reset_segundos=30)
+    breaker.falha()
+    breaker.falha()
+    return breaker
+
+
+def test_abre_depois_de_n_falhas(relogio):
+    breaker = _aberto(relogio)
+    assert breaker.estado == "aberto"
+    assert not breaker.permite()
+
+
+def test_meio_aberto_libera_uma_unica_sonda(relogio):
+    breaker = _aberto(relogio)
+    relogio[0] += 31
+    assert breaker.estado == "meio_aberto"
+    assert [breaker.permite() for _ in range(5)] == [True, False, False, False, False]
+
+
+def test_sonda_com_sucesso_fecha(relogio):
+    breaker = _aberto(relogio)
+    relogio[0] += 31
+    assert breaker.permite()
+    breaker.sucesso()
+    assert breaker.estado == "fechado"
+    assert all(breaker.permite() for _ in range(3))
+
+
+def test_sonda_com_falha_reabre(relogio):
+    breaker = _aberto(relogio)
+    relogio[0] += 31
+    assert breaker.permite()
+    breaker.falha()
+    assert breaker.estado == "aberto"
+    assert not breaker.permite()
+
+
+def test_sonda_sem_resposta_expira(relogio):
+    breaker = _aberto(relogio)
+    relogio[0] += 31
+    assert breaker.permite()  # sonda cancelada: nunca chama sucesso() nem falha()
+    relogio[0] += 29
+    assert not breaker.permite()
+    relogio[0] += 2
+    assert breaker.permite()
+
+
+class _Instavel(httpx.AsyncBaseTransport):
+    """Responde 500 nas primeiras `falhas` chamadas e depois repassa ao stub."""
+
+    def __init__(self, falhas: int):
+        self.falhas = falhas
+        self.chamadas = 0
+        self.stub = httpx.ASGITransport(app=criar_rtmp(range(1, 3), cameras_por_patio=2, latencia=0))
+
+    async def handle_async_request(self, request):
+        self.chamadas += 1
+        if self.chamadas <= self.falhas:
+            return httpx.Response(500, json={"detail": "falha simulada"})
+        return await self.stub.handle_async_request(request)
+
+
+def _cliente(monkeypatch, falhas: int = 0, max_falhas: int = 5):
+    monkeypatch.setattr(microservices, "MICRO_HTTP_BACKOFF", 0)
+    transporte = _Instavel(falhas)
+    cliente = MicroServicoClient("micro-rtmp", "http://rtmp")
+    cliente.breaker = CircuitBreaker(max_falhas=max_falhas, reset_segundos=30)
+    cliente._client = httpx.AsyncClient(transport=transporte, base_url="http://rtmp")
+    return cliente, transporte
+
+
+def _executar(cliente, *chamadas):
+    async def cenario():
+        try:
+            resultados = []
+            for metodo, caminho, kwargs in chamadas:
+                try:
+                    resultados.append(await cliente.request(metodo, caminho, **kwargs))
+                except MicroServicoIndisponivel as exc:
+                    resultados.append(exc)
+            return resultados
+        finally:
+            await cliente.close()
+
+    return asyncio.run(cenario())
+
+
+def test_cliente_consulta_o_stub(monkeypatch):
+    cliente, transporte = _cliente(monkeypatch)
+    (resposta,) = _executar(cliente, ("GET", "/streams", {}))
+    assert resposta.status_code == 200
+    assert len(resposta.json()["streams"]) == 4
+    assert transporte.chamadas == 1
+
+
+def test_get_repete_depois_de_500(monkeypatch):
+    cliente, transporte = _cliente(monkeypatch, falhas=2)
+    (resposta,) = _executar(cliente, ("GET", "/rtmp/status", {"params": {"camera_id": "1-0"}, "retries": 2}))
+    assert resposta.json() == {"camera_id": "1-0", "status": "online"}
+    assert transporte.chamadas == 3
+    assert cliente.breaker.estado == "fechado"
+
+
+def test_post_nao_repete_depois_de_500(monkeypatch):
+    cliente, transporte = _cliente(monkeypatch, falhas=1)
+    (erro,) = _executar(cliente, ("POST", "/start", {"json": {"patio_id": 1}}))
+    assert isinstance(erro, MicroServicoIndisponivel)
+    assert transporte.chamadas == 1
+
+
+def test_circuito_aberto_nao_chega_ao_servico(monkeypatch):
+    cliente, transporte = _cliente(monkeypatch, falhas=10, max_falhas=2)
+    resultados = _executar(cliente, *[("GET", "/streams", {"retries": 5})] * 3)
+    assert all(isinstance(r, MicroServicoIndisponivel) for r in resultados)
+    # A segunda falha abre o circuito e interrompe os retries; as outras chamadas nem saem
+    assert transporte.chamadas == 2
+    assert "circuito aberto" in str(resultados[-1])
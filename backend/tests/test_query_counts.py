@@ -0,0 +1,111 @@
+"""Número fixo de consultas SQL nas listagens e nos detalhes com eager loading.
+
+Cada cenário semeia vários filhos (relatórios, câmeras, inspeções) de propósito: se um
+perfil de app/utils/load_profiles.py regredir para lazy load, a contagem cresce com eles.
+"""
+import asyncio
+import uuid
+from datetime import date
+import httpx
+from tests.conftest import requer_banco
+
+requer_banco()
+
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+from app.database import AsyncSessionLocal, async_engine  # noqa: E402
+from app.models import User, Patio, Camera, Inspecao, Veiculo, Relatorio  # noqa: E402
+from app.routes import veiculos, relatorios, patios  # noqa: E402
+from app.utils import metrics  # noqa: E402
+from app.utils.principal_cache import Principal  # noqa: E402
+from app.utils.security import get_current_user  # noqa: E402
+
+FILHOS = 5
+
+# (url, consultas esperadas); "{...}" é preenchido com os ids semeados
+CENARIOS = [
+    ("/api/veiculos/", 1),
+    ("/api/veiculos/{veiculo_id}/detalhes", 2),     # veículo + relatórios (selectinload)
+    ("/api/relatorios/", 1),
+    ("/api/relatorios/{relatorio_id}/detalhes", 1),  # JOIN com veículo e inspeção
+    ("/api/patios/", 1),
+    ("/api/patios/{patio_id}", 3),                   # pátio + câmeras + inspeções em aberto
+]
+
+metrics.instrumentar_engine(async_engine)
+
+
+async def _semear() -> dict:
+    sufixo = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as db:
+        usuario = User(nome="Teste", email=f"qc-{sufixo}@vistotrack.com", telefone="11999999999", senha="x", role="user")
+        db.add(usuario)
+        await db.flush()
+        patio = Patio(nome="Pátio teste", usuario_id=usuario.id)
+        db.add(patio)
+        await db.flush()
+        veiculo = Veiculo(usuario_id=usuario.id, placa=f"QC{sufixo}", modelo="Gol", ano=2020, cor="Prata", km=1)
+        db.add(veiculo)
+        db.add_all([Camera(tipo="fixa", rtmp_url=f"rtmp://teste/{i}", patio_id=patio.id) for i in range(FILHOS)])
+        inspecoes = [
+            Inspecao(usuario_email=usuario.email, data=date.today(), placa=veiculo.placa, status="Pendente", patio_id=patio.id)
+            for _ in range(FILHOS)
+        ]
+        db.add_all(inspecoes)
+        await db.flush()
+        relatorios_ = [
+            Relatorio(veiculo_id=veiculo.id, usuario_id=usuario.id, inspecao_id=i.id, data=date.today(), resultado="Aprovado")
+            for i in inspecoes
+        ]
+        db.add_all(relatorios_)
+        await db.commit()
+        return {
+            "principal": Principal(id=usuario.id, email=usuario.email, name=usuario.nome, role=usuario.role),
+            "veiculo_id": veiculo.id,
+            "relatorio_id": relatorios_[0].id,
+            "patio_id": patio.id,
+        }
+
+
+async def _limpar(ids: dict):
+    principal = ids["principal"]
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Relatorio).where(Relatorio.usuario_id == principal.id))
+        await db.execute(delete(Inspecao).where(Inspecao.usuario_email == principal.email))
+        await db.execute(delete(Camera).where(Camera.patio_id == ids["patio_id"]))
+        await db.execute(delete(Patio).where(Patio.usuario_id == principal.id))
+        await db.execute(delete(Veiculo).where(Veiculo.usuario_id == principal.id))
+        await db.execute(delete(User).where(User.id == principal.id))
+        await db.commit()
+
+
+async def _contar(client, url: str) -> int:
+    stats = metrics._EstatisticasRequisicao()
+    token = metrics._requisicao_atual.set(stats)
+    try:
+        resposta = await client.get(url)
+    finally:
+        metrics._requisicao_atual.reset(token)
+    assert resposta.status_code == 200, resposta.text
+    return stats.consultas
+
+
+async def _executar() -> dict:
+    ids = await _semear()
+    try:
+        app = FastAPI()
+        for modulo in (veiculos, relatorios, patios):
+            app.include_router(modulo.router, prefix="/api")
+        app.dependency_overrides[get_current_user] = lambda: ids["principal"]
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://teste") as client:
+            return {url: await _contar(client, url.format(**ids)) for url, _ in CENARIOS}
+    finally:
+        await _limpar(ids)
+        await async_engine.dispose()
+
+
+def test_consultas_por_rota_sao_fixas():
+    contagens = asyncio.run(_executar())
+    esperado = {url: consultas for url, consultas in CENARIOS}
+    assert contagens == esperado
@@ -0,0 +1,57 @@
+"""Read-your-writes: só escritas bem-sucedidas fixam o cliente no primário (sem banco)."""
+import asyncio
+import uuid
+import httpx
+from fastapi import FastAPI, HTTPException
+from app.utils.replicas import COOKIE_PRIMARIO, ReadYourWritesMiddleware, escritas_recentes
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/escrita", status_code=201)
+    async def escrita():
+        return {"ok": True}
+
+    @app.post("/recusada")
+    async def recusada():
+        raise HTTPException(status_code=429, detail="limitada")
+
+    @app.post("/api/auth/login")
+    async def login():
+        return {"access_token": "x"}
+
+    app.add_middleware(ReadYourWritesMiddleware)
+    return app
+
+
+def _post(caminho: str):
+    autorizacao = f"Bearer {uuid.uuid4().hex}"
+
+    async def cenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://teste") as client:
+            return await client.post(caminho, headers={"Authorization": autorizacao})
+
+    resposta = asyncio.run(cenario())
+    return resposta, escritas_recentes.recente(autorizacao.encode())
+
+
+def test_escrita_aceita_fixa_no_primario():
+    resposta, marcado = _post("/escrita")
+    assert resposta.status_code == 201
+    assert COOKIE_PRIMARIO in resposta.headers.get("set-cookie", "")
+    assert marcado
+
+
+def test_escrita_recusada_nao_fixa():
+    resposta, marcado = _post("/recusada")
+    assert resposta.status_code == 429
+    assert "set-cookie" not in resposta.headers
+    assert not marcado
+
+
+def test_login_nao_fixa():
+    resposta, marcado = _post("/api/auth/login")
+    assert resposta.status_code == 200
+    assert "set-cookie" not in resposta.headers
+    assert not marcado
@@ -0,0 +1,76 @@
+"""O /events aceita um ticket curto de SSE na URL, nunca o token de acesso (sem banco)."""
+import asyncio
+from collections import namedtuple
+from datetime import timedelta
+import httpx
+from fastapi import Depends, FastAPI
+from app.utils import security
+from app.utils.principal_cache import Principal, principal_cache
+
+Usuario = namedtuple("Usuario", "id role")
+PRINCIPAL = Principal(id=7, email="sse@vistotrack.com", name="SSE", role="user")
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/events")
+    async def eventos(usuario: Principal = Depends(security.get_current_user_sse)):
+        return {"id": usuario.id, "email": usuario.email}
+
+    @app.get("/me")
+    async def me(usuario: Principal = Depends(security.get_current_user)):
+        return {"id": usuario.id}
+
+    return app
+
+
+def _get(url: str, **kwargs) -> httpx.Response:
+    async def cenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://teste") as client:
+            return await client.get(url, **kwargs)
+
+    return asyncio.run(cenario())
+
+
+def _sem_banco(monkeypatch):
+    async def buscar(email, request):
+        return Usuario(id=PRINCIPAL.id, role=PRINCIPAL.role) if email == PRINCIPAL.email else None
+
+    monkeypatch.setattr(security, "_buscar_principal", buscar)
+    principal_cache.invalidar_todos()
+
+
+def _token_de_acesso() -> str:
+    return security.create_access_token({"sub": PRINCIPAL.email, "name": PRINCIPAL.name, "role": PRINCIPAL.role})
+
+
+def test_ticket_abre_o_stream(monkeypatch):
+    _sem_banco(monkeypatch)
+    resposta = _get("/events", params={"ticket": security.criar_ticket_sse(PRINCIPAL)})
+    assert resposta.status_code == 200
+    assert resposta.json() == {"id": 7, "email": "sse@vistotrack.com"}
+
+
+def test_token_de_acesso_nao_vale_como_ticket(monkeypatch):
+    _sem_banco(monkeypatch)
+    assert _get("/events", params={"ticket": _token_de_acesso()}).status_code == 401
+    assert _get("/events", params={"token": _token_de_acesso()}).status_code == 401
+
+
+def test_ticket_nao_vale_como_token_de_acesso(monkeypatch):
+    _sem_banco(monkeypatch)
+    ticket = security.criar_ticket_sse(PRINCIPAL)
+    assert _get("/me", headers={"Authorization": f"Bearer {ticket}"}).status_code == 401
+
+
+def test_ticket_expirado(monkeypatch):
+    _sem_banco(monkeypatch)
+    monkeypatch.setattr(security, "EVENTS_TICKET_SECONDS", -1)
+    assert _get("/events", params={"ticket": security.criar_ticket_sse(PRINCIPAL)}).status_code == 401
+
+
+def test_bearer_continua_valendo(monkeypatch):
+    _sem_banco(monkeypatch)
+    resposta = _get("/events", headers={"Authorization": f"Bearer {_token_de_acesso()}"})
+    assert resposta.status_code == 200